@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark the fast forecast engine against Prophet: fit time vs. accuracy of the 90-day endpoint.
+
+Every history is cut 90 business days before its end; both engines fit the five- and two-year windows
+on the rest, exactly as the analysis does, and are scored on the held-out endpoint:
+- error of `yhat` against the realized price,
+- whether the realized price falls inside [`yhat_lower`, `yhat_upper`],
+- whether the "growing" decision (both windows forecast at least the current price) matches Prophet's.
+
+Histories are read from the local price cache; without one, synthetic random-walk histories are used.
+With --panel N, the batched fast forecast of N synthetic tickers is also timed against one fit per ticker.
+
+Usage:
+    python benchmarks/bench_forecast_engines.py
+    python benchmarks/bench_forecast_engines.py --cache .cache/price_history.sqlite --limit 20
+    python benchmarks/bench_forecast_engines.py --synthetic 0 --panel 500
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.adapter.out.download import history_cache  # noqa: E402
+from src.adapter.out.predict import predicter  # noqa: E402
+
+WINDOWS = [None, 365 * 2]
+HORIZON = 90
+
+
+def synthetic_history(seed: int, days: int = 365 * 5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=pd.Timestamp('2025-01-31'), periods=int(days * 5 / 7))
+    returns = rng.normal(0.0003, 0.01, len(dates))
+    return pd.DataFrame({'ds': dates, 'y': 100 * np.exp(np.cumsum(returns))})
+
+
+def load_histories(cache_path: str, limit: int, synthetic: int):
+    histories = []
+    for ticker in history_cache.tickers(cache_path)[:limit]:
+        cached = history_cache.load(cache_path, ticker)
+        if cached is not None and len(cached.historic_data) > HORIZON * 3:
+            histories.append((ticker, cached.historic_data.reset_index(drop=True)))
+    if not histories:
+        print(f'No cached histories in `{cache_path}`, using {synthetic} synthetic ones')
+        histories = [(f'SYN{seed}', synthetic_history(seed)) for seed in range(synthetic)]
+    return histories
+
+
+def evaluate(history: pd.DataFrame, engine: str):
+    train, actual = history.iloc[:-HORIZON], float(history['y'].iloc[-1])
+    current_price = float(train['y'].iloc[-1])
+    start = time.perf_counter()
+    results = predicter.predict_windows(train, windows=WINDOWS, predict_period=HORIZON, engine=engine)
+    elapsed = time.perf_counter() - start
+
+    endpoints = [forecast.iloc[-1] for _, forecast in results]
+    # Score the two-year window, the one the analyzer takes the uncertainty from
+    two_year = endpoints[1]
+    return {
+        'time': elapsed,
+        'error': abs(two_year['yhat'] - actual) / actual,
+        'covered': two_year['yhat_lower'] <= actual <= two_year['yhat_upper'],
+        'growing': all(current_price <= endpoint['yhat'] for endpoint in endpoints),
+    }
+
+
+def bench_panel(tickers: int):
+    histories = {f'SYN{seed}': synthetic_history(seed) for seed in range(tickers)}
+    start = time.perf_counter()
+    for history in histories.values():
+        predicter.predict_windows(history, windows=WINDOWS, predict_period=HORIZON, engine='fast')
+    per_ticker = time.perf_counter() - start
+    start = time.perf_counter()
+    predicter.predict_panel(histories, windows=WINDOWS, predict_period=HORIZON)
+    batched = time.perf_counter() - start
+    print(f'{tickers} tickers: one fast fit per ticker {per_ticker:.2f}s, batched {batched:.2f}s, speed-up x{per_ticker / batched:.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cache', default='.cache/price_history.sqlite', help='price history cache to read')
+    parser.add_argument('--limit', type=int, default=20, help='maximum number of cached tickers')
+    parser.add_argument('--synthetic', type=int, default=5, help='synthetic histories when the cache is empty')
+    parser.add_argument('--panel', type=int, default=0, help='synthetic tickers of the batched forecast timing (0 = skip)')
+    args = parser.parse_args()
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+    logging.getLogger('prophet').setLevel(logging.WARNING)
+
+    scores = {engine: [] for engine in predicter.FORECAST_ENGINES}
+    histories = load_histories(args.cache, args.limit, args.synthetic) if args.synthetic or args.limit else []
+    for ticker, history in histories:
+        for engine in predicter.FORECAST_ENGINES:
+            scores[engine].append(evaluate(history, engine))
+        prophet, fast = scores['prophet'][-1], scores['fast'][-1]
+        print(f'{ticker}: prophet {prophet["time"]:.2f}s error {prophet["error"]:.1%}, '
+              f'fast {fast["time"]:.3f}s error {fast["error"]:.1%}, same decision: {prophet["growing"] == fast["growing"]}')
+
+    for engine, results in scores.items():
+        if not results:
+            continue
+        print(f'{engine}: mean fit {np.mean([r["time"] for r in results]):.3f}s, '
+              f'mean endpoint error {np.mean([r["error"] for r in results]):.1%}, '
+              f'interval coverage {np.mean([r["covered"] for r in results]):.0%}')
+    if histories:
+        agreement = np.mean([p['growing'] == f['growing'] for p, f in zip(scores['prophet'], scores['fast'])])
+        print(f'Speed-up x{np.mean([r["time"] for r in scores["prophet"]]) / np.mean([r["time"] for r in scores["fast"]]):.1f}, '
+              f'growing decision agreement {agreement:.0%}')
+    if args.panel:
+        bench_panel(args.panel)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark GA convergence on a synthetic ETF universe, with and without early stopping.
+
+For every run the full-length GA reports the generation at which the best portfolio last improved,
+which is the data needed to tune NUMBER_OF_POPULATION, STALL_GENERATIONS and NUMBER_OF_ITERATIONS.
+
+Usage:
+    python benchmarks/bench_ga_convergence.py --etfs 20 --runs 3
+    python benchmarks/bench_ga_convergence.py --etfs 100 --islands 4
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The optimizer reads the bot settings on import; none of them are used here
+for name in ("TELEGRAM_TO", "TELEGRAM_TOKEN", "GET_AND_INCREMENT_COUNTER_URL", "APP_SCRIPT_ID"):
+    os.environ.setdefault(name, "benchmark")
+
+from src.adapter.out.optimization import optimizer  # noqa: E402
+from src.logic.data.data import StockData, ProfitabilityData  # noqa: E402
+from src.logic.data.universe import Universe  # noqa: E402
+
+SECTORS = ["Technology", "Healthcare", "Financials", "Consumer", "Industrials", "Energy"]
+
+
+def synthetic_universe(etfs: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    stocks = []
+    for i in range(etfs):
+        current_price = float(rng.uniform(5, 60))
+        sectors = rng.dirichlet(np.ones(len(SECTORS)))
+        companies = rng.choice(200, size=10, replace=False)
+        stocks.append(StockData(
+            ticker_symbol=f"SYN{i}", stock_name=f"Synthetic ETF {i}", currency="EUR",
+            current_price=current_price, predict_price=current_price * float(rng.normal(1.03, 0.05)),
+            two_year_file_name="", five_year_file_name="", is_stock_growing=True, industry="ETF",
+            profitability_data=ProfitabilityData(0, 0, 0, 0, 0),
+            beta=float(rng.uniform(0.7, 1.3)), standard_deviation=float(rng.uniform(0.08, 0.3)),
+            dividend_yield=float(rng.uniform(0, 0.03)),
+            top_holdings=np.array([[f"Company {c}", 0.03] for c in companies]),
+            sector_allocation=dict(zip(SECTORS, sectors)),
+            average_daily_volume=1e6, assets_under_management=1e9,
+            expense_ratio=float(rng.uniform(0.001, 0.01)), description="",
+            prediction_uncertainty=current_price * float(rng.uniform(0, 0.1)),
+        ))
+    return Universe.from_stock_data(stocks)
+
+
+def timed_run(universe: Universe, seed: int, include_risk: bool, islands: int):
+    random.seed(seed)
+    start = time.perf_counter()
+    *_, logbook = optimizer._run_genetic_algorithm_with_map(universe, 50.0, 50.0, {}, include_risk=include_risk, islands=islands)
+    best = logbook.select("best")
+    last_improvement = next(gen for gen, fitness in zip(logbook.select("gen"), best) if fitness == best[-1])
+    return time.perf_counter() - start, logbook[-1]["gen"], last_improvement, best[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--etfs', type=int, default=20, help='number of synthetic ETFs')
+    parser.add_argument('--runs', type=int, default=3, help='seeded runs per objective')
+    parser.add_argument('--islands', type=int, default=1, help='island-model populations (1 = single population)')
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    universe = synthetic_universe(args.etfs)
+
+    for include_risk in (True, False):
+        label = 'risk-aware' if include_risk else 'profit-only'
+        for seed in range(args.runs):
+            stall_generations = optimizer.STALL_GENERATIONS
+            optimizer.STALL_GENERATIONS = optimizer.NUMBER_OF_ITERATIONS + 1
+            full_time, _, last_improvement, full_best = timed_run(universe, seed, include_risk, args.islands)
+            optimizer.STALL_GENERATIONS = stall_generations
+            early_time, generations, _, early_best = timed_run(universe, seed, include_risk, args.islands)
+            print(f'{label} seed {seed}: best last improved at generation {last_improvement}; '
+                  f'full {optimizer.NUMBER_OF_ITERATIONS} generations {full_time:.2f}s, '
+                  f'early stop after {generations} generations {early_time:.2f}s, '
+                  f'same best: {np.allclose(full_best, early_best)}, best (deviation, profit) ({early_best[0]:.2f}, {early_best[1]:.2f})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-ETF Prophet fit time from a cold start vs. warm-started from the model store.
+
+Day 1 fits every synthetic ETF from scratch and persists the models; day 2 appends one new
+business day to each history and refits, seeded with the stored parameters.
+
+Usage:
+    python benchmarks/bench_prophet_warm_start.py --etfs 5
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.adapter.out.predict import predicter  # noqa: E402
+
+WINDOWS = [None, 365 * 2]
+
+
+def synthetic_history(seed: int, days: int = 365 * 5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=pd.Timestamp('2025-01-31'), periods=int(days * 5 / 7))
+    returns = rng.normal(0.0003, 0.01, len(dates))
+    return pd.DataFrame({'ds': dates, 'y': 100 * np.exp(np.cumsum(returns))})
+
+
+def next_day(history: pd.DataFrame, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed + 10_000)
+    new_row = pd.DataFrame({
+        'ds': [history['ds'].iloc[-1] + pd.offsets.BDay(1)],
+        'y': [history['y'].iloc[-1] * (1 + rng.normal(0.0003, 0.01))],
+    })
+    return pd.concat([history, new_row], ignore_index=True)
+
+
+def timed_fit(history: pd.DataFrame, ticker: str, store_dir: str) -> float:
+    start = time.perf_counter()
+    predicter.predict_windows(history, windows=WINDOWS, predict_period=90, ticker=ticker, model_store_dir=store_dir)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--etfs', type=int, default=5, help='number of synthetic ETFs')
+    args = parser.parse_args()
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+    logging.getLogger('prophet').setLevel(logging.WARNING)
+
+    cold_times, warm_times = [], []
+    with tempfile.TemporaryDirectory() as store_dir:
+        for seed in range(args.etfs):
+            ticker = f'SYN{seed}'
+            history = synthetic_history(seed)
+            cold = timed_fit(history, ticker, store_dir)
+            warm = timed_fit(next_day(history, seed), ticker, store_dir)
+            cold_times.append(cold)
+            warm_times.append(warm)
+            print(f'{ticker}: cold {cold:.2f}s, warm {warm:.2f}s')
+
+    print(f'Mean per ETF ({len(WINDOWS)} windows, fit + 90-day forecast): '
+          f'cold {np.mean(cold_times):.2f}s, warm {np.mean(warm_times):.2f}s, '
+          f'speed-up x{np.mean(cold_times) / np.mean(warm_times):.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark the import time of the entry points that do not run the analysis pipeline.
+
+Each entry point is imported in a fresh interpreter with `-X importtime`. The cumulative times of the
+top-level imports are summed into the startup cost, and the heaviest modules are listed so that a
+regression (e.g. Prophet or pandas imported eagerly again) is easy to find. The script exits with
+status 1 when an entry point is over the budget.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget 0.3 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The modules each entry point imports; main.py itself is imported as `main`
+ENTRY_POINTS = {
+    "optimize-only (--reoptimize)": ["main", "src.adapter.out.optimization.optimizer",
+                                     "src.logic.data.universe", "src.adapter.out.notify.notifier"],
+    "notify-only (--notify)": ["main", "src.adapter.out.notify.notifier"],
+}
+
+
+def import_times(modules):
+    """
+    Import `modules` in a fresh interpreter.
+
+    Returns:
+        Cumulative seconds of each top-level import and of every imported module
+    """
+    env = dict(os.environ)
+    # The configuration reads the bot settings on import; none of them are used here
+    for name in ("TELEGRAM_TO", "TELEGRAM_TOKEN", "GET_AND_INCREMENT_COUNTER_URL", "APP_SCRIPT_ID"):
+        env.setdefault(name, "benchmark")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "; ".join(f"import {module}" for module in modules) or "pass"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    top_level = {}
+    cumulative = {}
+    # Lines look like `import time:   self [us] |  cumulative | imported package`
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        indent = len(name) - len(name.lstrip())
+        cumulative[name.strip()] = int(cumulative_us) / 1e6
+        if indent == 1:
+            top_level[name.strip()] = int(cumulative_us) / 1e6
+    return top_level, cumulative
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget', type=float, default=0.5, help='maximum import seconds per entry point')
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per entry point, the median is reported')
+    parser.add_argument('--top', type=int, default=10, help='heaviest modules to list')
+    args = parser.parse_args()
+
+    # Interpreter startup (site, .pth files) is paid by every command and not counted
+    _, startup = import_times([])
+    over_budget = []
+    for label, modules in ENTRY_POINTS.items():
+        runs = [import_times(modules) for _ in range(args.runs)]
+        total = statistics.median(sum(seconds for name, seconds in top_level.items() if name not in startup)
+                                  for top_level, _ in runs)
+        _, cumulative = runs[-1]
+        for name in startup:
+            cumulative.pop(name, None)
+        status = "ok" if total <= args.budget else "OVER BUDGET"
+        print(f'{label}: {total * 1000:.0f} ms imports, budget {args.budget * 1000:.0f} ms [{status}]')
+        for name, seconds in sorted(cumulative.items(), key=lambda item: -item[1])[:args.top]:
+            print(f'  {seconds * 1000:7.1f} ms  {name}')
+        if total > args.budget:
+            over_budget.append(label)
+
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
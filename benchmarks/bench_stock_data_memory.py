@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark the memory of analysis results: compact StockData vs. the plain dataclass it replaced.
+
+Both layouts are built for the same synthetic ETFs (10 top holdings out of a shared pool of companies,
+a yfinance-like sector allocation) and measured with tracemalloc after the inputs are freed, together
+with the size of the pickled list that the run journal and worker processes exchange.
+
+Usage:
+    python benchmarks/bench_stock_data_memory.py
+    python benchmarks/bench_stock_data_memory.py --etfs 20000 --companies 5000
+"""
+import argparse
+import gc
+import os
+import pickle
+import sys
+import tracemalloc
+from dataclasses import dataclass
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.logic.data.data import StockData, ProfitabilityData  # noqa: E402
+
+# Sector keys of yfinance's sector weightings
+SECTORS = ("realestate", "consumer_cyclical", "basic_materials", "consumer_defensive", "technology",
+           "communication_services", "financial_services", "utilities", "industrials", "energy", "healthcare")
+
+
+@dataclass
+class PlainStockData:
+    """Layout of StockData before it was slotted: a per-instance __dict__, an object array and a dict."""
+    ticker_symbol: str
+    stock_name: str
+    currency: str
+    current_price: float
+    predict_price: float
+    two_year_file_name: str
+    five_year_file_name: str
+    is_stock_growing: bool
+    industry: str
+    profitability_data: ProfitabilityData
+    beta: float
+    standard_deviation: float
+    dividend_yield: float
+    top_holdings: np.ndarray
+    sector_allocation: dict
+    average_daily_volume: float
+    assets_under_management: float
+    expense_ratio: float
+    description: str
+    prediction_uncertainty: float = 0.0
+
+
+def synthetic_fields(etfs: int, companies: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    for i in range(etfs):
+        holdings = rng.choice(companies, size=10, replace=False)
+        sectors = rng.dirichlet(np.ones(len(SECTORS)))
+        price = float(rng.uniform(5, 60))
+        yield dict(
+            ticker_symbol=f"SYN{i}.DE", stock_name=f"Synthetic ETF {i}", currency="EUR", current_price=price,
+            predict_price=price * 1.03, two_year_file_name=f"two_year_SYN{i}.png", five_year_file_name=f"five_year_SYN{i}.png",
+            is_stock_growing=True, industry="ETF", profitability_data=ProfitabilityData(0, 0, 0, 0, 0),
+            beta=1.0, standard_deviation=0.15, dividend_yield=0.01,
+            # yfinance's top holdings frame gives an object array of [name, percent] rows
+            top_holdings=np.array([[f"Company {c}", round(float(w), 4)] for c, w in zip(holdings, rng.uniform(0.01, 0.1, 10))], dtype=object),
+            sector_allocation={sector: round(float(w), 4) for sector, w in zip(SECTORS, sectors)},
+            average_daily_volume=1e6, assets_under_management=1e9, expense_ratio=0.002, description="",
+        )
+
+
+def measure(cls, etfs: int, companies: int):
+    gc.collect()
+    tracemalloc.start()
+    results = [cls(**fields) for fields in synthetic_fields(etfs, companies)]
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return retained, len(pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--etfs', type=int, default=5000, help='number of synthetic ETFs')
+    parser.add_argument('--companies', type=int, default=2000, help='companies the top holdings are drawn from')
+    args = parser.parse_args()
+
+    for label, cls in (('plain dataclass', PlainStockData), ('compact StockData', StockData)):
+        retained, pickled = measure(cls, args.etfs, args.companies)
+        print(f'{label}: {retained / 2 ** 20:.1f} MiB retained for {args.etfs} ETFs '
+              f'({retained / args.etfs:.0f} B each), pickled {pickled / 2 ** 20:.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
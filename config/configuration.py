@@ -6,4 +6,68 @@ TELEGRAM_TOKEN = config("TELEGRAM_TOKEN")
 GET_AND_INCREMENT_COUNTER_URL = config("GET_AND_INCREMENT_COUNTER_URL")
 APP_SCRIPT_ID = config("APP_SCRIPT_ID")
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
\ No newline at end of file
+# Bot API server; point it to a local Bot API or stub server for testing
+TELEGRAM_API_URL = config("TELEGRAM_API_URL", default="https://api.telegram.org")
+# Minimum seconds between two Telegram messages (Telegram allows about one per second in a chat)
+TELEGRAM_MIN_INTERVAL = config("TELEGRAM_MIN_INTERVAL", default=1.0, cast=float)
+# Retries of a failed Telegram message before it is given up
+TELEGRAM_MAX_RETRIES = config("TELEGRAM_MAX_RETRIES", default=5, cast=int)
+# Apps Script endpoint of the industry/ETF counters (empty = derived from APP_SCRIPT_ID)
+STATS_ENDPOINT_URL = config("STATS_ENDPOINT_URL", default="")
+# How counter increments are sent: "get" (one request per increment, 2 per ETF) or "post" (one JSON POST per
+# batch). Only "post" batches the requests; it needs an Apps Script doPost that takes {"increments": [...]}
+STATS_MODE = config("STATS_MODE", default="get")
+# Send the counter increments every N analysed ETFs (0 = once at the end of the run)
+STATS_FLUSH_EVERY = config("STATS_FLUSH_EVERY", default=0, cast=int)
+# Counter that picks the next ETF: "remote" (GET_AND_INCREMENT_COUNTER_URL) or "sqlite" (local file, works offline)
+COUNTER_BACKEND = config("COUNTER_BACKEND", default="remote")
+# SQLite file of the local counter
+COUNTER_PATH = config("COUNTER_PATH", default=".cache/counter.sqlite")
+
+# Parallel analysis of the ETF list (1 = run sequentially in the main process)
+ANALYSIS_WORKERS = config("ANALYSIS_WORKERS", default=1, cast=int)
+# Seconds to wait for a single ETF analysis before it is given up (0 = no timeout)
+ANALYSIS_TASK_TIMEOUT = config("ANALYSIS_TASK_TIMEOUT", default=900, cast=int)
+
+# Local SQLite store of downloaded price history (empty = always download the full history)
+PRICE_CACHE_PATH = config("PRICE_CACHE_PATH", default=".cache/price_history.sqlite")
+# Serve price history and metadata from the local stores only, without touching the network
+PRICE_CACHE_OFFLINE = config("PRICE_CACHE_OFFLINE", default=False, cast=bool)
+# Local SQLite store of ETF metadata (info, holdings, sectors) refreshed per field TTL (empty = always fetch live)
+METADATA_CACHE_PATH = config("METADATA_CACHE_PATH", default=".cache/metadata.sqlite")
+# Maximum number of tickers fetched in one grouped download request
+DOWNLOAD_CHUNK_SIZE = config("DOWNLOAD_CHUNK_SIZE", default=50, cast=int)
+# Directory of persisted Prophet models used to warm-start the next day's fit (empty = always fit from scratch)
+MODEL_STORE_DIR = config("MODEL_STORE_DIR", default=".cache/models")
+# Content-addressed cache of fitted models and forecasts, reused while a history is unchanged (empty = always fit)
+FORECAST_CACHE_DIR = config("FORECAST_CACHE_DIR", default=".cache/forecasts")
+# Size budget of the forecast cache in megabytes; the least recently used entries are evicted first (0 = no limit)
+FORECAST_CACHE_MAX_MB = config("FORECAST_CACHE_MAX_MB", default=512, cast=float)
+# Forecasting model: "prophet" or "fast" (NumPy-only trend + seasonality model, no Stan)
+FORECAST_ENGINE = config("FORECAST_ENGINE", default="prophet")
+# SQLite journal of batch runs that `main.py --resume` continues from (empty = no journal)
+RUN_JOURNAL_PATH = config("RUN_JOURNAL_PATH", default=".cache/run_journal.sqlite")
+# Columnar snapshot of the last run's analysis results that `main.py --reoptimize` optimizes again (empty = not saved)
+UNIVERSE_PATH = config("UNIVERSE_PATH", default=".cache/universe.npz")
+# Portfolio optimizer: "ga" (genetic algorithm) or "exact" (deterministic knapsack solver)
+OPTIMIZER_SOLVER = config("OPTIMIZER_SOLVER", default="ga")
+# Seed of the genetic algorithm for reproducible suggestions (empty = different result every run)
+OPTIMIZER_SEED = config("OPTIMIZER_SEED", default="", cast=lambda value: int(value) if value else None)
+# Run the risk-aware and profit-only genetic algorithms in two worker processes
+OPTIMIZER_PARALLEL = config("OPTIMIZER_PARALLEL", default=True, cast=bool)
+# How the genetic algorithm scores each generation: "serial", "multiprocessing" or "futures"
+OPTIMIZER_EVALUATION_BACKEND = config("OPTIMIZER_EVALUATION_BACKEND", default="serial")
+# Worker processes of the evaluation pool (0 = number of CPUs)
+OPTIMIZER_EVALUATION_WORKERS = config("OPTIMIZER_EVALUATION_WORKERS", default=0, cast=int)
+# Maximum number of share vectors whose fitness is memoized during one GA run (0 = no cache)
+OPTIMIZER_FITNESS_CACHE_SIZE = config("OPTIMIZER_FITNESS_CACHE_SIZE", default=100000, cast=int)
+# Wall-clock seconds after which a GA run stops even if it is still improving (0 = no limit)
+OPTIMIZER_TIME_BUDGET = config("OPTIMIZER_TIME_BUDGET", default=0, cast=float)
+# Island-model GA: number of populations evolving in separate processes (1 = single population)
+OPTIMIZER_ISLANDS = config("OPTIMIZER_ISLANDS", default=1, cast=int)
+# Generations between migrations of the best individuals across islands
+OPTIMIZER_MIGRATION_INTERVAL = config("OPTIMIZER_MIGRATION_INTERVAL", default=25, cast=int)
+# Where migrants go: "ring" (next island) or "random" (a random other island)
+OPTIMIZER_MIGRATION_TOPOLOGY = config("OPTIMIZER_MIGRATION_TOPOLOGY", default="ring")
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -1,4 +1,4 @@
-import config.de_etf_list as de_etf_list
+import importlib
 
 sp500 = ['AOS', 'ABBV', 'ABMD', 'ACN', 'ATVI', 'ADM', 'ADP', 'AAP', 'AIG', 'APD', 'AKAM', 'ALK', 'ALB', 'ARE',
                    'ALGN', 'ALLE', 'LNT', 'ALL', 'GOOGL', 'GOOG', 'MO', 'AMZN', 'AMCR', 'AMD', 'AEE', 'AAL', 'AEP',
@@ -787,4 +787,12 @@ vanguard_etf_list = [
 ]
 
 # etf_list = ishares_etf_list + vanguard_etf_list
-etf_list = de_etf_list.scalable_capital_etfs
+
+
+def __getattr__(name):
+    # `etf_list` comes from the large config/de_etf_list.py, which is only loaded when a batch run reads it
+    if name == 'etf_list':
+        etf_list = importlib.import_module('config.de_etf_list').scalable_capital_etfs
+        globals()['etf_list'] = etf_list
+        return etf_list
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,20 +1,74 @@
-import logging
+import argparse
 
-from src.logic import stock_finder
-from src.logic.data import data
+import config.configuration as configuration
+from src.logic.data.universe import Universe
 from src.adapter.out.notify import notifier
-from src.adapter.out.optimization import optimizer
-from config.stock_names import etf_list
+from src.infrastructure.utils.lazy import lazy_import
+
+# Only a full run needs the analysis pipeline (yfinance, Prophet, matplotlib) and the ETF list, and
+# --notify does not need the optimizer either; they are imported when first used
+stock_finder = lazy_import("src.logic.stock_finder")
+run_journal = lazy_import("src.adapter.out.journal.run_journal")
+stats_calculator = lazy_import("src.adapter.out.stats.stats_calculator")
+optimizer = lazy_import("src.adapter.out.optimization.optimizer")
+stock_names = lazy_import("config.stock_names")
+stock_picker = lazy_import("src.adapter.out.stock_pick.stock_picker")
+
+
+def optimize(universe: Universe) -> str:
+    return optimizer.optimize(universe,
+                              solver=configuration.OPTIMIZER_SOLVER,
+                              seed=configuration.OPTIMIZER_SEED,
+                              parallel=configuration.OPTIMIZER_PARALLEL,
+                              evaluation_backend=configuration.OPTIMIZER_EVALUATION_BACKEND,
+                              evaluation_workers=configuration.OPTIMIZER_EVALUATION_WORKERS or None,
+                              time_budget=configuration.OPTIMIZER_TIME_BUDGET or None,
+                              islands=configuration.OPTIMIZER_ISLANDS,
+                              migration_interval=configuration.OPTIMIZER_MIGRATION_INTERVAL,
+                              migration_topology=configuration.OPTIMIZER_MIGRATION_TOPOLOGY)
+
 
 if __name__ == '__main__':
-    notifier.send_text_message("=================")
-    
-    analyses_results = []
-    for etf in etf_list:
-        try:
-            analyses_result = stock_finder.run(etf)
-            analyses_results.append(analyses_result)
-        except data.SkipException as e:
-            logging.error(e)
-    optimization_result = optimizer.optimize(analyses_results)
-    notifier.send_text_message(optimization_result)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Analyse the ETF list and suggest a portfolio")
+    parser.add_argument('--resume', action='store_true',
+                        help='continue the last unfinished run: skip ETFs it already analysed and sent')
+    parser.add_argument('--reoptimize', action='store_true',
+                        help='only optimize the universe saved by the last run again and send the suggestion')
+    parser.add_argument('--notify', metavar='TEXT',
+                        help='only send TEXT to the Telegram chat')
+    parser.add_argument('--pick', type=int, metavar='N',
+                        help='analyse only the next N ETFs of the shared counter instead of the whole list')
+    args = parser.parse_args()
+    if args.pick is not None and args.pick < 1:
+        parser.error('--pick needs at least one ETF')
+    if args.pick is not None and args.resume:
+        parser.error('--resume continues the ETFs of the last run; it cannot be combined with --pick')
+
+    if args.notify is not None:
+        notifier.send_text_message(args.notify)
+        notifier.flush()
+        raise SystemExit
+
+    if args.reoptimize:
+        notifier.send_text_message(optimize(Universe.load(configuration.UNIVERSE_PATH)))
+        notifier.flush()
+        raise SystemExit
+
+    journal = run_journal.start(configuration.RUN_JOURNAL_PATH, resume=args.resume) if configuration.RUN_JOURNAL_PATH else None
+    if journal is None or not journal.resumed:
+        notifier.send_text_message("=================")
+
+    etfs = stock_picker.pick_many(args.pick) if args.pick is not None else stock_names.etf_list
+    outcomes = stock_finder.run_many(etfs,
+                                     workers=configuration.ANALYSIS_WORKERS,
+                                     task_timeout=configuration.ANALYSIS_TASK_TIMEOUT,
+                                     chunk_size=configuration.DOWNLOAD_CHUNK_SIZE,
+                                     journal=journal)
+    stats_calculator.flush()
+    universe = Universe.from_stock_data([outcome.result for outcome in outcomes if outcome.is_success()])
+    if configuration.UNIVERSE_PATH:
+        universe.save(configuration.UNIVERSE_PATH)
+    optimization_result = optimize(universe)
+    notifier.send_text_message(optimization_result,
+                               on_delivered=(lambda: run_journal.finish(journal)) if journal is not None else None)
+    notifier.flush()
@@ -2,10 +2,7 @@ import pandas as pd
 
 from src.logic.data.data import StockData, StockInfo, ProfitabilityData
 
-from prophet import Prophet
-import matplotlib.pyplot as plt
-
-def analyses(ticker_symbol: str, stock_info: StockInfo, two_year_prophet: Prophet, two_year_predicted_prices: pd.DataFrame, five_year_prophet: Prophet, five_year_predicted_prices: pd.DataFrame) -> StockData:
+def analyses(ticker_symbol: str, stock_info: StockInfo, two_year_predicted_prices: pd.DataFrame, five_year_predicted_prices: pd.DataFrame) -> StockData:
     current_price = __last_price(stock_info.historic_data, "y")
     two_year_last_predicted_price = __last_price(two_year_predicted_prices, "yhat")
     five_year_last_predicted_price = __last_price(five_year_predicted_prices, "yhat")
@@ -23,13 +20,9 @@ def analyses(ticker_symbol: str, stock_info: StockInfo, two_year_prophet: Prophe
     
     is_stock_growing = __is_stock_growing(current_price, two_year_last_predicted_price, five_year_last_predicted_price, stock_info.historic_data)
     
-    two_year_prophet.plot(two_year_predicted_prices)
+    # Names of the forecast charts; they are rendered in memory only if the ETF is sent
     two_year_file_name = f'two_year_{ticker_symbol}.png'
-    plt.savefig(two_year_file_name)
-
-    five_year_prophet.plot(five_year_predicted_prices)
     five_year_file_name = f'five_year_{ticker_symbol}.png'
-    plt.savefig(five_year_file_name)
 
     # Extract data from FundsData with proper None handling
     funds_data = stock_info.ticker.funds_data
@@ -1,38 +1,265 @@
-import yfinance as yf
 import json
+import logging
 import urllib
+import numpy as np
 import pandas as pd
+from typing import Dict, List, Optional, Tuple
 
+import config.configuration as configuration
+from src.adapter.out.download import history_cache, metadata_cache
 from src.infrastructure.utils import utils
+from src.infrastructure.utils.lazy import lazy_import
 from src.logic.data.data import StockInfo
 from src.logic.data import data
 
+# Importing yfinance takes a noticeable part of the startup; only downloads need it
+yf = lazy_import("yfinance")
+
+# Relative difference between the downloaded and the cached close of the same day above which the
+# cached closes are taken to be on an outdated adjustment basis (e.g. before a dividend or split)
+READJUSTMENT_TOLERANCE = 1e-4
+
 
 def __search_stocks(stock_name_query):
     response = urllib.request.urlopen(f'https://query2.finance.yahoo.com/v1/finance/search?q={stock_name_query}')
     content = response.read()
     return [i['symbol'] for i in json.loads(content.decode('utf8'))['quotes']]
 
+def ticker(stock_name: str):
+    return __with_metadata_cache(yf.Ticker(stock_name))
+
+
+def __with_metadata_cache(stock):
+    """Serve `info` and `funds_data` of a ticker from the local metadata cache when one is configured."""
+    if not configuration.METADATA_CACHE_PATH:
+        return stock
+    return metadata_cache.CachedTicker(stock, configuration.METADATA_CACHE_PATH, offline=configuration.PRICE_CACHE_OFFLINE)
+
+
 def download_stock_data(
-        stock_name: str, 
-        start_date: str = utils.current_date_str(), 
+        stock_name: str,
+        start_date: str = utils.current_date_str(),
         end_date=utils.next_day(1)
         ) -> StockInfo:
     stock = yf.Ticker(stock_name)
+    today = utils.current_date_str()
+
+    cached = __load_cached(stock_name)
+    fetch_start = __fetch_start(stock_name, cached, start_date, today)
+    hist = stock.history(start=fetch_start, end=end_date) if fetch_start is not None else None
+    if __is_readjusted(stock_name, cached, hist, fetch_start):
+        fetch_start = cached.covered_from
+        hist = stock.history(start=fetch_start, end=end_date)
+    historic_data = __merge_with_cache(stock_name, cached, hist, fetch_start, today)
+
+    return StockInfo(
+        historic_data=__window(stock_name, historic_data, start_date, end_date),
+        ticker=__with_metadata_cache(stock))
+
+
+def download_many(
+        stock_names: List[str],
+        start_date: str = utils.current_date_str(),
+        end_date=utils.next_day(1),
+        chunk_size: int = 50
+        ) -> Tuple[Dict[str, StockInfo], Dict[str, Exception]]:
+    """
+    Download the history of many tickers with grouped multi-ticker requests.
+
+    Tickers are split into chunks of `chunk_size` and every chunk is fetched with a single
+    `yf.download` call. Tickers that can be served from the local price cache are not requested.
+    A chunk whose request fails is retried in smaller parts, so only the tickers that cannot be
+    downloaded on their own are reported as failed. A ticker whose earlier closes were adjusted
+    since they were cached is downloaded again on its own from the start of its cached history.
+
+    Args:
+        stock_names: Tickers to download
+        start_date: First day of the history
+        end_date: Day after the last day of the history
+        chunk_size: Maximum number of tickers per request
+
+    Returns:
+        Tuple of (StockInfo per downloaded ticker, error per failed ticker), both in input order
+    """
+    today = utils.current_date_str()
+    cached_histories = {}
+    failures = {}
+    # Tickers topped up from the same day share one request
+    plans: Dict[Optional[str], List[str]] = {}
+    for stock_name in stock_names:
+        try:
+            if stock_name != stock_name.strip() or ' ' in stock_name:
+                raise data.SkipException(f'Invalid ticker symbol: {stock_name!r}')
+            cached = __load_cached(stock_name)
+            fetch_start = __fetch_start(stock_name, cached, start_date, today)
+        except data.SkipException as e:
+            failures[stock_name] = e
+            continue
+        cached_histories[stock_name] = cached
+        plans.setdefault(fetch_start, []).append(stock_name)
+
+    stock_infos = {}
+    for fetch_start, names in plans.items():
+        for chunk_start in range(0, len(names), chunk_size):
+            chunk = names[chunk_start:chunk_start + chunk_size]
+            if fetch_start is None:
+                histories, chunk_errors = {}, {}
+            else:
+                histories, chunk_errors = __download_chunk(chunk, fetch_start, end_date)
+            for stock_name in chunk:
+                if stock_name in chunk_errors:
+                    failures[stock_name] = chunk_errors[stock_name]
+                    continue
+                hist = histories.get(stock_name, pd.DataFrame()) if fetch_start is not None else None
+                cached = cached_histories[stock_name]
+                history_start = fetch_start
+                if __is_readjusted(stock_name, cached, hist, fetch_start):
+                    history_start = cached.covered_from
+                    refetched, refetch_errors = __download_chunk([stock_name], history_start, end_date)
+                    if stock_name in refetch_errors:
+                        failures[stock_name] = refetch_errors[stock_name]
+                        continue
+                    hist = refetched.get(stock_name, pd.DataFrame())
+                try:
+                    historic_data = __merge_with_cache(stock_name, cached, hist, history_start, today)
+                    stock_infos[stock_name] = StockInfo(
+                        historic_data=__window(stock_name, historic_data, start_date, end_date),
+                        ticker=ticker(stock_name))
+                except data.SkipException as e:
+                    failures[stock_name] = e
+
+    for stock_name, error in failures.items():
+        logging.error(f"Download of `{stock_name}` failed: {error}")
+    return (
+        {name: stock_infos[name] for name in stock_names if name in stock_infos},
+        {name: failures[name] for name in stock_names if name in failures},
+    )
+
+
+def __download_chunk(stock_names: List[str], start_date: str, end_date: str) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Exception]]:
+    """
+    Fetch one chunk of tickers and split the grouped frame into per-ticker histories.
+
+    When the grouped request fails, both halves of the chunk are retried on their own, down to single
+    tickers that are fetched with `Ticker.history`; the error of each ticker that still fails is returned.
+    """
+    try:
+        raw = yf.download(stock_names, start=start_date, end=end_date, group_by='ticker',
+                          auto_adjust=True, threads=True, progress=False)
+    except Exception as e:
+        if len(stock_names) == 1:
+            return __download_single(stock_names[0], start_date, end_date)
+        logging.warning(f"Grouped download of {len(stock_names)} tickers failed, retrying them in halves: {e}")
+        middle = len(stock_names) // 2
+        histories, errors = __download_chunk(stock_names[:middle], start_date, end_date)
+        second_histories, second_errors = __download_chunk(stock_names[middle:], start_date, end_date)
+        return {**histories, **second_histories}, {**errors, **second_errors}
+    if raw is None or raw.empty:
+        return {}, {}
+
+    histories = {}
+    if not isinstance(raw.columns, pd.MultiIndex):
+        histories[stock_names[0]] = raw.dropna(subset=['Close'])
+        return histories, {}
+    downloaded = set(raw.columns.get_level_values(0))
+    for stock_name in stock_names:
+        if stock_name in downloaded:
+            histories[stock_name] = raw[stock_name].dropna(subset=['Close'])
+    return histories, {}
 
-    hist = stock.history(start=start_date, end=end_date)
-    if hist.empty:
+
+def __download_single(stock_name: str, start_date: str, end_date: str) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Exception]]:
+    try:
+        return {stock_name: yf.Ticker(stock_name).history(start=start_date, end=end_date)}, {}
+    except Exception as e:
+        return {}, {stock_name: data.SkipException(f'Download failed: {e}')}
+
+
+def __load_cached(stock_name: str) -> Optional[history_cache.CachedHistory]:
+    if not configuration.PRICE_CACHE_PATH:
+        return None
+    return history_cache.load(configuration.PRICE_CACHE_PATH, stock_name)
+
+
+def __fetch_start(stock_name: str, cached: Optional[history_cache.CachedHistory], start_date: str, today: str) -> Optional[str]:
+    """Day to download the history from, or None when the local cache alone serves the request."""
+    if configuration.PRICE_CACHE_PATH and configuration.PRICE_CACHE_OFFLINE:
+        if cached is None:
+            raise data.SkipException(f'No cached history for a stock in offline mode: {stock_name}')
+        return None
+    if cached is None or cached.covered_from > start_date:
+        return start_date
+    if cached.fetched_on >= today:
+        return None
+    # Re-download from the last settled day on: the close of the last cached day may have been taken
+    # intraday, and comparing a settled close shows whether the earlier closes were adjusted since
+    return cached.settled_date()
+
+
+def __is_readjusted(stock_name: str, cached: Optional[history_cache.CachedHistory], hist: Optional[pd.DataFrame], fetch_start: Optional[str]) -> bool:
+    """
+    Whether a top-up disagrees with the cache on the close of the day they overlap on.
+
+    Closes are downloaded adjusted, so a dividend or split changes every close before it. Appending
+    the top-up to such a history would mix two adjustment bases, so the whole history is needed again.
+    """
+    if cached is None or hist is None or hist.empty or fetch_start <= cached.covered_from:
+        return False
+    downloaded = __clean_history(hist)
+    downloaded_close = downloaded.loc[downloaded["ds"] == pd.Timestamp(fetch_start), "y"]
+    cached_close = cached.historic_data.loc[cached.historic_data["ds"] == pd.Timestamp(fetch_start), "y"]
+    if downloaded_close.empty or cached_close.empty:
+        return False
+    if np.isclose(downloaded_close.iloc[0], cached_close.iloc[0], rtol=READJUSTMENT_TOLERANCE, atol=0):
+        return False
+    logging.info(f"Adjusted closes of `{stock_name}` changed since they were cached, downloading its whole history again")
+    return True
+
+
+def __merge_with_cache(stock_name: str, cached: Optional[history_cache.CachedHistory], hist: Optional[pd.DataFrame], fetch_start: Optional[str], today: str) -> pd.DataFrame:
+    """
+    Combine freshly downloaded rows with the cached history and write them back to the cache.
+
+    `hist` replaces the cached history when it was downloaded from the start the cache covers (or
+    earlier), otherwise it is a top-up appended to it.
+    """
+    path = configuration.PRICE_CACHE_PATH
+    if hist is None:
+        return cached.historic_data
+
+    if cached is None or fetch_start <= cached.covered_from:
+        if hist.empty:
+            raise data.SkipException(f'History data is empty for a stock: {stock_name}')
+        historic_data = __clean_history(hist)
+        if not path:
+            return historic_data
+        history_cache.store(path, stock_name, historic_data, covered_from=fetch_start, fetched_on=today, replace=True)
+        return history_cache.to_historic_data(zip(historic_data["ds"], historic_data["y"]))
+
+    tail = __clean_history(hist) if not hist.empty else cached.historic_data.tail(0)
+    history_cache.store(path, stock_name, tail, covered_from=cached.covered_from, fetched_on=today)
+    return history_cache.to_historic_data(
+        list(zip(cached.historic_data["ds"], cached.historic_data["y"])) + list(zip(tail["ds"], tail["y"]))
+    )
+
+
+def __window(stock_name: str, historic_data: pd.DataFrame, start_date: str, end_date: str) -> pd.DataFrame:
+    if configuration.PRICE_CACHE_PATH:
+        historic_data = historic_data.loc[
+            (historic_data["ds"] >= pd.Timestamp(start_date)) & (historic_data["ds"] < pd.Timestamp(end_date))
+        ]
+    if historic_data.empty:
         raise data.SkipException(f'History data is empty for a stock: {stock_name}')
-    
+    return historic_data
+
+
+def __clean_history(hist: pd.DataFrame) -> pd.DataFrame:
     hist = hist[~hist.index.duplicated(keep='first')]
-    
+
     historic_data = hist["Close"].to_frame("y")
     historic_data["ds"] = pd.to_datetime(historic_data.index.date)
     historic_data = historic_data.drop_duplicates(subset=['ds'], keep='last')
-    
+
     # Ensure index is sorted just in case
     historic_data = historic_data.sort_index()
-    
-    return StockInfo(
-        historic_data=historic_data, 
-        ticker=stock)
+    return historic_data
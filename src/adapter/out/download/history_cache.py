@@ -0,0 +1,112 @@
+import os
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+from typing import List, Optional
+
+import pandas as pd
+
+# Price history is stored as one row per (ticker, trading day); the meta table remembers
+# which start date the stored history covers and when it was last topped up from the network.
+__SCHEMA = """
+CREATE TABLE IF NOT EXISTS price_history (
+    ticker TEXT NOT NULL,
+    ds TEXT NOT NULL,
+    y REAL NOT NULL,
+    PRIMARY KEY (ticker, ds)
+);
+CREATE TABLE IF NOT EXISTS price_history_meta (
+    ticker TEXT PRIMARY KEY,
+    covered_from TEXT NOT NULL,
+    fetched_on TEXT NOT NULL
+);
+"""
+
+
+@dataclass
+class CachedHistory:
+    historic_data: pd.DataFrame
+    covered_from: str
+    fetched_on: str
+
+    def last_date(self) -> str:
+        return str(self.historic_data["ds"].iloc[-1].date())
+
+    def settled_date(self) -> str:
+        """Last day whose cached close was final when it was stored; the close of the last day may have been taken intraday."""
+        return str(self.historic_data["ds"].iloc[-2 if len(self.historic_data) > 1 else -1].date())
+
+
+def __connect(path: str) -> sqlite3.Connection:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Several analysis workers may read and write the same file concurrently
+    connection = sqlite3.connect(path, timeout=60)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(__SCHEMA)
+    return connection
+
+
+def load(path: str, ticker: str) -> Optional[CachedHistory]:
+    """
+    Load the cached history of a ticker.
+
+    Returns:
+        CachedHistory with a `historic_data` frame (columns 'y' and 'ds', indexed by 'ds') or None if nothing is cached
+    """
+    if not os.path.exists(path):
+        return None
+    with closing(__connect(path)) as connection:
+        meta = connection.execute(
+            "SELECT covered_from, fetched_on FROM price_history_meta WHERE ticker = ?", (ticker,)
+        ).fetchone()
+        if meta is None:
+            return None
+        rows = connection.execute(
+            "SELECT ds, y FROM price_history WHERE ticker = ? ORDER BY ds", (ticker,)
+        ).fetchall()
+    if not rows:
+        return None
+    return CachedHistory(historic_data=to_historic_data(rows), covered_from=meta[0], fetched_on=meta[1])
+
+
+def tickers(path: str) -> List[str]:
+    """Tickers with a cached history, sorted."""
+    if not os.path.exists(path):
+        return []
+    with closing(__connect(path)) as connection:
+        return [row[0] for row in connection.execute("SELECT ticker FROM price_history_meta ORDER BY ticker")]
+
+
+def store(path: str, ticker: str, historic_data: pd.DataFrame, covered_from: str, fetched_on: str, replace: bool = False):
+    """
+    Write price rows of a ticker to the cache.
+
+    Args:
+        path: SQLite file of the cache
+        ticker: Ticker symbol the rows belong to
+        historic_data: Frame with 'ds' and 'y' columns; rows for already cached days overwrite the old values
+        covered_from: Earliest requested start date the cached history is complete from
+        fetched_on: Date of the download the rows come from
+        replace: Drop everything cached for the ticker before writing
+    """
+    rows = [(ticker, str(ds.date()), float(y)) for ds, y in zip(historic_data["ds"], historic_data["y"])]
+    with closing(__connect(path)) as connection, connection:
+        if replace:
+            connection.execute("DELETE FROM price_history WHERE ticker = ?", (ticker,))
+        connection.executemany("INSERT OR REPLACE INTO price_history (ticker, ds, y) VALUES (?, ?, ?)", rows)
+        connection.execute(
+            "INSERT OR REPLACE INTO price_history_meta (ticker, covered_from, fetched_on) VALUES (?, ?, ?)",
+            (ticker, covered_from, fetched_on),
+        )
+
+
+def to_historic_data(rows) -> pd.DataFrame:
+    """Build a `historic_data` frame (deduplicated, sorted, indexed by 'ds') from (ds, y) pairs."""
+    historic_data = pd.DataFrame(rows, columns=["ds", "y"])
+    historic_data["ds"] = pd.to_datetime(historic_data["ds"])
+    historic_data["y"] = historic_data["y"].astype(float)
+    historic_data = historic_data.drop_duplicates(subset=["ds"], keep="last").sort_values("ds")
+    historic_data.index = pd.DatetimeIndex(historic_data["ds"].values)
+    return historic_data[["y", "ds"]]
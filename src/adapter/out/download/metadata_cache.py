@@ -0,0 +1,155 @@
+import io
+import json
+import logging
+import os
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+# One row per (ticker, field) with the JSON encoded value and the day it was fetched
+__SCHEMA = """
+CREATE TABLE IF NOT EXISTS ticker_metadata (
+    ticker TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT NOT NULL,
+    fetched_on TEXT NOT NULL,
+    PRIMARY KEY (ticker, field)
+);
+"""
+
+# Days a cached field stays fresh. `info` carries daily figures such as averageVolume and yield,
+# the fund composition changes monthly at most.
+FIELD_TTL_DAYS = {
+    'info': 1,
+    'top_holdings': 30,
+    'sector_weightings': 30,
+    'fund_overview': 30,
+    'description': 30,
+}
+
+FUNDS_FIELDS = ('top_holdings', 'sector_weightings', 'fund_overview', 'description')
+
+
+@dataclass
+class CachedField:
+    value: Any
+    fetched_on: str
+
+    def is_fresh(self, ttl_days: int, today: date) -> bool:
+        return (today - date.fromisoformat(self.fetched_on)).days < ttl_days
+
+
+@dataclass
+class FundsSnapshot:
+    """The `yf.Ticker.funds_data` attributes the analyzer reads."""
+    top_holdings: pd.DataFrame = field(default_factory=pd.DataFrame)
+    sector_weightings: dict = field(default_factory=dict)
+    fund_overview: dict = field(default_factory=dict)
+    description: str = ''
+
+
+@dataclass
+class TickerSnapshot:
+    """Stand-in for `yf.Ticker` with fixed `info` and `funds_data`, e.g. for offline tests."""
+    info: dict = field(default_factory=dict)
+    funds_data: FundsSnapshot = field(default_factory=FundsSnapshot)
+
+
+def __connect(path: str) -> sqlite3.Connection:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(path, timeout=60)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(__SCHEMA)
+    return connection
+
+
+def load(path: str, ticker: str) -> Dict[str, CachedField]:
+    """Load all cached metadata fields of a ticker, whatever their age."""
+    if not os.path.exists(path):
+        return {}
+    with closing(__connect(path)) as connection:
+        rows = connection.execute(
+            "SELECT field, value, fetched_on FROM ticker_metadata WHERE ticker = ?", (ticker,)
+        ).fetchall()
+    return {name: CachedField(__decode(name, value), fetched_on) for name, value, fetched_on in rows}
+
+
+def store(path: str, ticker: str, name: str, value: Any, fetched_on: str):
+    with closing(__connect(path)) as connection, connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO ticker_metadata (ticker, field, value, fetched_on) VALUES (?, ?, ?, ?)",
+            (ticker, name, __encode(name, value), fetched_on),
+        )
+
+
+def __encode(name: str, value: Any) -> str:
+    if name == 'top_holdings':
+        return value.to_json(orient='split')
+    return json.dumps(value, default=str)
+
+
+def __decode(name: str, text: str) -> Any:
+    if name == 'top_holdings':
+        return pd.read_json(io.StringIO(text), orient='split')
+    return json.loads(text)
+
+
+class CachedTicker:
+    """
+    `yf.Ticker` whose `info` and `funds_data` are read through the local metadata cache.
+
+    A field is fetched from Yahoo only when it is missing or older than its FIELD_TTL_DAYS. If the
+    fetch fails, a stale cached value is used instead. In offline mode, cached values are used
+    whatever their age, and missing ones are empty. Every other attribute (e.g. `history`) is
+    taken from the live ticker.
+    """
+
+    def __init__(self, ticker, path: str, offline: bool = False):
+        self._ticker = ticker
+        self._path = path
+        self._offline = offline
+        self._cached: Optional[Dict[str, CachedField]] = None
+
+    def __getattr__(self, name: str):
+        return getattr(self._ticker, name)
+
+    @property
+    def info(self) -> dict:
+        return self._field('info', lambda: self._ticker.info, {})
+
+    @property
+    def funds_data(self) -> FundsSnapshot:
+        defaults = FundsSnapshot()
+        return FundsSnapshot(**{
+            name: self._field(name, lambda name=name: getattr(self._ticker.funds_data, name), getattr(defaults, name))
+            for name in FUNDS_FIELDS
+        })
+
+    def _field(self, name: str, fetch, default):
+        if self._cached is None:
+            self._cached = load(self._path, self._ticker.ticker)
+        cached = self._cached.get(name)
+        today = date.today()
+        if cached is not None and (self._offline or cached.is_fresh(FIELD_TTL_DAYS[name], today)):
+            return cached.value
+        if self._offline:
+            return default
+
+        try:
+            value = fetch()
+        except Exception as e:
+            if cached is None:
+                raise
+            logging.error(f"Refreshing `{name}` of `{self._ticker.ticker}` failed, using the copy from {cached.fetched_on}: {e}")
+            return cached.value
+        if value is None:
+            return default
+        store(self._path, self._ticker.ticker, name, value, str(today))
+        self._cached[name] = CachedField(value, str(today))
+        return value
@@ -0,0 +1,142 @@
+import logging
+import os
+import pickle
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional
+
+from src.logic.data.data import StockData
+
+# One row per batch run, and one row per analysed ETF of a run with the pickled StockData and
+# the side effects (Telegram notification, stats counter) that have already been carried out
+__SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    finished_at TEXT
+);
+CREATE TABLE IF NOT EXISTS run_results (
+    run_id TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    result BLOB,
+    notified INTEGER NOT NULL DEFAULT 0,
+    counted INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (run_id, ticker)
+);
+"""
+
+SIDE_EFFECTS = ('notified', 'counted')
+
+
+@dataclass(frozen=True)
+class RunJournal:
+    """Handle of one batch run in the journal; small enough to be passed to analysis worker processes."""
+    path: str
+    run_id: str
+    resumed: bool = False
+
+
+@dataclass
+class JournalEntry:
+    result: Optional[StockData] = None
+    notified: bool = False
+    counted: bool = False
+
+    def is_complete(self) -> bool:
+        return self.result is not None and self.notified and self.counted
+
+
+def __connect(path: str) -> sqlite3.Connection:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Analysis workers record their results concurrently
+    connection = sqlite3.connect(path, timeout=60)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(__SCHEMA)
+    return connection
+
+
+def start(path: str, resume: bool = False) -> RunJournal:
+    """
+    Open the journal of a batch run.
+
+    Args:
+        path: SQLite file of the journal
+        resume: Continue the latest unfinished run instead of starting a new one. When every run is
+            finished, a new one is started.
+    """
+    with closing(__connect(path)) as connection, connection:
+        if resume:
+            row = connection.execute(
+                "SELECT run_id FROM runs WHERE finished_at IS NULL ORDER BY started_at DESC LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                return RunJournal(path, row[0], resumed=True)
+        started_at = datetime.now().isoformat(timespec='microseconds')
+        connection.execute("INSERT INTO runs (run_id, started_at) VALUES (?, ?)", (started_at, started_at))
+    return RunJournal(path, started_at)
+
+
+def entries(journal: RunJournal) -> Dict[str, JournalEntry]:
+    """Everything recorded for the ETFs of the run, by ticker."""
+    with closing(__connect(journal.path)) as connection:
+        rows = connection.execute(
+            "SELECT ticker, result, notified, counted FROM run_results WHERE run_id = ?", (journal.run_id,)
+        ).fetchall()
+    return {ticker: __to_entry(ticker, result, notified, counted) for ticker, result, notified, counted in rows}
+
+
+def entry(journal: RunJournal, ticker: str) -> JournalEntry:
+    """What has been recorded for one ETF of the run (an empty entry if nothing)."""
+    with closing(__connect(journal.path)) as connection:
+        row = connection.execute(
+            "SELECT result, notified, counted FROM run_results WHERE run_id = ? AND ticker = ?", (journal.run_id, ticker)
+        ).fetchone()
+    return JournalEntry() if row is None else __to_entry(ticker, *row)
+
+
+def record_result(journal: RunJournal, ticker: str, result: StockData):
+    with closing(__connect(journal.path)) as connection, connection:
+        connection.execute(
+            "INSERT INTO run_results (run_id, ticker, result) VALUES (?, ?, ?) "
+            "ON CONFLICT (run_id, ticker) DO UPDATE SET result = excluded.result",
+            (journal.run_id, ticker, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)),
+        )
+
+
+def record_side_effect(journal: RunJournal, ticker: str, side_effect: str):
+    """Record that one of SIDE_EFFECTS has been carried out for an ETF, so a resumed run does not repeat it."""
+    if side_effect not in SIDE_EFFECTS:
+        raise ValueError(f"Unknown side effect `{side_effect}`, expected one of {SIDE_EFFECTS}")
+    with closing(__connect(journal.path)) as connection, connection:
+        connection.execute(
+            f"INSERT INTO run_results (run_id, ticker, {side_effect}) VALUES (?, ?, 1) "
+            f"ON CONFLICT (run_id, ticker) DO UPDATE SET {side_effect} = 1",
+            (journal.run_id, ticker),
+        )
+
+
+def finish(journal: RunJournal):
+    """Mark the run as done; a later resume starts a new run."""
+    with closing(__connect(journal.path)) as connection, connection:
+        connection.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?",
+                           (datetime.now().isoformat(timespec='seconds'), journal.run_id))
+
+
+def __to_entry(ticker: str, result: Optional[bytes], notified: int, counted: int) -> JournalEntry:
+    return JournalEntry(result=__unpickle_result(ticker, result), notified=bool(notified), counted=bool(counted))
+
+
+def __unpickle_result(ticker: str, result: Optional[bytes]) -> Optional[StockData]:
+    if result is None:
+        return None
+    try:
+        return pickle.loads(result)
+    except Exception as e:
+        # E.g. a result pickled before StockData became a slotted dataclass; the ETF is analysed again,
+        # and the side effects already recorded for it are not repeated
+        logging.warning(f"Cannot read the journaled result of `{ticker}`, it will be analysed again: {e}")
+        return None
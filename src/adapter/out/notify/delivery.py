@@ -0,0 +1,136 @@
+import atexit
+import io
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from src.infrastructure.utils.lazy import lazy_import
+
+telepot = lazy_import("telepot")
+telepot_api = lazy_import("telepot.api")
+telepot_exception = lazy_import("telepot.exception")
+
+DEFAULT_API_URL = "https://api.telegram.org"
+
+
+def set_api_url(api_url: str):
+    """Send all Bot API calls to `api_url` instead of api.telegram.org, e.g. a local Bot API or stub server."""
+    base_url = api_url.rstrip('/')
+    telepot_api._methodurl = lambda req, **user_kw: f'{base_url}/bot{req[0]}/{req[1]}'
+
+
+@dataclass
+class Delivery:
+    method: str
+    kwargs: dict
+    attachments: List[io.IOBase] = field(default_factory=list)
+    on_delivered: Optional[Callable[[], None]] = None
+
+
+class DeliveryQueue:
+    """
+    Sends Telegram messages from a background thread so that the analysis never waits for the network.
+
+    One bot is created per queue and all calls go through telepot's pooled HTTP connections, without a
+    `getMe` round trip before every message. Sends are paced at least `min_interval` seconds apart
+    (Telegram allows about one message per second in a chat). A 429 answer is retried after the
+    `retry_after` Telegram asks for, other failures except 4xx errors with exponential backoff. Attached
+    buffers are closed once their message is delivered or given up.
+
+    The queue is drained when the process exits. Telegram's limit is per chat, so a run needs exactly one
+    queue; analysis pool workers hand their results back instead of sending them.
+    """
+
+    def __init__(self, token: str, min_interval: float = 1.0, max_retries: int = 5, backoff: float = 1.0):
+        self.pid = os.getpid()
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._bot = telepot.Bot(token)
+        self._queue: queue.Queue = queue.Queue()
+        self._last_sent = 0.0
+        self._closed = False
+        self._thread = threading.Thread(target=self._deliver_forever, name="telegram-delivery", daemon=True)
+        self._thread.start()
+        # The thread is a daemon, so drain the queue before the interpreter exits
+        atexit.register(self.close)
+
+    def submit(self, method: str, attachments: Optional[List[io.IOBase]] = None,
+               on_delivered: Optional[Callable[[], None]] = None, **kwargs):
+        """
+        Queue a Bot API call and return immediately.
+
+        Args:
+            method: telepot.Bot method, e.g. `sendMessage` or `sendMediaGroup`
+            attachments: Buffers the call reads from; they are rewound before a retry and closed at the end
+            on_delivered: Called from the delivery thread once Telegram accepted the message
+            kwargs: Arguments of the call
+        """
+        if self._closed:
+            raise RuntimeError("The delivery queue is closed")
+        self._queue.put(Delivery(method, kwargs, list(attachments or []), on_delivered))
+
+    def flush(self):
+        """Block until every queued message is delivered or given up."""
+        self._queue.join()
+
+    def close(self):
+        """Deliver what is queued and stop the delivery thread."""
+        if self._closed or self.pid != os.getpid():
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _deliver_forever(self):
+        while True:
+            delivery = self._queue.get()
+            try:
+                if delivery is None:
+                    return
+                self._deliver(delivery)
+            except Exception:
+                logging.exception(f"Delivering `{delivery.method}` failed")
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, delivery: Delivery):
+        try:
+            for attempt in range(self.max_retries + 1):
+                self._pace()
+                try:
+                    getattr(self._bot, delivery.method)(**delivery.kwargs)
+                except telepot_exception.TooManyRequestsError as e:
+                    delay = e.json.get('parameters', {}).get('retry_after', self.backoff * 2 ** attempt)
+                except telepot_exception.TelegramError as e:
+                    if e.error_code < 500:
+                        logging.error(f"Telegram rejected `{delivery.method}`: {e.description}")
+                        return
+                    delay = self.backoff * 2 ** attempt
+                except Exception as e:
+                    # Connection errors and non-JSON answers of a proxy are worth another try
+                    logging.error(f"Sending `{delivery.method}` failed: {e}")
+                    delay = self.backoff * 2 ** attempt
+                else:
+                    if delivery.on_delivered is not None:
+                        delivery.on_delivered()
+                    return
+                if attempt < self.max_retries:
+                    logging.info(f"Retrying `{delivery.method}` in {delay} seconds")
+                    time.sleep(delay)
+                    for attachment in delivery.attachments:
+                        attachment.seek(0)
+            logging.error(f"Gave up sending `{delivery.method}` after {self.max_retries + 1} attempts")
+        finally:
+            for attachment in delivery.attachments:
+                attachment.close()
+
+    def _pace(self):
+        wait = self._last_sent + self.min_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self._last_sent = time.monotonic()
@@ -1,28 +1,45 @@
-import telepot
+import io
+import os
 import re
 import numpy
+from typing import Callable, List, Optional
 import config.configuration as configuration
+from src.adapter.out.notify.delivery import DeliveryQueue, set_api_url
 from src.logic.data.data import StockData, ProfitabilityData
+from src.logic.data.holdings import HoldingsIndex
 
-def send_text_message(text: str):
+# One delivery queue (with its bot and sender thread), created on the first message. Only the main process
+# sends; stock_finder hands the results of analysis workers back to it.
+_delivery_queue: Optional[DeliveryQueue] = None
+
+
+def send_text_message(text: str, on_delivered: Optional[Callable[[], None]] = None):
     """
-    Send a simple text message to the telegram bot.
+    Queue a simple text message to the telegram bot.
     """
-    bot = telepot.Bot(configuration.TELEGRAM_TOKEN)
-    bot.getMe()
-    bot.sendMessage(chat_id=configuration.TELEGRAM_TO, text=text)
+    __delivery_queue().submit('sendMessage', on_delivered=on_delivered, chat_id=configuration.TELEGRAM_TO, text=text)
 
-def notify(result: StockData):
-    if not __is_notifyable(result):
+def notify(result: StockData, charts: List[io.BytesIO], on_delivered: Optional[Callable[[], None]] = None):
+    """
+    Queue the analysis of an ETF with its forecast charts (in-memory PNGs, the first one gets the caption).
+
+    The charts are closed once the message is sent; `on_delivered` is called after Telegram accepted it,
+    or right away for a result that is not sent, since there is nothing left to deliver.
+    """
+    if not is_notifyable(result):
         print(f"Stock {result.stock_name} is not growing - will be skipped")
+        for chart in charts:
+            chart.close()
+        if on_delivered is not None:
+            on_delivered()
         return
     msg_to_send = __to_msg(result)
-    first_photo_to_send = open(result.two_year_file_name, 'rb')
-    second_photo_to_send = open(result.five_year_file_name, 'rb')
+    first_photo_to_send, second_photo_to_send = charts
 
-    bot = telepot.Bot(configuration.TELEGRAM_TOKEN)
-    bot.getMe()
-    bot.sendMediaGroup(
+    __delivery_queue().submit(
+        'sendMediaGroup',
+        attachments=charts,
+        on_delivered=on_delivered,
         chat_id=configuration.TELEGRAM_TO,
         media=[
             {'media' : first_photo_to_send, 'type' : 'photo', 'caption': msg_to_send, 'parse_mode': 'Markdown'},
@@ -30,7 +47,24 @@ def notify(result: StockData):
         ]
     )
 
-def __is_notifyable(result: StockData) -> bool:
+def flush():
+    """
+    Wait until every queued message of this process is sent.
+    """
+    if _delivery_queue is not None and _delivery_queue.pid == os.getpid():
+        _delivery_queue.flush()
+
+def __delivery_queue() -> DeliveryQueue:
+    global _delivery_queue
+    # A forked analysis worker inherits the queue object but not its thread
+    if _delivery_queue is None or _delivery_queue.pid != os.getpid():
+        set_api_url(configuration.TELEGRAM_API_URL)
+        _delivery_queue = DeliveryQueue(configuration.TELEGRAM_TOKEN,
+                                        min_interval=configuration.TELEGRAM_MIN_INTERVAL,
+                                        max_retries=configuration.TELEGRAM_MAX_RETRIES)
+    return _delivery_queue
+
+def is_notifyable(result: StockData) -> bool:
     # return result.is_stock_growing and result.profitability_data.is_profitable()
     return True # TODO it is needed for selected ETFs
 
@@ -72,13 +106,11 @@ def __format_top_holdings(top_holdings: numpy.ndarray) -> str:
     if top_holdings.size == 0:
         return ""
     
-    # Sort the top_holdings array by the second value (weight)
-    sorted_top_holdings = top_holdings[top_holdings[:, 1].argsort()[::-1]]
+    # Largest holdings first
+    holdings_index = HoldingsIndex.from_top_holdings([top_holdings])
 
     holdings_str = ""
-    for i, holding in enumerate(sorted_top_holdings, start=1):
-        name = holding[0]
-        weight = holding[1]
+    for name, weight in holdings_index.holdings(0):
         holdings_str += f"{name} - {weight:.3f}\n"
     
     return f'\nTop Holdings:\n{holdings_str.strip()}'
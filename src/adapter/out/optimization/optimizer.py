@@ -1,20 +1,33 @@
-import requests
 import config.configuration as configuration
 from deap import base, creator, tools, algorithms
 from deap.base import Toolbox
-from typing import List, Dict, Tuple, Any, Callable
+from typing import List, Dict, Tuple, Any, Callable, Optional, Union
+import concurrent.futures
+import functools
+import logging
+import os
 import random
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 import numpy as np
 
 # CXPB  is the probability with which two individuals are crossed
 # MUTPB is the probability for mutating an individual
 from src.logic.data.data import StockData
+from src.logic.data.universe import Universe
+from src.infrastructure.utils import utils
+from src.infrastructure.utils.lazy import lazy_import
+
+# Only the ownership lookup talks to the network
+requests = lazy_import("requests")
 
 # Recommended GA parameters for 20 ETFs portfolio optimization
 CXPB = 0.35  # Crossover probability
 MUTPB = 0.55  # Mutation probability
 NUMBER_OF_ITERATIONS = 350  # Increased number of generations for better convergence
 NUMBER_OF_POPULATION = 120  # Increased population size for better search space coverage
+STALL_GENERATIONS = 75  # Stop once the best individual has not improved for this many generations
 TOURNSIZE = 5  # Increased tournament size for better selection pressure
 MUTATION_INDPB = 0.4  # Probability of each gene to be mutated
 MATE_INDPB = 0.1  # Probability of each gene to be exchanged during crossover
@@ -24,6 +37,13 @@ MAX_SECTOR_CONCENTRATION = 0.40  # Max 40% in any single sector
 FUN_WEIGHTS_RISK_AWARE = (-1.0, 1.0)  # min deviation, max adjusted_profit
 FUN_WEIGHTS_PROFIT_ONLY = (-1.0, 1.0)  # min deviation, max profit
 
+# DEAP classes are created once at import time so that worker processes, which import this module,
+# can unpickle individuals. Both objectives use the same weights, so one fitness class serves both runs.
+if not hasattr(creator, "FitnessFunc"):
+    creator.create("FitnessFunc", base.Fitness, weights=FUN_WEIGHTS_RISK_AWARE)
+if not hasattr(creator, "Individual"):
+    creator.create("Individual", list, fitness=creator.FitnessFunc)
+
 
 def __gen_one_individual(max_count_data, current_prices=None, budget=None):
     """Generate a random individual that respects budget constraints."""
@@ -63,6 +83,15 @@ def __gen_one_individual(max_count_data, current_prices=None, budget=None):
         return [random.randint(0, max_count) for max_count in max_count_data]
 
 
+def _mutate_shares(individual, indpb, max_shares):
+    for i in range(len(individual)):
+        if random.random() < indpb:
+            # Mutate to a random value within bounds (0 to max_shares[i])
+            # This is better than simple flip as it explores more of the search space
+            individual[i] = random.randint(0, max_shares[i])
+    return individual,
+
+
 def __evaluate(individual, predicted_prices, prices, budget):
     predicted_cost = sum(x * y for x, y in zip(predicted_prices, individual))
     cost = sum(x * y for x, y in zip(prices, individual))
@@ -72,11 +101,12 @@ def __evaluate(individual, predicted_prices, prices, budget):
     return abs(budget - cost), predicted_cost - cost
 
 
-def __calculate_volatility_risk(individual, stocks, current_prices):
+def __calculate_volatility_risk(individual, universe: Universe):
     """
     Calculate portfolio volatility risk using ETF standard deviations and prediction uncertainty.
     Returns normalized risk score (higher = more volatile = worse).
     """
+    current_prices = universe.current_prices
     total_value = sum(individual[i] * current_prices[i] for i in range(len(individual)))
     
     if total_value == 0:
@@ -94,14 +124,14 @@ def __calculate_volatility_risk(individual, stocks, current_prices):
         weight = etf_value / total_value
         
         # Historical volatility (standard deviation)
-        std_dev = stocks[i].standard_deviation
+        std_dev = universe.standard_deviations[i]
         
         # If standard deviation is 0 or not available, use beta as fallback
         if std_dev <= 0:
             # Use beta as proxy for volatility (beta * market_volatility)
             # Assume market volatility of 0.15 (15% annualized)
             market_volatility = 0.15
-            std_dev = stocks[i].beta * market_volatility
+            std_dev = universe.betas[i] * market_volatility
         
         # Standard deviation is already annualized (from yfinance)
         weighted_volatility += weight * std_dev
@@ -109,7 +139,7 @@ def __calculate_volatility_risk(individual, stocks, current_prices):
         # Prediction uncertainty (from Prophet forecast)
         # Convert absolute uncertainty to relative uncertainty (uncertainty / current_price)
         if current_prices[i] > 0:
-            relative_uncertainty = stocks[i].prediction_uncertainty / current_prices[i]
+            relative_uncertainty = universe.prediction_uncertainties[i] / current_prices[i]
         else:
             relative_uncertainty = 0.0
         
@@ -123,12 +153,13 @@ def __calculate_volatility_risk(individual, stocks, current_prices):
     return combined_risk
 
 
-def __calculate_sector_concentration_risk(individual, stocks, current_prices):
+def __calculate_sector_concentration_risk(individual, universe: Universe):
     """
     Calculate sector concentration risk.
     Returns a penalty score (higher = more concentrated = worse)
     """
     # Calculate total portfolio value
+    current_prices = universe.current_prices
     total_value = sum(individual[i] * current_prices[i] for i in range(len(individual)))
     
     if total_value == 0:
@@ -141,13 +172,13 @@ def __calculate_sector_concentration_risk(individual, stocks, current_prices):
         if shares == 0:
             continue
         
-        stock = stocks[i]
         etf_value = shares * current_prices[i]
         etf_weight = etf_value / total_value
         
         # Add this ETF's sector allocations to total exposure
-        for sector, allocation in stock.sector_allocation.items():
-            sector_exposure[sector] = sector_exposure.get(sector, 0.0) + (etf_weight * allocation)
+        for sector_id in np.flatnonzero(universe.sector_matrix[i]):
+            allocation = universe.sector_matrix[i, sector_id]
+            sector_exposure[sector_id] = sector_exposure.get(sector_id, 0.0) + (etf_weight * allocation)
     
     if not sector_exposure:
         return 0.0
@@ -167,11 +198,12 @@ def __calculate_sector_concentration_risk(individual, stocks, current_prices):
     return concentration_risk
 
 
-def __calculate_company_overlap_risk(individual, stocks, current_prices):
+def __calculate_company_overlap_risk(individual, universe: Universe):
     """
     Calculate risk from overlapping company holdings across ETFs.
-    Uses top_holdings data (np.ndarray format) to identify concentration.
+    Uses the holdings index of the universe to identify concentration.
     """
+    current_prices = universe.current_prices
     total_value = sum(individual[i] * current_prices[i] for i in range(len(individual)))
     
     if total_value == 0:
@@ -184,21 +216,12 @@ def __calculate_company_overlap_risk(individual, stocks, current_prices):
         if shares == 0:
             continue
         
-        stock = stocks[i]
         etf_value = shares * current_prices[i]
         etf_weight = etf_value / total_value
         
-        # Parse top_holdings (np.ndarray format: rows of [company_name, weight])
-        for holding in stock.top_holdings:
-            try:
-                # holding is a numpy array row: [company_name, weight]
-                company = holding[0]
-                weight = float(holding[1])
-                
-                # Total exposure to this company
-                company_exposure[company] = company_exposure.get(company, 0.0) + (etf_weight * weight)
-            except (IndexError, ValueError, TypeError):
-                continue
+        # Total exposure to every company the ETF holds
+        for company, weight in universe.holdings.holdings(i):
+            company_exposure[company] = company_exposure.get(company, 0.0) + (etf_weight * weight)
     
     if not company_exposure:
         return 0.0
@@ -218,39 +241,219 @@ def __calculate_company_overlap_risk(individual, stocks, current_prices):
     return overlap_risk
 
 
-def __create_toolbox(eval_func, weights: tuple, mutFlipBit) -> Toolbox:
-    # Check if creator classes already exist to avoid warnings
-    if not hasattr(creator, "FitnessFunc"):
-        creator.create("FitnessFunc", base.Fitness, weights=weights)
-    if not hasattr(creator, "Individual"):
-        creator.create("Individual", list, fitness=creator.FitnessFunc)
-
+def __create_toolbox(eval_func, mutFlipBit, evaluation_map: Callable) -> Toolbox:
     toolbox = Toolbox()
     toolbox.register("evaluate", eval_func)    
+    toolbox.register("map", evaluation_map)
     toolbox.register("mate", tools.cxUniform, indpb=MATE_INDPB)
     toolbox.register("mutate", mutFlipBit, indpb=MUTATION_INDPB)
     toolbox.register("select", tools.selTournament, tournsize=TOURNSIZE)  # Increased for better selection pressure
     return toolbox
 
 
-def __optimize_internal(toolbox, gen_individual_func):
-    pop = [creator.Individual(gen_individual_func()) for i in range(NUMBER_OF_POPULATION)]
-    fitnesses = list(map(toolbox.evaluate, pop))
-    for ind, fit in zip(pop, fitnesses):
+class GenerationLog:
+    """Per-generation fitness statistics of a GA run, the best individual seen so far and when it last improved."""
+
+    def __init__(self):
+        self.hall_of_fame = tools.HallOfFame(1)
+        self.stats = tools.Statistics(key=lambda ind: ind.fitness.values)
+        self.stats.register("avg", np.mean, axis=0)
+        self.stats.register("min", np.min, axis=0)
+        self.stats.register("max", np.max, axis=0)
+        self.logbook = tools.Logbook()
+        self.logbook.header = ["gen", "nevals", "best", "avg", "min", "max"]
+        self.best_fitness = None
+        self.last_improvement = 0
+
+    def record(self, gen: int, nevals: int, population):
+        self.hall_of_fame.update(population)
+        best = self.hall_of_fame[0]
+        self.logbook.record(gen=gen, nevals=nevals, best=best.fitness.values, **self.stats.compile(population))
+        # Fitness values compare lexicographically: budget deviation first, then profit
+        if self.best_fitness is None or best.fitness.wvalues > self.best_fitness:
+            self.best_fitness = best.fitness.wvalues
+            self.last_improvement = gen
+
+    def stop_reason(self, gen: int, started: float, time_budget: Optional[float]) -> Optional[str]:
+        """Why the run should stop after generation `gen`, or None to continue."""
+        if gen >= NUMBER_OF_ITERATIONS:
+            return f"reached {NUMBER_OF_ITERATIONS} generations"
+        if gen - self.last_improvement >= STALL_GENERATIONS:
+            return f"no improvement for {STALL_GENERATIONS} generations"
+        if time_budget and time.monotonic() - started >= time_budget:
+            return f"time budget of {time_budget}s used up"
+        return None
+
+
+def convergence_summary(logbook: tools.Logbook) -> str:
+    """
+    How a GA run converged: generations, why it stopped and the best fitness at every improvement.
+
+    The stop reason is read back from the logbook with the rules of `GenerationLog.stop_reason`.
+    """
+    generations, best = logbook.select("gen"), logbook.select("best")
+    improvements = [(gen, fitness) for i, (gen, fitness) in enumerate(zip(generations, best)) if i == 0 or fitness != best[i - 1]]
+    last_improvement = improvements[-1][0]
+    if generations[-1] >= NUMBER_OF_ITERATIONS:
+        stop_reason = f"reached {NUMBER_OF_ITERATIONS} generations"
+    elif generations[-1] - last_improvement >= STALL_GENERATIONS:
+        stop_reason = f"no improvement for {STALL_GENERATIONS} generations"
+    else:
+        stop_reason = "time budget used up"
+    curve = ", ".join(f"gen {gen}: {tuple(float(value) for value in fitness)}" for gen, fitness in improvements)
+    return (f"{generations[-1]} generations ({stop_reason}), last improvement at generation {last_improvement}; "
+            f"best fitness {curve}")
+
+
+def __evaluate_invalid(population, toolbox) -> int:
+    invalid_ind = [ind for ind in population if not ind.fitness.valid]
+    for ind, fit in zip(invalid_ind, toolbox.map(toolbox.evaluate, invalid_ind)):
         ind.fitness.values = fit
+    return len(invalid_ind)
 
-    return algorithms.eaSimple(pop, toolbox, cxpb=CXPB, mutpb=MUTPB, ngen=NUMBER_OF_ITERATIONS)
 
+def __evolve_generation(population, toolbox) -> int:
+    """Replace the population with its offspring like one generation of `algorithms.eaSimple`; returns the number of evaluations."""
+    offspring = algorithms.varAnd(toolbox.select(population, len(population)), toolbox, CXPB, MUTPB)
+    nevals = __evaluate_invalid(offspring, toolbox)
+    population[:] = offspring
+    return nevals
 
-def _prepare_stock_data(stocks: List[StockData]):
-    """Extract and prepare stock data for optimization."""
-    tickers = [stock.ticker_symbol for stock in stocks]
-    current_prices = [stock.current_price for stock in stocks]
-    predicted_prices = [stock.predict_price for stock in stocks]
-    dividend_yields = [stock.dividend_yield for stock in stocks]
-    expense_ratios = [stock.expense_ratio for stock in stocks]
-    
-    return tickers, current_prices, predicted_prices, dividend_yields, expense_ratios
+
+def __optimize_internal(toolbox, gen_individual_func, time_budget: Optional[float] = None) -> Tuple[Any, tools.Logbook]:
+    """
+    Evolve the population generation by generation like `algorithms.eaSimple`, but stop early.
+
+    The run ends after NUMBER_OF_ITERATIONS generations, once the best individual ever seen has not
+    improved for STALL_GENERATIONS generations, or once `time_budget` seconds have passed. A time
+    budget makes the result depend on machine speed, so seeded runs are only reproducible without one.
+
+    Returns:
+        Tuple of (best individual, logbook with per-generation best/avg/min/max fitness)
+    """
+    started = time.monotonic()
+    pop = [creator.Individual(gen_individual_func()) for i in range(NUMBER_OF_POPULATION)]
+    log = GenerationLog()
+    log.record(0, __evaluate_invalid(pop, toolbox), pop)
+
+    gen = 0
+    while True:
+        gen += 1
+        log.record(gen, __evolve_generation(pop, toolbox), pop)
+        stop_reason = log.stop_reason(gen, started, time_budget)
+        if stop_reason is not None:
+            break
+
+    logging.info(f"GA stopped after {gen} generations ({stop_reason}), best fitness {log.hall_of_fame[0].fitness.values}")
+    return log.hall_of_fame[0], log.logbook
+
+
+MIGRATION_INTERVAL = 25  # Generations each island evolves on its own between migrations
+MIGRATION_SIZE = 5  # Best individuals sent from every island to the next at each migration
+MIGRATION_TOPOLOGIES = ("ring", "random")
+
+# Toolbox and fitness cache of the current island worker process, built once by the pool initializer
+_island_toolbox: Optional[Toolbox] = None
+_island_fitness_cache: Optional["FitnessCache"] = None
+
+
+def _init_island_worker(evaluator: "PortfolioEvaluator", max_shares_per_stock: List[int]):
+    global _island_toolbox, _island_fitness_cache
+    evaluation_map = __evaluate_population
+    if configuration.OPTIMIZER_FITNESS_CACHE_SIZE > 0:
+        _island_fitness_cache = evaluation_map = FitnessCache(evaluation_map, configuration.OPTIMIZER_FITNESS_CACHE_SIZE)
+    _island_toolbox = __create_toolbox(evaluator, functools.partial(_mutate_shares, max_shares=max_shares_per_stock), evaluation_map)
+
+
+def _evolve_island(population, generations: int, seed: int):
+    """
+    Evaluate any unscored individuals of an island, then evolve it for `generations` generations.
+
+    Returns:
+        Tuple of (population, number of evaluations, (fitness cache hits, misses) of this epoch or None without a cache)
+    """
+    random.seed(seed)
+    cache = _island_fitness_cache
+    lookups_before = (cache.hits, cache.misses) if cache is not None else None
+    nevals = __evaluate_invalid(population, _island_toolbox)
+    for _ in range(generations):
+        nevals += __evolve_generation(population, _island_toolbox)
+    cache_counts = (cache.hits - lookups_before[0], cache.misses - lookups_before[1]) if cache is not None else None
+    return population, nevals, cache_counts
+
+
+def __migration_targets(islands: int, topology: str) -> List[int]:
+    """Island that receives the emigrants of each island: the next one (ring) or a random other one."""
+    if topology == "ring" or islands < 3:
+        return [(island + 1) % islands for island in range(islands)]
+    while True:
+        targets = random.sample(range(islands), islands)
+        if all(target != island for island, target in enumerate(targets)):
+            return targets
+
+
+def __optimize_islands(
+    evaluator: "PortfolioEvaluator",
+    max_shares_per_stock: List[int],
+    gen_individual_func: Callable,
+    islands: int,
+    migration_interval: int = MIGRATION_INTERVAL,
+    migration_topology: str = "ring",
+    time_budget: Optional[float] = None
+) -> Tuple[Any, tools.Logbook, Optional[Tuple[int, int]]]:
+    """
+    Island-model GA: `islands` populations evolve in a process pool and swap their best individuals.
+
+    Every epoch each island evolves `migration_interval` generations on its own in a worker process,
+    then the MIGRATION_SIZE best individuals of every island replace the worst of its target island.
+    The master draws a seed per island and epoch, so a seeded run does not depend on the number of
+    worker processes. Stopping rules are those of `__optimize_internal`, checked once per epoch and
+    over the islands combined.
+
+    Returns:
+        Tuple of (best individual over all islands, logbook of the combined islands per epoch,
+        (hits, misses) of the workers' fitness caches summed over all epochs or None without a cache)
+    """
+    if migration_topology not in MIGRATION_TOPOLOGIES:
+        raise ValueError(f"Unknown migration topology: {migration_topology!r}, expected one of {MIGRATION_TOPOLOGIES}")
+    # Epochs of no generations would never reach a stopping rule
+    if migration_interval < 1:
+        raise ValueError(f"Migration interval must be at least one generation, got {migration_interval}")
+    started = time.monotonic()
+    populations = [[creator.Individual(gen_individual_func()) for i in range(NUMBER_OF_POPULATION)] for island in range(islands)]
+    log = GenerationLog()
+    cache_counts = None
+
+    workers = min(islands, os.cpu_count() or 1)
+    with utils.process_context().Pool(processes=workers, initializer=_init_island_worker, initargs=(evaluator, max_shares_per_stock)) as pool:
+        def evolve(generations: int) -> int:
+            nonlocal cache_counts
+            epochs = [pool.apply_async(_evolve_island, (population, generations, random.getrandbits(32))) for population in populations]
+            results = [epoch.get() for epoch in epochs]
+            populations[:] = [population for population, _, _ in results]
+            for _, _, counts in results:
+                if counts is not None:
+                    cache_counts = tuple(total + count for total, count in zip(cache_counts or (0, 0), counts))
+            return sum(nevals for _, nevals, _ in results)
+
+        log.record(0, evolve(0), [ind for population in populations for ind in population])
+        gen = 0
+        while True:
+            generations = min(migration_interval, NUMBER_OF_ITERATIONS - gen)
+            nevals = evolve(generations)
+            gen += generations
+            log.record(gen, nevals, [ind for population in populations for ind in population])
+            stop_reason = log.stop_reason(gen, started, time_budget)
+            if stop_reason is not None:
+                break
+            tools.migRing(populations, MIGRATION_SIZE, tools.selBest, replacement=tools.selWorst,
+                          migarray=__migration_targets(islands, migration_topology))
+
+    logging.info(
+        f"Island GA ({islands} islands, {migration_topology} migration every {migration_interval} generations) "
+        f"stopped after {gen} generations ({stop_reason}), best fitness {log.hall_of_fame[0].fitness.values}"
+    )
+    return log.hall_of_fame[0], log.logbook, cache_counts
 
 
 def _calculate_max_shares(current_prices: List[float], max_per_etf_budget: float = 50.0):
@@ -282,170 +485,384 @@ def _create_ownership_weights(tickers: List[str], etf_map: Dict[str, int]):
     return ownership_weights
 
 
+BUDGET_EXCEEDED_FITNESS = (100000000000, -10000000000)  # Heavy penalty for portfolios over budget
+RISK_SCALING_FACTOR = 20.0  # Scales the 0-1 risk scores to be comparable to profit in euros
+
+
+class PortfolioEvaluator:
+    """
+    Vectorized fitness function for the genetic algorithm.
+
+    Everything that only depends on the ETFs (per-share profit, volatility) is computed once from the
+    columns of the universe, and its ETF x sector matrix and sparse holdings index are used as they are,
+    so a whole population is scored with a few matrix products instead of per-individual Python loops.
+    Calling the evaluator on a single individual returns the same (budget_deviation, adjusted_profit)
+    tuple as before.
+    """
+
+    def __init__(
+        self,
+        universe: Universe,
+        ownership_weights: List[float],
+        budget: float,
+        include_risk: bool = True
+    ):
+        self.budget = budget
+        self.include_risk = include_risk
+        self.prices = universe.current_prices
+        predicted = universe.predicted_prices
+        uncertainty = universe.prediction_uncertainties
+
+        # UNCERTAINTY-ADJUSTED CAPITAL GAIN: discount the predicted gain by the relative uncertainty (capped at 50%)
+        self.confidence_scores = confidence_scores(predicted, uncertainty)
+        # Net profit of one share: (capital_gain + dividend_income - expense_fee) weighted by current ownership
+        self.profit_per_share = (
+            (predicted - self.prices) * self.confidence_scores
+            + self.prices * universe.dividend_yields
+            - self.prices * universe.expense_ratios
+        ) * np.asarray(ownership_weights, dtype=float)
+
+        # Historical volatility with beta * 15% market volatility as fallback, and prediction uncertainty relative to price
+        self.volatilities = np.where(universe.standard_deviations <= 0, universe.betas * 0.15, universe.standard_deviations)
+        self.relative_uncertainties = np.divide(uncertainty, self.prices, out=np.zeros_like(uncertainty), where=self.prices > 0)
+
+        self.sector_matrix = universe.sector_matrix
+        self.holdings_index = universe.holdings
+
+    def __call__(self, individual) -> Tuple[float, float]:
+        return self.evaluate_population([individual])[0]
+
+    def evaluate_population(self, population) -> List[Tuple[float, float]]:
+        shares = np.asarray(population, dtype=float).reshape(len(population), len(self.prices))
+        total_cost = shares @ self.prices
+        total_net_profit = shares @ self.profit_per_share
+        budget_deviation = np.abs(self.budget - total_cost)
+
+        if self.include_risk:
+            volatility_risk, sector_risk, overlap_risk = self.risk_components(shares)
+            # Combined risk score with weights: 25% volatility, 40% sector, 35% overlap
+            total_risk = RISK_SCALING_FACTOR * (0.25 * volatility_risk + 0.4 * sector_risk + 0.35 * overlap_risk)
+            total_net_profit = total_net_profit - total_risk
+
+        return [
+            BUDGET_EXCEEDED_FITNESS if cost > self.budget else (float(deviation), float(profit))
+            for cost, deviation, profit in zip(total_cost, budget_deviation, total_net_profit)
+        ]
+
+    def risk_components(self, shares: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Volatility, sector concentration and company overlap risk for every row of a share matrix."""
+        values = shares * self.prices
+        total_value = values.sum(axis=1, keepdims=True)
+        weights = np.divide(values, total_value, out=np.zeros_like(values), where=total_value > 0)
+
+        # 70% historical volatility, 30% prediction uncertainty
+        volatility_risk = 0.7 * (weights @ self.volatilities) + 0.3 * (weights @ self.relative_uncertainties)
+
+        sector_exposure = weights @ self.sector_matrix
+        max_sector_exposure = sector_exposure.max(axis=1, initial=0.0)
+        sector_risk = (sector_exposure ** 2).sum(axis=1) + np.maximum(0, max_sector_exposure - MAX_SECTOR_CONCENTRATION) * 10
+
+        company_exposure = self.holdings_index.exposures(weights)
+        overlap_risk = (
+            company_exposure.max(axis=1, initial=0.0)
+            + (company_exposure > 0.05).sum(axis=1) * 0.01
+            + (company_exposure ** 2).sum(axis=1)
+        )
+        return volatility_risk, sector_risk, overlap_risk
+
+
+def confidence_scores(predicted_prices: np.ndarray, prediction_uncertainties: np.ndarray) -> np.ndarray:
+    """1.0 = perfect confidence; lowered by the uncertainty relative to the predicted price, capped at 50%."""
+    relative_uncertainty = np.divide(
+        prediction_uncertainties, predicted_prices,
+        out=np.zeros_like(prediction_uncertainties), where=(predicted_prices > 0) & (prediction_uncertainties > 0)
+    )
+    return 1.0 - np.minimum(relative_uncertainty, 0.5)
+
+
 def _create_evaluator_factory(
-    current_prices: List[float],
-    predicted_prices: List[float],
-    dividend_yields: List[float],
-    expense_ratios: List[float],
+    universe: Universe,
     ownership_weights: List[float],
-    stocks: List[StockData],
     budget: float,
     include_risk: bool = True
 ) -> Callable:
     """Create an evaluator function for the genetic algorithm."""
-    
-    def evaluate_func(individual):
-        # Calculate cost and predicted profit
-        total_cost = sum(x * y for x, y in zip(current_prices, individual))
-        
-        # Calculate net profit per stock: (capital_gain + dividend_income) - (cost * expense_ratio)
-        total_net_profit = 0.0
-        for i, shares in enumerate(individual):
-            if shares == 0:
-                continue
-                
-            current_price = current_prices[i]
-            predicted_price = predicted_prices[i]
-            dividend_yield = dividend_yields[i]
-            expense_ratio = expense_ratios[i]
-            ownership_weight = ownership_weights[i]
-            prediction_uncertainty = stocks[i].prediction_uncertainty
-            
-            # UNCERTAINTY-ADJUSTED CAPITAL GAIN
-            # Discount predicted gain by uncertainty (more uncertainty = less reliable prediction)
-            if predicted_price > 0 and prediction_uncertainty > 0:
-                # Calculate relative uncertainty (uncertainty as percentage of predicted price)
-                relative_uncertainty = prediction_uncertainty / predicted_price
-                # Cap uncertainty at 50% to avoid extreme discounts
-                capped_uncertainty = min(relative_uncertainty, 0.5)
-                # Confidence score: 1.0 = perfect confidence, 0.5 = 50% uncertainty
-                confidence_score = 1.0 - capped_uncertainty
-            else:
-                confidence_score = 1.0  # No uncertainty data, use full prediction
-            
-            # Apply confidence score to capital gain prediction
-            # This reduces the expected gain for uncertain predictions
-            expected_gain = (predicted_price - current_price) * confidence_score
-            capital_gain = expected_gain * shares
-            
-            # Dividend income (assuming annual yield)
-            dividend_income = current_price * dividend_yield * shares
-            
-            # Total cost of investment
-            cost = current_price * shares
-            
-            # Total gross profit
-            gross_profit = capital_gain + dividend_income
-            
-            # Apply expense ratio penalty (annual fee on assets under management)
-            # Expense reduces profit: fee = cost * expense_ratio
-            expense_fee = cost * expense_ratio
-            net_profit = gross_profit - expense_fee
-            
-            # Apply ownership weight for diversification
-            weighted_profit = net_profit * ownership_weight
-            total_net_profit += weighted_profit
-        
-        # Penalize if cost exceeds budget
-        if total_cost > budget:
-            # Heavy penalty for exceeding budget
-            return 100000000000, -10000000000
-        
-        budget_deviation = abs(budget - total_cost)
-        if include_risk:
-            # Calculate risk components
-            volatility_risk = __calculate_volatility_risk(individual, stocks, current_prices)
-            sector_risk = __calculate_sector_concentration_risk(individual, stocks, current_prices)
-            overlap_risk = __calculate_company_overlap_risk(individual, stocks, current_prices)
-            
-            # Combined risk score with weights: 40% volatility, 35% sector, 25% overlap
-            # Scale risk to be comparable to profit values (profit is in euros, risk is 0-1 scale)
-            # Multiply by a scaling factor to make risk matter more in the optimization
-            risk_scaling_factor = 20.0  # Reduced from 100.0 to better balance profit vs risk
-            total_risk = risk_scaling_factor * (
-                0.25 * volatility_risk +
-                0.4 * sector_risk +
-                0.35 * overlap_risk
-            )
-            
-            # For risk-aware: maximize (profit - risk_penalty)
-            adjusted_profit = total_net_profit - total_risk
-            return budget_deviation, adjusted_profit
+    return PortfolioEvaluator(universe, ownership_weights, budget, include_risk)
+
+
+def __evaluate_population(evaluate, population):
+    """`toolbox.map` replacement that scores the whole population in one call when the evaluator supports it."""
+    evaluator = getattr(evaluate, 'func', evaluate)  # Toolbox.register wraps functions in functools.partial
+    if isinstance(evaluator, PortfolioEvaluator):
+        return evaluator.evaluate_population(population)
+    return list(map(evaluate, population))
+
+
+EVALUATION_BACKENDS = ("serial", "multiprocessing", "futures")
+
+# Evaluator of the current worker process, installed once by the pool initializer
+_worker_evaluator: Optional[PortfolioEvaluator] = None
+
+
+def _init_evaluation_worker(evaluator: PortfolioEvaluator):
+    global _worker_evaluator
+    _worker_evaluator = evaluator
+
+
+def _evaluate_chunk(chunk: List[List[int]]) -> List[Tuple[float, float]]:
+    return _worker_evaluator.evaluate_population(chunk)
+
+
+@contextmanager
+def _evaluation_map(evaluator: PortfolioEvaluator, backend: str = "serial", workers: Optional[int] = None):
+    """
+    Provide the `toolbox.map` function that scores the population with the chosen backend.
+
+    Args:
+        evaluator: Fitness function of the run
+        backend: "serial" scores the population in this process, "multiprocessing" uses a
+                 `multiprocessing.Pool` and "futures" a `concurrent.futures.ProcessPoolExecutor`
+        workers: Number of worker processes (default: number of CPUs)
+
+    The evaluator with its precomputed arrays is sent to every worker once when the pool starts.
+    After that, each generation only ships the share counts of its individuals, split into one chunk
+    per worker.
+    """
+    if backend not in EVALUATION_BACKENDS:
+        raise ValueError(f"Unknown evaluation backend: {backend!r}, expected one of {EVALUATION_BACKENDS}")
+    if backend == "serial":
+        yield __evaluate_population
+        return
+
+    workers = workers or os.cpu_count() or 1
+    if backend == "multiprocessing":
+        executor = utils.process_context().Pool(processes=workers, initializer=_init_evaluation_worker, initargs=(evaluator,))
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=utils.process_context(),
+                                                          initializer=_init_evaluation_worker, initargs=(evaluator,))
+
+    def evaluate_in_pool(evaluate, population):
+        chunks = [chunk.tolist() for chunk in np.array_split(np.asarray(population, dtype=int), workers) if len(chunk)]
+        return [fitness for chunk_fitnesses in executor.map(_evaluate_chunk, chunks) for fitness in chunk_fitnesses]
+
+    try:
+        yield evaluate_in_pool
+    finally:
+        if backend == "multiprocessing":
+            executor.terminate()
         else:
-            # Profit-only optimization: maximize profit
-            return budget_deviation, total_net_profit
-    
-    return evaluate_func
+            executor.shutdown()
+
+
+class FitnessCache:
+    """
+    Bounded LRU memo of fitness values keyed on the tuple of share counts, wrapped around a `toolbox.map` function.
+
+    Crossover and mutation over small share ranges keep producing genomes that were already scored,
+    so only genomes not seen before (and not evicted) are passed on to the wrapped map function.
+    """
+
+    def __init__(self, evaluation_map: Callable, maxsize: int):
+        self.evaluation_map = evaluation_map
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.entries: "OrderedDict[Tuple[int, ...], Tuple[float, float]]" = OrderedDict()
+
+    def __call__(self, evaluate, population) -> List[Tuple[float, float]]:
+        keys = [tuple(individual) for individual in population]
+        missing = list(dict.fromkeys(key for key in keys if key not in self.entries))
+        fresh = dict(zip(missing, self.evaluation_map(evaluate, [list(key) for key in missing]))) if missing else {}
+        self.misses += len(missing)
+        self.hits += len(keys) - len(missing)
+
+        fitnesses = []
+        for key in keys:
+            if key in fresh:
+                fitnesses.append(fresh[key])
+            else:
+                self.entries.move_to_end(key)
+                fitnesses.append(self.entries[key])
+        for key, fitness in fresh.items():
+            self.entries[key] = fitness
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return fitnesses
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
 
 
 def _run_genetic_algorithm(
-    stocks: List[StockData],
+    universe: Universe,
     budget: float,
     max_per_etf_budget: float,
     include_risk: bool = True
-) -> Tuple[List[int], List[StockData], List[float], List[float], List[float], List[float], List[float]]:
+) -> Tuple[List[int], Universe, tools.Logbook]:
     """Run genetic algorithm optimization with specified risk inclusion."""
     # Get current ETF ownership
     etf_map = __get_etf_map()
-    return _run_genetic_algorithm_with_map(stocks, budget, max_per_etf_budget, etf_map, include_risk)
+    return _run_genetic_algorithm_with_map(universe, budget, max_per_etf_budget, etf_map, include_risk)
 
 
 def _run_genetic_algorithm_with_map(
-    stocks: List[StockData],
+    universe: Universe,
     budget: float,
     max_per_etf_budget: float,
     etf_map: Dict[str, int],
-    include_risk: bool = True
-) -> Tuple[List[int], List[StockData], List[float], List[float], List[float], List[float], List[float]]:
-    """Run genetic algorithm optimization with pre-fetched ETF ownership map."""
-    # Prepare data
-    tickers, current_prices, predicted_prices, dividend_yields, expense_ratios = _prepare_stock_data(stocks)
+    include_risk: bool = True,
+    evaluation_backend: str = "serial",
+    evaluation_workers: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    islands: int = 1,
+    migration_interval: int = MIGRATION_INTERVAL,
+    migration_topology: str = "ring"
+) -> Tuple[List[int], Universe, tools.Logbook]:
+    """
+    Run genetic algorithm optimization with pre-fetched ETF ownership map; the last element is the convergence logbook.
+
+    With more than one island the island model is used; islands score their individuals in their own
+    worker processes, so `evaluation_backend` only applies to single-population runs.
+    """
+    if islands < 1:
+        raise ValueError(f"Number of islands must be at least 1, got {islands}")
+    current_prices = universe.current_prices
     
     # Calculate constraints and weights
     max_shares_per_stock = _calculate_max_shares(current_prices, max_per_etf_budget)
-    ownership_weights = _create_ownership_weights(tickers, etf_map)
+    ownership_weights = _create_ownership_weights(universe.tickers, etf_map)
     
     # Create evaluator
-    evaluator = _create_evaluator_factory(
-        current_prices, predicted_prices, dividend_yields, expense_ratios,
-        ownership_weights, stocks, budget, include_risk
-    )
+    evaluator = _create_evaluator_factory(universe, ownership_weights, budget, include_risk)
     
     # Create mutation function
-    def mutFlipBit(individual, indpb):
-        for i in range(len(individual)):
-            if random.random() < indpb:
-                # Mutate to a random value within bounds (0 to max_shares_per_stock[i])
-                # This is better than simple flip as it explores more of the search space
-                individual[i] = random.randint(0, max_shares_per_stock[i])
-        return individual,
+    mutFlipBit = functools.partial(_mutate_shares, max_shares=max_shares_per_stock)
     
     # Create individual generator
     def gen_one_individual_wrapper():
         return __gen_one_individual(max_shares_per_stock, current_prices, budget)
     
-    # Select weights based on risk inclusion
-    weights = FUN_WEIGHTS_RISK_AWARE if include_risk else FUN_WEIGHTS_PROFIT_ONLY
-    
     # Run optimization
-    toolbox = __create_toolbox(evaluator, weights, mutFlipBit)
-    best_solution = __optimize_internal(toolbox, gen_one_individual_wrapper)
-    best_individual = tools.selBest(best_solution[0], 1)[0]
+    if islands > 1:
+        best_individual, logbook, cache_counts = __optimize_islands(
+            evaluator, max_shares_per_stock, gen_one_individual_wrapper, islands,
+            migration_interval, migration_topology, time_budget
+        )
+        if cache_counts is not None:
+            __log_fitness_cache(include_risk, *cache_counts, f"summed over {islands} islands")
+        return best_individual, universe, logbook
     
-    return best_individual, stocks, current_prices, predicted_prices, dividend_yields, expense_ratios, tickers
+    fitness_cache = None
+    with _evaluation_map(evaluator, evaluation_backend, evaluation_workers) as evaluation_map:
+        if configuration.OPTIMIZER_FITNESS_CACHE_SIZE > 0:
+            fitness_cache = evaluation_map = FitnessCache(evaluation_map, configuration.OPTIMIZER_FITNESS_CACHE_SIZE)
+        toolbox = __create_toolbox(evaluator, mutFlipBit, evaluation_map)
+        best_individual, logbook = __optimize_internal(toolbox, gen_one_individual_wrapper, time_budget)
+    
+    if fitness_cache is not None:
+        __log_fitness_cache(include_risk, fitness_cache.hits, fitness_cache.misses, f"{len(fitness_cache.entries)} entries")
+    
+    return best_individual, universe, logbook
+
+
+def __log_fitness_cache(include_risk: bool, hits: int, misses: int, detail: str):
+    """Log how well the fitness cache of a GA run did, to tune its size and the population size."""
+    lookups = hits + misses
+    logging.info(
+        f"Fitness cache ({'risk-aware' if include_risk else 'profit-only'}): {hits} hits, {misses} misses, "
+        f"{hits / lookups if lookups else 0.0:.1%} hit rate, {detail}"
+    )
+
+
+def _run_exact_solver_with_map(
+    universe: Universe,
+    budget: float,
+    max_per_etf_budget: float,
+    etf_map: Dict[str, int],
+    include_risk: bool = True
+) -> Tuple[List[int], Universe, None]:
+    """
+    Solve the share allocation exactly with a bounded-knapsack dynamic program.
+
+    Prices are rounded up to whole cents, so every returned portfolio stays within budget. The objective
+    matches the GA: spend as close to the budget as possible first, then maximize net profit.
+    Profit is linear in the share counts, so the profit-only objective is solved exactly.
+
+    The risk terms are not linear in the share counts. In risk-aware mode each ETF's risk score on its
+    own (as if it were the whole portfolio) is charged per share in proportion to the ETF's weight in
+    the portfolio: price / spend * RISK_SCALING_FACTOR * standalone_risk, where spend is what the result
+    costs. Which amounts can be spent does not depend on the objective, so a first pass finds the spend
+    before the risk-charged one. This linear surrogate matches the GA's volatility term (up to the
+    rounding of prices to cents). It is an upper bound for sector concentration and for the largest and
+    squared company exposures, which are convex in the weights, since it gives no credit for
+    diversification across ETFs; the count of large company exposures is only approximated. Use the
+    GA for the full nonlinear risk objective.
+
+    The result has the same shape as the GA's, with no convergence logbook.
+    """
+    max_shares_per_stock = _calculate_max_shares(universe.current_prices, max_per_etf_budget)
+    ownership_weights = _create_ownership_weights(universe.tickers, etf_map)
+    evaluator = _create_evaluator_factory(universe, ownership_weights, budget, include_risk)
+
+    cents_per_share = np.ceil(np.round(evaluator.prices * 100, 6)).astype(int)
+    capacity = int(np.floor(round(budget * 100, 6)))
+    profit_per_share = evaluator.profit_per_share
+    if include_risk:
+        # The risk metrics weight the ETFs by the amount actually spent, which is the same for any values
+        reachable = __solve_bounded_knapsack(cents_per_share, np.zeros(len(universe)), max_shares_per_stock, capacity)
+        spend = np.dot(reachable, cents_per_share) / 100
+        if spend > 0:
+            volatility_risk, sector_risk, overlap_risk = evaluator.risk_components(np.eye(len(universe)))
+            standalone_risk = 0.25 * volatility_risk + 0.4 * sector_risk + 0.35 * overlap_risk
+            profit_per_share = profit_per_share - evaluator.prices / spend * RISK_SCALING_FACTOR * standalone_risk
+
+    best_individual = __solve_bounded_knapsack(cents_per_share, profit_per_share, max_shares_per_stock, capacity)
+    return best_individual, universe, None
+
+
+def __solve_bounded_knapsack(costs: np.ndarray, values: np.ndarray, max_counts: List[int], capacity: int) -> List[int]:
+    """
+    Pick an integer count per item (0..max_counts[i]) that uses the most capacity, breaking ties by the highest total value.
+
+    `best[c]` is the highest value of a selection costing exactly `c`; `choices[i, c]` remembers how many
+    units of item i that selection holds so the solution can be reconstructed backwards. Ties keep the
+    smaller count, which makes the result deterministic.
+    """
+    capacity = max(capacity, 0)
+    best = np.full(capacity + 1, -np.inf)
+    best[0] = 0.0
+    choices = np.zeros((len(costs), capacity + 1), dtype=np.int32)
+
+    for i, (cost, value, max_count) in enumerate(zip(costs, values, max_counts)):
+        if cost <= 0:
+            continue
+        new_best = best.copy()
+        for count in range(1, min(max_count, capacity // cost) + 1):
+            offset = count * cost
+            candidate = best[:capacity + 1 - offset] + count * value
+            better = candidate > new_best[offset:]
+            new_best[offset:][better] = candidate[better]
+            choices[i, offset:][better] = count
+        best = new_best
+
+    remaining = int(np.flatnonzero(np.isfinite(best))[-1])
+    counts = [0] * len(costs)
+    for i in reversed(range(len(costs))):
+        counts[i] = int(choices[i, remaining])
+        remaining -= counts[i] * int(costs[i])
+    return counts
 
 
 def _format_portfolio_results(
     best_individual: List[int],
-    stocks: List[StockData],
-    current_prices: List[float],
-    predicted_prices: List[float],
-    dividend_yields: List[float],
-    expense_ratios: List[float],
-    tickers: List[str],
+    universe: Universe,
     include_risk: bool = True
 ) -> str:
     """Format portfolio optimization results into a string."""
+    current_prices, predicted_prices = universe.current_prices, universe.predicted_prices
+    dividend_yields, expense_ratios = universe.dividend_yields, universe.expense_ratios
+    tickers = universe.tickers
     # Format results: only include ETFs with positive share count
     results = []
     for i, (ticker, shares) in enumerate(zip(tickers, best_individual)):
@@ -453,7 +870,7 @@ def _format_portfolio_results(
             cost = shares * current_prices[i]
             
             # Calculate uncertainty-adjusted capital gain (same logic as in evaluator)
-            prediction_uncertainty = stocks[i].prediction_uncertainty
+            prediction_uncertainty = universe.prediction_uncertainties[i]
             if predicted_prices[i] > 0 and prediction_uncertainty > 0:
                 relative_uncertainty = prediction_uncertainty / predicted_prices[i]
                 capped_uncertainty = min(relative_uncertainty, 0.5)
@@ -470,7 +887,7 @@ def _format_portfolio_results(
             # Expense reduces profit: fee = cost * expense_ratio
             expense_fee = cost * expense_ratios[i]
             net_profit = gross_profit - expense_fee
-            stock_name = stocks[i].stock_name
+            stock_name = universe.stock_names[i]
             
             # Store both adjusted and raw capital gain for display
             results.append((ticker, stock_name, shares, cost, net_profit, capital_gain, 
@@ -517,9 +934,9 @@ def _format_portfolio_results(
     
     # Always calculate and display risk metrics, regardless of whether they were used in optimization
     # Calculate risk metrics for the final portfolio
-    final_volatility = __calculate_volatility_risk(best_individual, stocks, current_prices)
-    final_sector_risk = __calculate_sector_concentration_risk(best_individual, stocks, current_prices)
-    final_overlap_risk = __calculate_company_overlap_risk(best_individual, stocks, current_prices)
+    final_volatility = __calculate_volatility_risk(best_individual, universe)
+    final_sector_risk = __calculate_sector_concentration_risk(best_individual, universe)
+    final_overlap_risk = __calculate_company_overlap_risk(best_individual, universe)
     
     message_lines.append("")
     message_lines.append(f"⚠️ *Risk Metrics:*")
@@ -530,15 +947,70 @@ def _format_portfolio_results(
     return "\n".join(message_lines)
 
 
-def optimize(stocks: List[StockData], budget: float = 50.0, max_per_etf_budget: float = 50.0) -> str:
+def _run_with_seed(run_optimization: Callable, seed: int, *args, **kwargs):
+    """
+    Run one optimization with the random number generator of the current process seeded.
+
+    DEAP draws from the global `random` module, so it is seeded rather than replaced by a local
+    generator; its previous state is restored afterwards, which leaves the caller's sequence untouched
+    when the runs happen in the calling process.
+    """
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        return run_optimization(*args, **kwargs)
+    finally:
+        random.setstate(state)
+
+
+def __run_optimizations(run_optimization: Callable, seeds: Tuple[int, int], parallel: bool, *args) -> Tuple[Any, Any]:
+    """Run the risk-aware and the profit-only optimization, in two worker processes when `parallel` is set."""
+    if not parallel:
+        return (
+            _run_with_seed(run_optimization, seeds[0], *args, include_risk=True),
+            _run_with_seed(run_optimization, seeds[1], *args, include_risk=False),
+        )
+    with utils.process_context().Pool(processes=2) as pool:
+        risk_aware = pool.apply_async(_run_with_seed, (run_optimization, seeds[0], *args), {"include_risk": True})
+        profit_only = pool.apply_async(_run_with_seed, (run_optimization, seeds[1], *args), {"include_risk": False})
+        return risk_aware.get(), profit_only.get()
+
+
+def optimize(
+    stocks: Union[List[StockData], Universe],
+    budget: float = 50.0,
+    max_per_etf_budget: float = 50.0,
+    solver: str = "ga",
+    seed: Optional[int] = None,
+    parallel: bool = True,
+    evaluation_backend: str = "serial",
+    evaluation_workers: Optional[int] = None,
+    time_budget: Optional[float] = None,
+    islands: int = 1,
+    migration_interval: int = MIGRATION_INTERVAL,
+    migration_topology: str = "ring"
+) -> str:
     """
     Optimize portfolio to suggest what ETFs to buy next.
     
     Args:
-        stocks: List of StockData objects containing current and predicted prices
+        stocks: List of StockData objects containing current and predicted prices, or a Universe built from
+                them earlier (e.g. loaded with `Universe.load` to re-optimize a past run)
         budget: Ideal budget to spend (default 50 EUR)
         max_per_etf_budget: Maximum to spend on a single ETF if expensive. 
                            If None, defaults to min(150, budget / 2) to ensure total doesn't exceed budget.
+        solver: "ga" for the genetic algorithm with the full nonlinear risk objective, or "exact" for the
+                deterministic knapsack solver (exact for profit-only, linearized risk for risk-aware)
+        seed: Seed for the genetic algorithm; the same seed gives the same result whether or not it runs in parallel
+        parallel: Run the risk-aware and profit-only genetic algorithms in two worker processes
+        evaluation_backend: How the genetic algorithm scores each generation: "serial", "multiprocessing" or "futures".
+                            With a process pool backend the two runs use the pool one after the other instead of running in parallel.
+        evaluation_workers: Number of evaluation worker processes (default: number of CPUs)
+        time_budget: Wall-clock seconds after which each genetic algorithm run stops early (default: no limit)
+        islands: Number of genetic algorithm populations evolving in separate processes (1 = single population).
+                 Like a process pool backend, islands make the two runs use their pool one after the other.
+        migration_interval: Generations between migrations of the best individuals across islands
+        migration_topology: "ring" sends migrants to the next island, "random" to a randomly chosen other island
         
     Returns:
         Formatted string for Telegram with optimization results
@@ -551,30 +1023,44 @@ def optimize(stocks: List[StockData], budget: float = 50.0, max_per_etf_budget:
         # Cap max_per_etf_budget at budget to prevent impossible constraints
         max_per_etf_budget = budget
     
+    if solver == "ga":
+        run_optimization = functools.partial(
+            _run_genetic_algorithm_with_map, evaluation_backend=evaluation_backend, evaluation_workers=evaluation_workers,
+            time_budget=time_budget, islands=islands, migration_interval=migration_interval,
+            migration_topology=migration_topology
+        )
+    elif solver == "exact":
+        run_optimization = _run_exact_solver_with_map
+    else:
+        raise ValueError(f"Unknown solver: {solver!r}, expected 'ga' or 'exact'")
+    
+    # The columns are built once and shared by both runs
+    universe = stocks if isinstance(stocks, Universe) else Universe.from_stock_data(stocks)
+    
     # Get current ETF ownership ONCE and reuse for both optimizations
     # This prevents the counter from being incremented between optimizations
     etf_map = __get_etf_map()
     
-    # Run risk-aware optimization
-    risk_aware_individual, risk_stocks, risk_current_prices, risk_predicted_prices, risk_dividend_yields, risk_expense_ratios, risk_tickers = _run_genetic_algorithm_with_map(
-        stocks, budget, max_per_etf_budget, etf_map, include_risk=True
-    )
+    # Each run gets its own seed so the result does not depend on which process runs it
+    seed_generator = random.Random(seed)
+    seeds = (seed_generator.getrandbits(32), seed_generator.getrandbits(32))
     
-    # Run profit-only optimization
-    profit_only_individual, profit_stocks, profit_current_prices, profit_predicted_prices, profit_dividend_yields, profit_expense_ratios, profit_tickers = _run_genetic_algorithm_with_map(
-        stocks, budget, max_per_etf_budget, etf_map, include_risk=False
+    # Run risk-aware and profit-only optimization; the exact solver is too fast to be worth a process pool
+    risk_aware_run, profit_only_run = __run_optimizations(
+        run_optimization, seeds, parallel and solver == "ga" and evaluation_backend == "serial" and islands <= 1,
+        universe, budget, max_per_etf_budget, etf_map
     )
+    risk_aware_individual, _, risk_logbook = risk_aware_run
+    profit_only_individual, _, profit_logbook = profit_only_run
+    # The exact solver has no logbook
+    for label, logbook in (("Risk-aware", risk_logbook), ("Profit-only", profit_logbook)):
+        if logbook is not None:
+            logging.info(f"{label} GA convergence: {convergence_summary(logbook)}")
     
     # Format both results
-    risk_aware_results = _format_portfolio_results(
-        risk_aware_individual, risk_stocks, risk_current_prices, risk_predicted_prices,
-        risk_dividend_yields, risk_expense_ratios, risk_tickers, include_risk=True
-    )
+    risk_aware_results = _format_portfolio_results(risk_aware_individual, universe, include_risk=True)
     
-    profit_only_results = _format_portfolio_results(
-        profit_only_individual, profit_stocks, profit_current_prices, profit_predicted_prices,
-        profit_dividend_yields, profit_expense_ratios, profit_tickers, include_risk=False
-    )
+    profit_only_results = _format_portfolio_results(profit_only_individual, universe, include_risk=False)
     
     # Combine results with headers
     message_lines = [
@@ -0,0 +1,275 @@
+from statistics import NormalDist
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+WEEKLY_PERIOD, WEEKLY_ORDER = 7.0, 3
+YEARLY_PERIOD, YEARLY_ORDER = 365.25, 10
+# Ridge penalty of the unpenalized intercept and slope, just enough to keep the normal equations solvable
+UNPENALIZED_RIDGE = 1e-8
+
+
+class FastForecaster:
+    """
+    NumPy-only stand-in for Prophet with the same forecast columns.
+
+    The model is Prophet's additive model without Stan: a piecewise-linear trend with changepoints spread
+    over the first `changepoint_range` of the history plus Fourier weekly and yearly terms, fitted in one
+    regularized (ridge) least squares solve. Prophet's priors become the ridge penalties: a coefficient with
+    prior scale `s` is penalized by `sigma^2 / s^2`, where `sigma` is the residual noise of a first fit.
+
+    Intervals are residual based: the in-sample residual spread plus the closed-form variance of future
+    trend changes, drawn like Prophet does with the historical changepoint rate and mean absolute change.
+    Holidays, multiplicative seasonality and MCMC sampling are not supported.
+
+    Many histories can be fitted together with `fit_many`: they share one date calendar and design matrix,
+    missing days are masked out, and all models are solved in a single batched solve.
+    """
+
+    def __init__(
+        self,
+        changepoint_prior_scale: float = 0.05,
+        seasonality_prior_scale: float = 0.1,
+        interval_width: float = 0.95,
+        weekly_seasonality: bool = True,
+        yearly_seasonality: bool = True,
+        n_changepoints: int = 25,
+        changepoint_range: float = 0.8,
+    ):
+        self.changepoint_prior_scale = changepoint_prior_scale
+        self.seasonality_prior_scale = seasonality_prior_scale
+        self.interval_width = interval_width
+        self.weekly_seasonality = weekly_seasonality
+        self.yearly_seasonality = yearly_seasonality
+        self.n_changepoints = n_changepoints
+        self.changepoint_range = changepoint_range
+        self.history: Optional[DataFrame] = None
+        self.changepoints_t: Optional[np.ndarray] = None
+        self.params: Optional[np.ndarray] = None
+        self.sigma_obs: float = 0.0
+
+    def fit(self, history: DataFrame) -> 'FastForecaster':
+        """
+        Fit the model.
+
+        Args:
+            history: DataFrame with columns 'ds' (datetime) and 'y' (numeric) and no missing values
+
+        Returns:
+            The fitted model
+        """
+        if self.history is not None:
+            raise Exception('FastForecaster object can only be fit once. Instantiate a new object.')
+        FastForecaster.__fit_panel([self], [history])
+        return self
+
+    @classmethod
+    def fit_many(cls, histories: Dict[str, DataFrame], **settings) -> Dict[str, 'FastForecaster']:
+        """
+        Fit one model per history in a single batched solve.
+
+        The histories are aligned on the union of their dates; a history simply has no rows (is masked out)
+        on the days it does not cover. The trend time scale and the changepoints come from that shared
+        calendar, so a model fitted here can differ slightly from one fitted on its history alone.
+
+        Args:
+            histories: DataFrames with columns 'ds' and 'y' by name
+            settings: Constructor arguments shared by all models
+
+        Returns:
+            Fitted models by the same names
+        """
+        models = {name: cls(**settings) for name in histories}
+        if models:
+            cls.__fit_panel(list(models.values()), list(histories.values()))
+        return models
+
+    def make_future_dataframe(self, periods: int, freq: str = 'D', include_history: bool = True) -> DataFrame:
+        """Dates to forecast: `periods` dates after the history, optionally preceded by the history dates."""
+        if self.history is None:
+            raise Exception('Model has not been fit.')
+        last_date = self.history['ds'].max()
+        dates = pd.date_range(start=last_date, periods=periods + 1, freq=freq)
+        dates = dates[dates > last_date][:periods]
+        if include_history:
+            dates = np.concatenate([np.array(self.history['ds']), np.array(dates)])
+        return DataFrame({'ds': dates})
+
+    def predict(self, future: DataFrame) -> DataFrame:
+        """
+        Forecast the given dates.
+
+        Returns:
+            DataFrame with 'ds', 'trend', the enabled seasonal components, 'yhat', 'yhat_lower' and 'yhat_upper'
+        """
+        return FastForecaster.predict_many({None: self}, {None: future})[None]
+
+    @staticmethod
+    def predict_many(models: Dict[str, 'FastForecaster'], futures: Dict[str, DataFrame]) -> Dict[str, DataFrame]:
+        """
+        Forecast the given dates of every model, with the design matrix built once for the union of all dates.
+
+        Args:
+            models: Models fitted together by `fit_many` (or a single model)
+            futures: Dates to forecast (column 'ds') by the same names
+
+        Returns:
+            Forecast frames, as returned by `predict`, by the same names
+        """
+        fitted = list(models.values())
+        if any(model.params is None for model in fitted):
+            raise Exception('Model has not been fit.')
+        template = fitted[0]
+        for model in fitted[1:]:
+            if not template.__shares_design(model):
+                raise ValueError("Models can only be predicted together if they were fitted together")
+
+        future_dates = {name: pd.to_datetime(futures[name]['ds']).reset_index(drop=True) for name in models}
+        calendar = pd.DatetimeIndex(np.unique(np.concatenate([dates.values for dates in future_dates.values()])))
+        features = template._features(calendar)
+        params = np.stack([model.params for model in fitted])
+        y_scales = np.array([model._y_scale for model in fitted])
+        trend_columns = 2 + len(template.changepoints_t)
+
+        components = {'trend': features[:, :trend_columns] @ params[:, :trend_columns].T * y_scales}
+        start = trend_columns
+        for name, enabled, order in template.__seasonalities():
+            if enabled:
+                end = start + 2 * order
+                components[name] = features[:, start:end] @ params[:, start:end].T * y_scales
+                start = end
+        yhat = sum(components.values())
+        z = NormalDist().inv_cdf(0.5 + template.interval_width / 2)
+        half_width = z * FastForecaster.__forecast_std(fitted, template._time(calendar)) * y_scales
+
+        forecasts = {}
+        for column, name in enumerate(models):
+            rows = calendar.get_indexer(future_dates[name])
+            model_yhat = yhat[rows, column]
+            forecasts[name] = DataFrame({
+                'ds': future_dates[name],
+                **{component: values[rows, column] for component, values in components.items()},
+                'yhat': model_yhat,
+                'yhat_lower': model_yhat - half_width[rows, column],
+                'yhat_upper': model_yhat + half_width[rows, column],
+            })
+        return forecasts
+
+    def plot(self, fcst: DataFrame, ax=None, uncertainty: bool = True, xlabel: str = 'ds', ylabel: str = 'y', figsize=(10, 6)):
+        """Plot the history and the forecast the way `Prophet.plot` does; returns the figure."""
+        if ax is None:
+            from matplotlib.figure import Figure
+            ax = Figure(facecolor='w', figsize=figsize).add_subplot(111)
+        ax.plot(self.history['ds'], self.history['y'], 'k.', label='Observed data points')
+        ax.plot(fcst['ds'], fcst['yhat'], ls='-', c='#0072B2', label='Forecast')
+        if uncertainty:
+            ax.fill_between(fcst['ds'], fcst['yhat_lower'], fcst['yhat_upper'], color='#0072B2', alpha=0.2,
+                            label='Uncertainty interval')
+        ax.grid(True, which='major', c='gray', ls='-', lw=1, alpha=0.2)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        ax.get_figure().tight_layout()
+        return ax.get_figure()
+
+    def _time(self, ds: pd.Series) -> np.ndarray:
+        return np.asarray((pd.to_datetime(ds) - self._start) / self._t_scale, dtype=float)
+
+    def _features(self, ds: pd.Series) -> np.ndarray:
+        t = self._time(ds)
+        columns = [np.ones_like(t), t, np.maximum(t[:, None] - self.changepoints_t[None, :], 0.0)]
+        # Seasonal terms use absolute days, so the components line up across fits of different windows
+        days = (pd.to_datetime(ds) - pd.Timestamp('1970-01-01')) / pd.Timedelta(days=1)
+        days = np.asarray(days, dtype=float)
+        for name, enabled, order in self.__seasonalities():
+            if enabled:
+                period = WEEKLY_PERIOD if name == 'weekly' else YEARLY_PERIOD
+                angles = 2 * np.pi * np.arange(1, order + 1)[None, :] * days[:, None] / period
+                columns.extend([np.sin(angles), np.cos(angles)])
+        return np.column_stack(columns)
+
+    def __seasonalities(self):
+        return [('weekly', self.weekly_seasonality, WEEKLY_ORDER), ('yearly', self.yearly_seasonality, YEARLY_ORDER)]
+
+    def __shares_design(self, other: 'FastForecaster') -> bool:
+        return (self._start, self._t_scale) == (other._start, other._t_scale) \
+            and np.array_equal(self.changepoints_t, other.changepoints_t) \
+            and self.__seasonalities() == other.__seasonalities() \
+            and self.interval_width == other.interval_width
+
+    def __changepoints(self, t: np.ndarray) -> np.ndarray:
+        # Same placement as Prophet: evenly spaced over the history points of the first `changepoint_range`
+        candidates = t[1:int(np.floor(len(t) * self.changepoint_range))]
+        count = min(self.n_changepoints, len(candidates))
+        if count == 0:
+            return np.empty(0)
+        return candidates[np.linspace(0, len(candidates) - 1, count).round().astype(int)]
+
+    @staticmethod
+    def __fit_panel(models: List['FastForecaster'], histories: List[DataFrame]):
+        histories = [history[['ds', 'y']].drop_duplicates(subset=['ds'], keep='last').sort_values('ds').reset_index(drop=True)
+                     for history in histories]
+        calendar = pd.DatetimeIndex(np.unique(np.concatenate([history['ds'].values for history in histories])))
+        if min(len(history) for history in histories) < 2:
+            raise ValueError("Insufficient data for prediction. Need at least 2 data points.")
+
+        # Panel of prices: one row per calendar day, one column per model, NaN where a history has no price
+        panel = np.full((len(calendar), len(models)), np.nan)
+        for column, history in enumerate(histories):
+            panel[calendar.get_indexer(history['ds']), column] = history['y'].to_numpy(dtype=float)
+        y_scales = np.nanmax(np.abs(panel), axis=0)
+        y_scales[y_scales == 0] = 1.0
+        panel /= y_scales
+        mask = ~np.isnan(panel)
+        observed = np.where(mask, panel, 0.0)
+
+        template = models[0]
+        template._start, template._t_scale = calendar[0], calendar[-1] - calendar[0]
+        changepoints_t = template.__changepoints(template._time(calendar))
+        for model, history, y_scale in zip(models, histories, y_scales):
+            model.history = history
+            model._start, model._t_scale, model._y_scale = template._start, template._t_scale, float(y_scale)
+            model.changepoints_t = changepoints_t
+        features = template._features(calendar)
+
+        # Normal equations of every model at once: masked Gram matrices X' diag(mask_j) X in one matrix product
+        days, size = features.shape
+        outer = (features[:, :, None] * features[:, None, :]).reshape(days, size * size)
+        grams = (mask.T.astype(float) @ outer).reshape(len(models), size, size)
+        moments = observed.T @ features
+        diagonal = np.arange(size)
+        penalty_scales = np.concatenate([
+            np.full(2, np.inf),
+            np.full(len(changepoints_t), template.changepoint_prior_scale),
+            np.full(size - 2 - len(changepoints_t), template.seasonality_prior_scale),
+        ])
+
+        # The penalties depend on the noise level, which is only known after a first fit
+        sigma = np.fmax(np.nanstd(np.diff(panel, axis=0), axis=0), 1e-6)
+        for _ in range(2):
+            penalized = grams.copy()
+            penalized[:, diagonal, diagonal] += sigma[:, None] ** 2 / penalty_scales[None, :] ** 2 + UNPENALIZED_RIDGE
+            params = np.linalg.solve(penalized, moments[..., None])[..., 0]
+            residuals = np.where(mask, panel - features @ params.T, np.nan)
+            sigma = np.fmax(np.nanstd(residuals, axis=0), 1e-6)
+
+        for model, model_params, model_sigma in zip(models, params, sigma):
+            model.params = model_params
+            model.sigma_obs = float(model_sigma)
+
+    @staticmethod
+    def __forecast_std(models: List['FastForecaster'], t: np.ndarray) -> np.ndarray:
+        # Future rate changes arrive at the historical changepoint rate with a Laplace(0, b) size, b being the
+        # mean absolute fitted change. A change at s shifts the trend at t by delta * (t - s); summing the
+        # variances 2b^2 (t - s)^2 over a Poisson process of such changes after the history end (t = 1) gives
+        # rate * 2b^2 * h^3 / 3 for the horizon h = t - 1.
+        template = models[0]
+        sigma = np.array([model.sigma_obs for model in models])
+        changepoint_count = len(template.changepoints_t)
+        trend_variance = np.zeros((len(t), len(models)))
+        if changepoint_count:
+            rate = changepoint_count / template.changepoint_range
+            mean_change = np.array([np.mean(np.abs(model.params[2:2 + changepoint_count])) for model in models])
+            trend_variance = rate * 2 * mean_change[None, :] ** 2 * np.maximum(t - 1.0, 0.0)[:, None] ** 3 / 3
+        return np.sqrt(sigma[None, :] ** 2 + trend_variance)
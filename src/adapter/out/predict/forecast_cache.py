@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import pickle
+import sys
+from importlib import metadata
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.infrastructure.utils.lazy import lazy_import
+
+prophet_serialize = lazy_import("prophet.serialize")
+
+# Bump when the stored payload or the fast engine changes in a way that makes old entries wrong
+FORMAT_VERSION = 1
+
+# An over-budget cache is evicted down to this share of the budget, so the next writes do not walk it again
+EVICTION_TARGET = 0.9
+
+# Bytes each cache directory takes as far as this process knows: measured by the first write, then kept up
+# to date by its own writes and evictions. Writes of other processes are only seen at the next eviction.
+_cache_bytes: Dict[str, int] = {}
+
+
+def key(history: pd.DataFrame, settings: dict) -> str:
+    """
+    Content address of a forecast: the cleaned (ds, y) history plus every setting the forecast depends on.
+
+    The library versions are part of the key, so upgrading Prophet, NumPy or pandas never serves a
+    forecast computed by the old version.
+    """
+    digest = hashlib.sha256()
+    digest.update(history['ds'].to_numpy(dtype='datetime64[ns]').view(np.int64).tobytes())
+    digest.update(history['y'].to_numpy(dtype=np.float64).tobytes())
+    # The installed Prophet version is read from its package metadata, so fast-engine runs never import Prophet
+    versions = {'format': FORMAT_VERSION, 'prophet': metadata.version('prophet'),
+                'numpy': np.__version__, 'pandas': pd.__version__}
+    digest.update(json.dumps({**versions, **settings}, sort_keys=True, default=str).encode('utf8'))
+    return digest.hexdigest()
+
+
+def load(directory: str, forecast_key: str) -> Optional[Tuple[Any, pd.DataFrame]]:
+    """
+    Load a cached (fitted model, forecast) pair.
+
+    Returns:
+        The pair, or None when nothing is cached under the key or the entry cannot be read or decoded
+    """
+    path = __path(directory, forecast_key)
+    try:
+        with open(path, 'rb') as file:
+            payload = pickle.load(file)
+        model = prophet_serialize.model_from_json(payload['model']) if payload['model_format'] == 'prophet' else payload['model']
+        forecast = payload['forecast']
+        # Entries are evicted oldest first, so a hit makes the entry young again
+        os.utime(path)
+    except Exception:
+        # A truncated file, or an entry written by an incompatible Prophet version, is refitted like a miss
+        return None
+    return model, forecast
+
+
+def store(directory: str, forecast_key: str, model: Any, forecast: pd.DataFrame, max_bytes: int = 0):
+    """
+    Cache a fitted model with its forecast, then evict the oldest entries beyond `max_bytes` (0 = no limit).
+
+    Prophet models are stored in Prophet's JSON format, any other model is pickled as is. The cache is
+    only walked for eviction once the running size total of this process exceeds the budget.
+    """
+    path = __path(directory, forecast_key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    replaced_bytes = __size(path)
+    if __is_prophet(model):
+        payload = {'model_format': 'prophet', 'model': prophet_serialize.model_to_json(model), 'forecast': forecast}
+    else:
+        payload = {'model_format': 'pickle', 'model': model, 'forecast': forecast}
+    # Write to a temporary file first so parallel workers never read a half-written entry
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as file:
+        pickle.dump(payload, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    if max_bytes <= 0:
+        return
+    if directory in _cache_bytes:
+        _cache_bytes[directory] += __size(path) - replaced_bytes
+    else:
+        _cache_bytes[directory] = __measure(directory)
+    if _cache_bytes[directory] > max_bytes:
+        evict(directory, int(max_bytes * EVICTION_TARGET))
+
+
+def evict(directory: str, max_bytes: int) -> int:
+    """Delete the least recently used entries until the cache takes at most `max_bytes`; returns the bytes left."""
+    entries = __entries(directory)
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+    _cache_bytes[directory] = total
+    return total
+
+
+def __measure(directory: str) -> int:
+    return sum(size for _, size, _ in __entries(directory))
+
+
+def __entries(directory: str):
+    """(modification time, size, path) of every cache entry."""
+    entries = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith('.pkl'):
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(root, name)))
+    return entries
+
+
+def __size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def __is_prophet(model: Any) -> bool:
+    # A Prophet model can only exist once Prophet has been imported
+    return 'prophet' in sys.modules and isinstance(model, sys.modules['prophet'].Prophet)
+
+
+def __path(directory: str, forecast_key: str) -> str:
+    return os.path.join(directory, forecast_key[:2], f'{forecast_key}.pkl')
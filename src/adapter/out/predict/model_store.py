@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from datetime import date
+from typing import Optional
+
+import numpy as np
+
+from src.infrastructure.utils.lazy import lazy_import
+
+prophet_package = lazy_import("prophet")
+
+
+def fingerprint(settings: dict) -> str:
+    """
+    Identify the hyperparameters a model was fitted with.
+
+    A stored model is only reused when the fingerprint matches, so changing any setting
+    (for example `changepoint_prior_scale` or `seasonality_mode`) or upgrading Prophet invalidates it.
+    """
+    payload = json.dumps({'prophet': prophet_package.__version__, **settings}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf8')).hexdigest()
+
+
+def save(directory: str, ticker: str, window: Optional[int], model_fingerprint: str, init: dict):
+    """
+    Persist the fitted parameters (in Stan init shape) of a ticker and window.
+
+    Only what a warm start reads back is stored; the full model with its history is a lot larger
+    and the forecast cache keeps it where it is needed.
+    """
+    path = __path(directory, ticker, window)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = {
+        'fingerprint': model_fingerprint,
+        'saved_on': str(date.today()),
+        'init': {name: np.asarray(value).tolist() for name, value in init.items()},
+    }
+    # Write to a temporary file first so parallel workers never read a half-written model
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as file:
+        json.dump(payload, file)
+    os.replace(tmp_path, path)
+
+
+def load_init(directory: str, ticker: str, window: Optional[int], model_fingerprint: str, max_age_days: int = 30) -> Optional[dict]:
+    """
+    Load the fitted parameters of a stored model to warm-start a new fit.
+
+    Returns:
+        Stan init values, or None when nothing is stored, the fingerprint differs or the model is older than `max_age_days`
+    """
+    payload = __read(directory, ticker, window)
+    if payload is None or payload.get('fingerprint') != model_fingerprint:
+        return None
+    if (date.today() - date.fromisoformat(payload['saved_on'])).days > max_age_days:
+        return None
+    return {name: np.asarray(value) if isinstance(value, list) else value for name, value in payload['init'].items()}
+
+
+def __read(directory: str, ticker: str, window: Optional[int]) -> Optional[dict]:
+    path = __path(directory, ticker, window)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def __path(directory: str, ticker: str, window: Optional[int]) -> str:
+    safe_ticker = re.sub(r'[^A-Za-z0-9._-]', '_', ticker)
+    window_name = 'full' if window is None else f'{window}d'
+    return os.path.join(directory, safe_ticker, f'{window_name}.json')
@@ -1,8 +1,33 @@
+from __future__ import annotations
+
 from pandas import DataFrame
-from prophet import Prophet
 import pandas as pd
 import numpy as np
-from typing import Tuple, Optional
+import logging
+from typing import Dict, List, Tuple, Optional, Protocol
+
+from src.adapter.out.predict import forecast_cache, model_store
+from src.adapter.out.predict.fast_forecaster import FastForecaster
+from src.infrastructure.utils.lazy import lazy_import
+
+# Prophet brings in cmdstanpy and matplotlib; the fast engine and the other entry points never need it
+prophet_package = lazy_import("prophet")
+prophet_holidays = lazy_import("prophet.make_holidays")
+
+# "prophet" fits Prophet with Stan, "fast" the NumPy-only FastForecaster (no holidays, additive only)
+FORECAST_ENGINES = ("prophet", "fast")
+
+
+class Forecaster(Protocol):
+    """What the analysis and the charts need from a forecasting model; both Prophet and FastForecaster fit it."""
+
+    def fit(self, df: DataFrame, **kwargs) -> 'Forecaster': ...
+
+    def make_future_dataframe(self, periods: int, freq: str = 'D', include_history: bool = True) -> DataFrame: ...
+
+    def predict(self, df: DataFrame) -> DataFrame: ...
+
+    def plot(self, fcst: DataFrame, ax=None, **kwargs): ...
 
 
 def predict(
@@ -17,8 +42,11 @@ def predict(
     weekly_seasonality: bool = True,
     yearly_seasonality: bool = True,
     daily_seasonality: bool = False,
-    add_holidays: bool = True
-) -> Tuple[Prophet, DataFrame]:
+    add_holidays: bool = True,
+    engine: str = "prophet",
+    forecast_cache_dir: Optional[str] = None,
+    forecast_cache_max_bytes: int = 0
+) -> Tuple[Forecaster, DataFrame]:
     """
     Predict future prices using Facebook Prophet with financial time series optimizations.
     
@@ -35,23 +63,58 @@ def predict(
         yearly_seasonality: Enable yearly seasonality (default: True for financial data)
         daily_seasonality: Enable daily seasonality (default: False for daily data)
         add_holidays: Add US market holidays (default: True)
+        engine: One of FORECAST_ENGINES (default: 'prophet')
+        forecast_cache_dir: Directory of the forecast cache; an identical history with identical arguments
+            is served from it without fitting (None = no cache)
+        forecast_cache_max_bytes: Size budget of the forecast cache, oldest entries are evicted first (0 = no limit)
     
     Returns:
-        Tuple of (fitted Prophet model, forecast DataFrame)
+        Tuple of (fitted model, forecast DataFrame)
     """
-    # Reset index and ensure proper data types
-    data = data.reset_index(drop=True).copy()
-    data['ds'] = pd.to_datetime(data['ds'], errors='coerce')
-    data['y'] = pd.to_numeric(data['y'], errors='coerce')
-    
-    # Remove any NaN values
-    data = data.dropna(subset=['ds', 'y'])
-    
-    if len(data) < 2:
-        raise ValueError("Insufficient data for prediction. Need at least 2 data points.")
-    
+    data = __prepare_data(data)
+    __check_engine(engine, seasonality_mode)
+    cache_key = None
+    if forecast_cache_dir is not None:
+        cache_key = forecast_cache.key(data, dict(
+            function='predict', predict_period=predict_period, seasonality_mode=seasonality_mode,
+            changepoint_prior_scale=changepoint_prior_scale, seasonality_prior_scale=seasonality_prior_scale,
+            holidays_prior_scale=holidays_prior_scale, mcmc_samples=mcmc_samples, interval_width=interval_width,
+            weekly_seasonality=weekly_seasonality, yearly_seasonality=yearly_seasonality,
+            daily_seasonality=daily_seasonality, add_holidays=add_holidays, engine=engine
+        ))
+        cached = forecast_cache.load(forecast_cache_dir, cache_key)
+        if cached is not None:
+            return cached
+
+    if engine == "fast":
+        model = __fast_forecaster(changepoint_prior_scale, seasonality_prior_scale, interval_width,
+                                  weekly_seasonality, yearly_seasonality).fit(data)
+        result = model, __to_result(model.predict(model.make_future_dataframe(periods=predict_period, freq='B')))
+    else:
+        result = __predict_with_prophet(data, predict_period, seasonality_mode, changepoint_prior_scale,
+                                        seasonality_prior_scale, holidays_prior_scale, mcmc_samples, interval_width,
+                                        weekly_seasonality, yearly_seasonality, daily_seasonality, add_holidays)
+    if cache_key is not None:
+        forecast_cache.store(forecast_cache_dir, cache_key, *result, max_bytes=forecast_cache_max_bytes)
+    return result
+
+
+def __predict_with_prophet(
+    data: DataFrame,
+    predict_period: int,
+    seasonality_mode: str,
+    changepoint_prior_scale: float,
+    seasonality_prior_scale: float,
+    holidays_prior_scale: float,
+    mcmc_samples: int,
+    interval_width: float,
+    weekly_seasonality: bool,
+    yearly_seasonality: bool,
+    daily_seasonality: bool,
+    add_holidays: bool
+) -> Tuple[prophet_package.Prophet, DataFrame]:
     # Configure Prophet with financial time series optimizations
-    prophet = Prophet(
+    prophet = prophet_package.Prophet(
         seasonality_mode=seasonality_mode,
         changepoint_prior_scale=changepoint_prior_scale,
         seasonality_prior_scale=seasonality_prior_scale,
@@ -92,6 +155,290 @@ def predict(
     # Make predictions
     forecast = prophet.predict(future)
     
+    return prophet, __to_result(forecast)
+
+
+def predict_windows(
+    data: DataFrame,
+    windows: List[Optional[int]],
+    predict_period: int = 30,
+    seasonality_mode: str = 'additive',
+    changepoint_prior_scale: float = 0.05,
+    seasonality_prior_scale: float = 0.1,
+    holidays_prior_scale: float = 10.0,
+    mcmc_samples: int = 0,
+    interval_width: float = 0.95,
+    weekly_seasonality: bool = True,
+    yearly_seasonality: bool = True,
+    daily_seasonality: bool = False,
+    add_holidays: bool = True,
+    ticker: Optional[str] = None,
+    model_store_dir: Optional[str] = None,
+    engine: str = "prophet",
+    forecast_cache_dir: Optional[str] = None,
+    forecast_cache_max_bytes: int = 0
+) -> List[Tuple[Forecaster, DataFrame]]:
+    """
+    Predict future prices from several lookback windows of the same history.
+
+    Data cleaning, the holiday frame and the future dates are prepared once for all windows.
+    Windows are fitted from the longest to the shortest and every fit is warm-started from the
+    parameters of the previous (longer) one, which lets Stan converge in far fewer iterations.
+    With a `ticker` and `model_store_dir` the fitted models are persisted, and the next fit of the
+    same ticker and window is warm-started from the stored parameters instead. The fast engine
+    fits every window directly and does not use the model store. A window whose history and
+    arguments are unchanged since an earlier run is served from the forecast cache without fitting.
+
+    Args:
+        data: DataFrame with columns 'ds' (datetime) and 'y' (numeric)
+        windows: Lookback windows in days counted back from the last date (None = the whole history)
+        predict_period: Number of business days to forecast
+        ticker: Ticker the history belongs to, used as the model store key
+        model_store_dir: Directory of the persisted models (None = do not persist)
+        engine: One of FORECAST_ENGINES (default: 'prophet')
+        forecast_cache_dir: Directory of the forecast cache (None = no cache)
+        forecast_cache_max_bytes: Size budget of the forecast cache (0 = no limit)
+        Remaining arguments are the same as for `predict`
+
+    Returns:
+        List of (fitted model, forecast DataFrame) tuples in the order of `windows`
+    """
+    data = __prepare_data(data)
+    __check_engine(engine, seasonality_mode)
+    last_date = data['ds'].max()
+
+    # The windows share the last date, so they share the forecasted dates as well
+    future_dates = __future_dates(last_date, predict_period)
+
+    holidays = None
+    if add_holidays and engine == "prophet":
+        forecast_end = future_dates[-1] if len(future_dates) else last_date
+        holidays = prophet_holidays.make_holidays_df(year_list=list(range(data['ds'].min().year, forecast_end.year + 1)), country='US')
+
+    window_data = {}
+    for window in windows:
+        selected = data if window is None else data[data['ds'] >= last_date - pd.Timedelta(days=window)]
+        if len(selected) < 2:
+            raise ValueError("Insufficient data for prediction. Need at least 2 data points.")
+        window_data[window] = selected.reset_index(drop=True)
+
+    prophet_settings = dict(
+        seasonality_mode=seasonality_mode,
+        changepoint_prior_scale=changepoint_prior_scale,
+        seasonality_prior_scale=seasonality_prior_scale,
+        holidays_prior_scale=holidays_prior_scale,
+        mcmc_samples=mcmc_samples,
+        interval_width=interval_width,
+        weekly_seasonality=weekly_seasonality,
+        yearly_seasonality=yearly_seasonality,
+        daily_seasonality=daily_seasonality
+    )
+    # The window itself is not part of the settings: its rows are part of the cache key already
+    cache_settings = {**prophet_settings, 'function': 'predict_windows', 'add_holidays': add_holidays,
+                      'predict_period': predict_period, 'engine': engine}
+
+    results = {}
+    init = None
+    for window in sorted(window_data, key=lambda w: len(window_data[w]), reverse=True):
+        history = window_data[window]
+        cache_key = None
+        if forecast_cache_dir is not None:
+            cache_key = forecast_cache.key(history, cache_settings)
+            cached = forecast_cache.load(forecast_cache_dir, cache_key)
+            if cached is not None:
+                results[window] = cached
+                if engine == "prophet":
+                    init = __warm_start_params(cached[0])
+                continue
+
+        future = pd.DataFrame({'ds': pd.concat([history['ds'], pd.Series(future_dates)], ignore_index=True)})
+        if engine == "fast":
+            model = __fast_forecaster(changepoint_prior_scale, seasonality_prior_scale, interval_width,
+                                      weekly_seasonality, yearly_seasonality).fit(history)
+            results[window] = (model, __to_result(model.predict(future)))
+        else:
+            results[window], init = __fit_prophet_window(history, future, window, prophet_settings, holidays, init,
+                                                         add_holidays, ticker, model_store_dir)
+        if cache_key is not None:
+            forecast_cache.store(forecast_cache_dir, cache_key, *results[window], max_bytes=forecast_cache_max_bytes)
+
+    return [results[window] for window in windows]
+
+
+def __fit_prophet_window(
+    history: DataFrame,
+    future: DataFrame,
+    window: Optional[int],
+    prophet_settings: dict,
+    holidays: Optional[DataFrame],
+    init: Optional[dict],
+    add_holidays: bool,
+    ticker: Optional[str],
+    model_store_dir: Optional[str]
+) -> Tuple[Tuple[prophet_package.Prophet, DataFrame], dict]:
+    """Fit one window warm-started from `init`; returns the (model, forecast) pair and the init for the next window."""
+    use_store = ticker is not None and model_store_dir is not None
+    if use_store:
+        model_fingerprint = model_store.fingerprint({**prophet_settings, 'add_holidays': add_holidays, 'window': window})
+        # Yesterday's model of the same window is a better starting point than a longer window
+        init = model_store.load_init(model_store_dir, ticker, window, model_fingerprint) or init
+    prophet = prophet_package.Prophet(**prophet_settings, holidays=holidays)
+    # Prophet falls back to its own initial values for any parameter whose shape does not match
+    if init is None:
+        prophet.fit(history)
+    else:
+        prophet.fit(history, init=init)
+    init = __warm_start_params(prophet)
+    if use_store:
+        model_store.save(model_store_dir, ticker, window, model_fingerprint, init)
+    return (prophet, __to_result(prophet.predict(future))), init
+
+
+def predict_panel(
+    histories: Dict[str, DataFrame],
+    windows: List[Optional[int]],
+    predict_period: int = 30,
+    changepoint_prior_scale: float = 0.05,
+    seasonality_prior_scale: float = 0.1,
+    interval_width: float = 0.95,
+    weekly_seasonality: bool = True,
+    yearly_seasonality: bool = True,
+    forecast_cache_dir: Optional[str] = None,
+    forecast_cache_max_bytes: int = 0
+) -> Dict[str, List[Tuple[FastForecaster, DataFrame]]]:
+    """
+    Forecast the histories of many tickers at once with the fast engine.
+
+    Per window, all histories are aligned on one date calendar (days a ticker has no price for are masked
+    out), the design matrix is built once and every ticker is fitted in the same batched solve. The
+    forecast frames of all tickers are then computed from one design matrix as well.
+
+    A ticker window whose history and arguments are unchanged since an earlier run is served from the
+    forecast cache, and only the other windows are fitted together. A cached forecast keeps the calendar
+    of the batch it was fitted in, which differs slightly from a fit in today's batch.
+
+    Args:
+        histories: DataFrames with columns 'ds' (datetime) and 'y' (numeric) by ticker
+        windows: Lookback windows in days counted back from each ticker's last date (None = the whole history)
+        predict_period: Number of business days to forecast after each ticker's last date
+        forecast_cache_dir: Directory of the forecast cache (None = no cache)
+        forecast_cache_max_bytes: Size budget of the forecast cache (0 = no limit)
+        Remaining arguments are the same as for `predict`
+
+    Returns:
+        Per ticker, a list of (fitted model, forecast DataFrame) tuples in the order of `windows`, just like
+        `predict_windows(..., engine="fast")`. Tickers with too little data are logged and left out.
+    """
+    prepared = {}
+    for ticker, data in histories.items():
+        try:
+            data = __prepare_data(data)
+        except ValueError as e:
+            logging.error(f"Skipped the batch forecast of `{ticker}`: {e}")
+            continue
+        last_date = data['ds'].max()
+        selected = [data if window is None else data[data['ds'] >= last_date - pd.Timedelta(days=window)] for window in windows]
+        if min(len(window_data) for window_data in selected) < 2:
+            logging.error(f"Skipped the batch forecast of `{ticker}`: Insufficient data for prediction. Need at least 2 data points.")
+            continue
+        prepared[ticker] = [window_data.reset_index(drop=True) for window_data in selected]
+
+    # Most tickers end on the same day, so their forecasted dates are only generated once
+    future_dates = {}
+    for window_histories in prepared.values():
+        last_date = window_histories[0]['ds'].max()
+        if last_date not in future_dates:
+            future_dates[last_date] = pd.Series(__future_dates(last_date, predict_period))
+
+    # The window itself is not part of the settings: its rows are part of the cache key already
+    cache_settings = dict(
+        function='predict_panel', engine='fast', predict_period=predict_period,
+        changepoint_prior_scale=changepoint_prior_scale, seasonality_prior_scale=seasonality_prior_scale,
+        interval_width=interval_width, weekly_seasonality=weekly_seasonality, yearly_seasonality=yearly_seasonality
+    )
+
+    results = {ticker: [None] * len(windows) for ticker in prepared}
+    for position in range(len(windows)):
+        window_histories = {}
+        cache_keys = {}
+        for ticker, window_data in prepared.items():
+            if forecast_cache_dir is not None:
+                cache_keys[ticker] = forecast_cache.key(window_data[position], cache_settings)
+                cached = forecast_cache.load(forecast_cache_dir, cache_keys[ticker])
+                if cached is not None:
+                    results[ticker][position] = cached
+                    continue
+            window_histories[ticker] = window_data[position]
+        if not window_histories:
+            continue
+
+        models = FastForecaster.fit_many(
+            window_histories,
+            changepoint_prior_scale=changepoint_prior_scale,
+            seasonality_prior_scale=seasonality_prior_scale,
+            interval_width=interval_width,
+            weekly_seasonality=weekly_seasonality,
+            yearly_seasonality=yearly_seasonality
+        )
+        futures = {ticker: pd.DataFrame({'ds': pd.concat([history['ds'], future_dates[history['ds'].max()]], ignore_index=True)})
+                   for ticker, history in window_histories.items()}
+        forecasts = FastForecaster.predict_many(models, futures)
+        for ticker in window_histories:
+            results[ticker][position] = (models[ticker], __to_result(forecasts[ticker]))
+            if forecast_cache_dir is not None:
+                forecast_cache.store(forecast_cache_dir, cache_keys[ticker], *results[ticker][position],
+                                     max_bytes=forecast_cache_max_bytes)
+    return results
+
+
+def __future_dates(last_date: pd.Timestamp, predict_period: int) -> pd.DatetimeIndex:
+    future_dates = pd.date_range(start=last_date, periods=predict_period + 1, freq='B')
+    return future_dates[future_dates > last_date][:predict_period]
+
+
+def __check_engine(engine: str, seasonality_mode: str):
+    if engine not in FORECAST_ENGINES:
+        raise ValueError(f"Unknown forecast engine `{engine}`, expected one of {FORECAST_ENGINES}")
+    if engine == "fast" and seasonality_mode != 'additive':
+        raise ValueError("The fast forecast engine only supports additive seasonality")
+
+
+def __fast_forecaster(changepoint_prior_scale: float, seasonality_prior_scale: float, interval_width: float,
+                      weekly_seasonality: bool, yearly_seasonality: bool) -> FastForecaster:
+    return FastForecaster(
+        changepoint_prior_scale=changepoint_prior_scale,
+        seasonality_prior_scale=seasonality_prior_scale,
+        interval_width=interval_width,
+        weekly_seasonality=weekly_seasonality,
+        yearly_seasonality=yearly_seasonality
+    )
+
+
+def __prepare_data(data: DataFrame) -> DataFrame:
+    # Reset index and ensure proper data types
+    data = data.reset_index(drop=True).copy()
+    data['ds'] = pd.to_datetime(data['ds'], errors='coerce')
+    data['y'] = pd.to_numeric(data['y'], errors='coerce')
+    
+    # Remove any NaN values
+    data = data.dropna(subset=['ds', 'y'])
+    
+    if len(data) < 2:
+        raise ValueError("Insufficient data for prediction. Need at least 2 data points.")
+    return data
+
+
+def __warm_start_params(prophet: prophet_package.Prophet) -> dict:
+    """Fitted parameters of a model in the shape Stan expects as initial values."""
+    params = {}
+    for name in ['k', 'm', 'sigma_obs']:
+        params[name] = float(np.mean(prophet.params[name]))
+    for name in ['delta', 'beta']:
+        params[name] = np.mean(prophet.params[name], axis=0)
+    return params
+
+
+def __to_result(forecast: DataFrame) -> DataFrame:
     # Extract relevant columns
     res = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].copy()
     
@@ -105,4 +452,4 @@ def predict(
     # Calculate prediction intervals
     res['uncertainty_range'] = res['yhat_upper'] - res['yhat_lower']
     
-    return prophet, res
+    return res
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import io
+from typing import Optional
+
+import pandas as pd
+
+from src.adapter.out.predict.predicter import Forecaster
+from src.infrastructure.utils.lazy import lazy_import
+
+matplotlib = lazy_import("matplotlib")
+matplotlib_figure = lazy_import("matplotlib.figure")
+
+FIGURE_SIZE = (10, 6)  # Same size as `Prophet.plot` uses
+
+# One figure per process, cleared and redrawn for every chart. It is created without pyplot, so it is
+# never registered in pyplot's figure manager and cannot pile up across ETFs.
+_figure: Optional[matplotlib_figure.Figure] = None
+
+
+def render_forecast(prophet: Forecaster, forecast: pd.DataFrame, name: str) -> io.BytesIO:
+    """
+    Render the forecast plot of a fitted model as a PNG in memory.
+
+    Args:
+        prophet: Fitted model, Prophet or FastForecaster
+        forecast: Forecast frame returned by the model
+        name: File name the chart is sent under, e.g. `two_year_VOO.png`
+
+    Returns:
+        PNG buffer positioned at its start, with `name` set so it can be uploaded like an open file
+    """
+    figure = __reusable_figure()
+    try:
+        prophet.plot(forecast, ax=figure.add_subplot(111))
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format='png')
+    finally:
+        figure.clear()
+    buffer.seek(0)
+    buffer.name = name
+    return buffer
+
+
+def __reusable_figure() -> matplotlib_figure.Figure:
+    global _figure
+    if _figure is None:
+        # Charts are only ever rendered to memory; never pick up an interactive backend
+        matplotlib.use("Agg")
+        _figure = matplotlib_figure.Figure(figsize=FIGURE_SIZE, facecolor='w')
+    return _figure
@@ -1,13 +1,126 @@
-import requests
+import atexit
+import logging
+import os
+import threading
+from collections import Counter
+from typing import Callable, List, Optional, Tuple
+
 from src.logic.data.data import StockData
+from src.infrastructure.utils.lazy import lazy_import
 import config.configuration as configuration
 
-def calculate(analyses_result: StockData):
+requests = lazy_import("requests")
+
+# "get": one GET per increment, the Apps Script's original doGet API, which increments by one. Nothing
+#        is batched: a run still sends 2 requests per ETF, only the connection is reused
+# "post": all increments of a flush in one JSON POST, for a script with a matching doPost
+STATS_MODES = ("get", "post")
+REQUEST_TIMEOUT = 30
+
+# One sink per process, created on the first result
+_sink: Optional['StatsSink'] = None
+
+
+def increments(analyses_result: StockData) -> List[Tuple[str, str]]:
+    """(sheet, value) counters one analysis result increments."""
     if analyses_result.is_stock_growing and analyses_result.profitability_data.is_profitable():
-        increment_counter_endpoint = f'https://script.google.com/macros/s/{configuration.APP_SCRIPT_ID}/exec?value="{analyses_result.industry}"&sheet="etf_industry_positive"'
-        increment_counter_endpoint_company = f'https://script.google.com/macros/s/{configuration.APP_SCRIPT_ID}/exec?value="{analyses_result.stock_name}"&sheet="etf_positive"'
-    else:
-        increment_counter_endpoint = f'https://script.google.com/macros/s/{configuration.APP_SCRIPT_ID}/exec?value="{analyses_result.industry}"&sheet="etf_industry_negative"'
-        increment_counter_endpoint_company = f'https://script.google.com/macros/s/{configuration.APP_SCRIPT_ID}/exec?value="{analyses_result.stock_name}"&sheet="etf_negative"'
-    requests.get(increment_counter_endpoint)
-    requests.get(increment_counter_endpoint_company)
+        return [("etf_industry_positive", analyses_result.industry), ("etf_positive", analyses_result.stock_name)]
+    return [("etf_industry_negative", analyses_result.industry), ("etf_negative", analyses_result.stock_name)]
+
+
+class StatsSink:
+    """
+    Accumulates counter increments in memory and sends them over one pooled HTTP session when flushed.
+
+    Only the "post" mode batches them into one request per flush. The default "get" mode talks to the
+    script's original doGet, which increments by one, so it sends one request per increment as before;
+    it saves the connection set-up and keeps the requests out of the analysis.
+
+    Increments are flushed every `flush_every` results (0 = only on `flush`) and when the process exits.
+    A failed flush keeps what was not sent for the next one; the `on_flushed` callbacks of the results
+    run once all their increments are sent. Only the main process counts: stock_finder hands the results
+    of analysis workers back to it, so killing the pool cannot lose increments.
+    """
+
+    def __init__(self, endpoint_url: str, mode: str = "get", flush_every: int = 0):
+        if mode not in STATS_MODES:
+            raise ValueError(f"Unknown stats mode `{mode}`, expected one of {STATS_MODES}")
+        self.pid = os.getpid()
+        self.endpoint_url = endpoint_url
+        self.mode = mode
+        self.flush_every = flush_every
+        self._session = requests.Session()
+        self._pending: Counter = Counter()
+        self._on_flushed: List[Callable[[], None]] = []
+        self._results = 0
+        self._lock = threading.Lock()
+        atexit.register(self.__flush_at_exit)
+
+    def add(self, analyses_result: StockData, on_flushed: Optional[Callable[[], None]] = None):
+        with self._lock:
+            self._pending.update(increments(analyses_result))
+            if on_flushed is not None:
+                self._on_flushed.append(on_flushed)
+            self._results += 1
+            flush_now = self.flush_every > 0 and self._results % self.flush_every == 0
+        if flush_now:
+            self.flush()
+
+    def flush(self) -> bool:
+        """Send every pending increment; returns False if some are left for the next flush."""
+        with self._lock:
+            try:
+                if self.mode == "post":
+                    self.__post(self._pending)
+                    self._pending.clear()
+                else:
+                    self.__get_each()
+            except requests.RequestException as e:
+                logging.error(f"Sending the stats failed, {sum(self._pending.values())} increments are kept: {e}")
+                return False
+            on_flushed, self._on_flushed = self._on_flushed, []
+        for callback in on_flushed:
+            callback()
+        return True
+
+    def __post(self, pending: Counter):
+        if not pending:
+            return
+        payload = {"increments": [{"sheet": sheet, "value": value, "count": count} for (sheet, value), count in sorted(pending.items())]}
+        self._session.post(self.endpoint_url, json=payload, timeout=REQUEST_TIMEOUT).raise_for_status()
+
+    def __get_each(self):
+        # The script only increments by one, so an increment leaves the batch as soon as it is sent
+        for (sheet, value), count in list(self._pending.items()):
+            for _ in range(count):
+                # Quoted like the script expects; industry and ETF names can hold `&`, `#` or spaces
+                self._session.get(self.endpoint_url, params={"value": f'"{value}"', "sheet": f'"{sheet}"'},
+                                  timeout=REQUEST_TIMEOUT).raise_for_status()
+                self._pending[(sheet, value)] -= 1
+            del self._pending[(sheet, value)]
+
+    def __flush_at_exit(self):
+        if self.pid == os.getpid():
+            self.flush()
+            self._session.close()
+
+
+def calculate(analyses_result: StockData, on_flushed: Optional[Callable[[], None]] = None):
+    """Count the result in the positive or negative industry and ETF sheets; sent in the next batch."""
+    __stats_sink().add(analyses_result, on_flushed)
+
+
+def flush() -> bool:
+    """Send the increments of this process collected so far."""
+    if _sink is None or _sink.pid != os.getpid():
+        return True
+    return _sink.flush()
+
+
+def __stats_sink() -> StatsSink:
+    global _sink
+    # A forked process inherits the parent's sink and its pending increments; it gets its own so they are not sent twice
+    if _sink is None or _sink.pid != os.getpid():
+        endpoint_url = configuration.STATS_ENDPOINT_URL or f'https://script.google.com/macros/s/{configuration.APP_SCRIPT_ID}/exec'
+        _sink = StatsSink(endpoint_url, mode=configuration.STATS_MODE, flush_every=configuration.STATS_FLUSH_EVERY)
+    return _sink
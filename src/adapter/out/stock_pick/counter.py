@@ -0,0 +1,105 @@
+import os
+import sqlite3
+from contextlib import closing
+from typing import Protocol
+
+from src.infrastructure.utils.lazy import lazy_import
+
+requests = lazy_import("requests")
+
+# "remote": the Apps Script counter behind GET_AND_INCREMENT_COUNTER_URL
+# "sqlite": a local counter file shared by every process on the machine
+COUNTER_BACKENDS = ("remote", "sqlite")
+REQUEST_TIMEOUT = 30
+
+__SCHEMA = """
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class Counter(Protocol):
+    def take(self, count: int = 1) -> int:
+        """Reserve `count` consecutive counter values and return the first one."""
+        ...
+
+
+class RemoteCounter:
+    """
+    The Apps Script get-and-increment counter.
+
+    One GET returns the current value and increments it by one. Larger ranges are asked for with
+    `?window=<count>`, and the script's doGet must then return the current value and increment the
+    counter by `count` in the same call. A script that ignores `window` still increments by one, and
+    concurrent runs get overlapping ranges.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+
+    def take(self, count: int = 1) -> int:
+        if count < 1:
+            raise ValueError(f"Cannot take {count} counter values")
+        params = {"window": count} if count > 1 else None
+        response = requests.get(self.url, params=params, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return int(response.content)
+
+
+class SqliteCounter:
+    """
+    A named counter in a local SQLite file.
+
+    The read and the increment happen in one write transaction, so concurrent workers, also in
+    separate processes, never get overlapping ranges.
+    """
+
+    def __init__(self, path: str, name: str = "etf"):
+        self.path = path
+        self.name = name
+
+    def take(self, count: int = 1) -> int:
+        if count < 1:
+            raise ValueError(f"Cannot take {count} counter values")
+        with closing(connect(self.path)) as connection:
+            row = connection.execute(
+                "INSERT INTO counters (name, value) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value RETURNING value",
+                (self.name, count),
+            ).fetchone()
+            connection.commit()
+        return row[0] - count
+
+    def value(self) -> int:
+        """The next value `take` hands out, without reserving it."""
+        with closing(connect(self.path)) as connection:
+            row = connection.execute("SELECT value FROM counters WHERE name = ?", (self.name,)).fetchone()
+        return 0 if row is None else row[0]
+
+
+def connect(path: str) -> sqlite3.Connection:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(path, timeout=60)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(__SCHEMA)
+    return connection
+
+
+def create(backend: str, url: str = "", path: str = "") -> Counter:
+    """
+    Counter of the configured backend.
+
+    Args:
+        backend: One of COUNTER_BACKENDS
+        url: Endpoint of the remote counter
+        path: SQLite file of the local counter
+    """
+    if backend == "remote":
+        return RemoteCounter(url)
+    if backend == "sqlite":
+        return SqliteCounter(path)
+    raise ValueError(f"Unknown counter backend `{backend}`, expected one of {COUNTER_BACKENDS}")
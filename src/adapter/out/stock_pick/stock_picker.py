@@ -1,16 +1,32 @@
-import requests
+from typing import List
+
 import config.configuration as configuration
 import config.stock_names as stock_names
+from src.adapter.out.stock_pick import counter
+
 
 def __calculate_index(current_counter: int) -> int:
-    tmp_counter = current_counter
-    len_of_stocks = len(stock_names.etf_list)
-    while tmp_counter >= len_of_stocks:
-        tmp_counter = tmp_counter - len_of_stocks
-    return tmp_counter
+    return current_counter % len(stock_names.etf_list)
+
+
+def __counter() -> counter.Counter:
+    return counter.create(configuration.COUNTER_BACKEND,
+                          url=configuration.GET_AND_INCREMENT_COUNTER_URL,
+                          path=configuration.COUNTER_PATH)
+
 
 def pick():
-    url = configuration.GET_AND_INCREMENT_COUNTER_URL + "?window=1"
-    current_counter = int(requests.get(configuration.GET_AND_INCREMENT_COUNTER_URL).content)
+    current_counter = __counter().take(1)
     stock_index = __calculate_index(current_counter)
-    return stock_names.etf_list[stock_index]
\ No newline at end of file
+    return stock_names.etf_list[stock_index]
+
+
+def pick_many(count: int) -> List[str]:
+    """
+    Hand out the next `count` ETFs of the list as one contiguous range, e.g. for `main.py --pick`.
+
+    The whole range is reserved with a single counter call, so concurrent runs never get the same ETFs
+    until the list wraps around. The analysis pool then balances the range over its workers per ETF.
+    """
+    first = __counter().take(count)
+    return [stock_names.etf_list[__calculate_index(first + offset)] for offset in range(count)]
@@ -0,0 +1,55 @@
+import importlib
+import types
+from typing import Optional
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stand-in for a module that is imported on the first attribute access.
+
+    Every attribute is read from and written to the real module, so patching either the stand-in or
+    the real module in tests works as with a normal import. The stand-in's own methods are prefixed
+    with `_lazy_` so that they do not hide attributes of the module, e.g. `json.load`.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._lazy_module: Optional[types.ModuleType] = None
+
+    def _lazy_load(self) -> types.ModuleType:
+        if self._lazy_module is None:
+            self._lazy_module = importlib.import_module(self.__name__)
+        return self._lazy_module
+
+    def _lazy_is_loaded(self) -> bool:
+        return self._lazy_module is not None
+
+    def __getattr__(self, attribute: str):
+        return getattr(self._lazy_load(), attribute)
+
+    def __setattr__(self, attribute: str, value):
+        if attribute == "_lazy_module":
+            super().__setattr__(attribute, value)
+        else:
+            setattr(self._lazy_load(), attribute, value)
+
+    def __delattr__(self, attribute: str):
+        delattr(self._lazy_load(), attribute)
+
+    def __dir__(self):
+        return dir(self._lazy_load())
+
+    def __repr__(self) -> str:
+        return f"<lazy module '{self.__name__}' ({'loaded' if self._lazy_is_loaded() else 'not loaded'})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    `import name`, deferred until the module is first used.
+
+    Meant for heavy libraries (Prophet, matplotlib, yfinance, telepot, requests) that only some code
+    paths need. Names from the module are read as attributes, e.g. `prophet.Prophet`; a
+    `from name import x` would import it right away. Annotations that name lazy classes need
+    `from __future__ import annotations`.
+    """
+    return LazyModule(name)
@@ -1,8 +1,21 @@
-import pandas as pd
+import multiprocessing
 from datetime import datetime, timedelta
 
+from src.infrastructure.utils.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
 round_precise = 5
 
+# Start method of every worker pool. The main process runs background threads (e.g. the Telegram
+# delivery queue) by the time the pools start, and forking a multi-threaded process can deadlock the child.
+POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def process_context():
+    """Multiprocessing context that all worker pools are created from."""
+    return multiprocessing.get_context(POOL_START_METHOD)
+
 
 def current_date_str():
     return str(current_date())
@@ -1,8 +1,17 @@
-import pandas as pd
+from __future__ import annotations
+
+import io
+import pickle
+import sys
 import numpy as np
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
-@dataclass
+if TYPE_CHECKING:
+    # Only the StockInfo annotation names pandas; the optimizer and the notifier never need it
+    import pandas as pd
+
+@dataclass(frozen=True, slots=True)
 class ProfitabilityData:
     trailing_eps: float
     forward_eps: float
@@ -21,8 +30,18 @@ class ProfitabilityData:
         # Company is profitable if it has positive earnings OR positive net income AND at least one positive margin
         return (has_positive_earnings or has_positive_net_income) and has_positive_margins
 
-@dataclass
+
+@dataclass(frozen=True, slots=True, init=False)
 class StockData:
+    """
+    Analysis result of one ETF.
+
+    Top holdings are kept as a tuple of company names with a float array of their weights, and the sector
+    allocation as a tuple of sector names with a float array of their allocations. The names are interned
+    with `sys.intern`, so all results share one string per company or sector. The constructor still takes
+    the `top_holdings` rows of [company_name, weight] and the `sector_allocation` dict, and the properties of
+    the same names rebuild them. Rows whose weight cannot be parsed are dropped.
+    """
     ticker_symbol: str
     stock_name: str
     currency: str
@@ -36,14 +55,77 @@ class StockData:
     beta: float
     standard_deviation: float
     dividend_yield: float
-    top_holdings: np.ndarray
-    sector_allocation: dict
+    holding_names: Tuple[str, ...]
+    holding_weights: np.ndarray
+    sector_names: Tuple[str, ...]
+    sector_weights: np.ndarray
     average_daily_volume: float
     assets_under_management: float
     expense_ratio: float
     description: str
     prediction_uncertainty: float = 0.0  # New: uncertainty range from Prophet forecast
 
+    def __init__(self, ticker_symbol: str, stock_name: str, currency: str, current_price: float, predict_price: float,
+                 two_year_file_name: str, five_year_file_name: str, is_stock_growing: bool, industry: str,
+                 profitability_data: ProfitabilityData, beta: float, standard_deviation: float, dividend_yield: float,
+                 top_holdings: np.ndarray, sector_allocation: dict, average_daily_volume: float,
+                 assets_under_management: float, expense_ratio: float, description: str,
+                 prediction_uncertainty: float = 0.0):
+        companies, weights = [], []
+        for holding in top_holdings:
+            try:
+                company, weight = holding[0], float(holding[1])
+            except (IndexError, ValueError, TypeError):
+                continue
+            companies.append(sys.intern(str(company)))
+            weights.append(weight)
+
+        sectors, allocations = [], []
+        for sector, allocation in (sector_allocation or {}).items():
+            try:
+                allocation = float(allocation)
+            except (ValueError, TypeError):
+                continue
+            sectors.append(sys.intern(str(sector)))
+            allocations.append(allocation)
+
+        values = dict(
+            ticker_symbol=ticker_symbol, stock_name=stock_name, currency=currency, current_price=current_price,
+            predict_price=predict_price, two_year_file_name=two_year_file_name, five_year_file_name=five_year_file_name,
+            is_stock_growing=is_stock_growing, industry=industry, profitability_data=profitability_data, beta=beta,
+            standard_deviation=standard_deviation, dividend_yield=dividend_yield,
+            holding_names=tuple(companies), holding_weights=np.array(weights, dtype=np.float64),
+            sector_names=tuple(sectors), sector_weights=np.array(allocations, dtype=np.float64),
+            average_daily_volume=average_daily_volume,
+            assets_under_management=assets_under_management, expense_ratio=expense_ratio, description=description,
+            prediction_uncertainty=prediction_uncertainty,
+        )
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    @property
+    def top_holdings(self) -> np.ndarray:
+        """Rows of [company_name, weight] as an object array."""
+        top_holdings = np.empty((len(self.holding_names), 2), dtype=object)
+        top_holdings[:, 0] = self.holding_names
+        top_holdings[:, 1] = self.holding_weights.tolist()
+        return top_holdings
+
+    @property
+    def sector_allocation(self) -> dict:
+        return dict(zip(self.sector_names, self.sector_weights.tolist()))
+
+    def __setstate__(self, state):
+        # Pickles from before StockData was slotted carry the instance __dict__, and the generated
+        # __setstate__ would silently fill the fields with its keys
+        if isinstance(state, dict):
+            raise pickle.UnpicklingError("StockData pickled in an older layout cannot be loaded")
+        for data_field, value in zip(fields(self), state):
+            if data_field.name in ("holding_names", "sector_names"):
+                # Unpickled strings are new objects; intern them again so results from workers share them too
+                value = tuple(sys.intern(name) for name in value)
+            object.__setattr__(self, data_field.name, value)
+
 
 @dataclass
 class StockInfo:
@@ -52,3 +134,21 @@ class StockInfo:
 
 class SkipException(Exception):
     pass
+
+
+@dataclass
+class Analysis:
+    """Analysis result of one ETF with its rendered forecast charts (in-memory PNGs, empty if it is not sent)."""
+    result: StockData
+    charts: List[io.BytesIO] = field(default_factory=list)
+
+
+@dataclass
+class RunOutcome:
+    """Result of analysing one ETF in a batch run: either a StockData or the error that stopped it."""
+    stock_name: str
+    result: Optional[StockData] = None
+    error: Optional[Exception] = None
+
+    def is_success(self) -> bool:
+        return self.result is not None
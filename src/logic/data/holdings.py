@@ -0,0 +1,89 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+
+@dataclass
+class HoldingsIndex:
+    """
+    Top holdings of a list of ETFs as a sparse ETF x company weight matrix.
+
+    Company names are interned to integer ids (`company_names[id]`) and the weights are stored in
+    CSR layout: the holdings of ETF `i` are `indices[indptr[i]:indptr[i + 1]]` with the matching
+    `weights`. Build it once with `from_top_holdings` and reuse it for every portfolio.
+    """
+    company_names: List[str]
+    indptr: np.ndarray
+    indices: np.ndarray
+    weights: np.ndarray
+    _rows: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._rows = np.repeat(np.arange(self.etf_count), np.diff(self.indptr))
+
+    @classmethod
+    def from_top_holdings(cls, top_holdings_list: Iterable[np.ndarray]) -> 'HoldingsIndex':
+        """
+        Build the index from per-ETF `top_holdings` arrays (rows of [company_name, weight]).
+
+        Rows whose weight cannot be parsed are skipped; a company listed twice for the same ETF gets the summed weight.
+        """
+        company_ids: Dict[str, int] = {}
+        indptr, indices, weights = [0], [], []
+        for top_holdings in top_holdings_list:
+            row: Dict[int, float] = {}
+            for holding in top_holdings:
+                try:
+                    company, weight = holding[0], float(holding[1])
+                except (IndexError, ValueError, TypeError):
+                    continue
+                company_id = company_ids.setdefault(company, len(company_ids))
+                row[company_id] = row.get(company_id, 0.0) + weight
+            indices.extend(row.keys())
+            weights.extend(row.values())
+            indptr.append(len(indices))
+        return cls(
+            company_names=list(company_ids),
+            indptr=np.array(indptr, dtype=np.int64),
+            indices=np.array(indices, dtype=np.int64),
+            weights=np.array(weights, dtype=float),
+        )
+
+    @property
+    def etf_count(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def company_count(self) -> int:
+        return len(self.company_names)
+
+    def exposures(self, portfolio_weights: np.ndarray) -> np.ndarray:
+        """
+        Exposure to every company of portfolios given as weights per ETF.
+
+        Args:
+            portfolio_weights: Vector of ETF weights, or a matrix with one portfolio per row
+
+        Returns:
+            Company exposures indexed by company id, with the same number of dimensions as the input
+        """
+        portfolio_weights = np.asarray(portfolio_weights, dtype=float)
+        if portfolio_weights.ndim == 1:
+            return np.bincount(self.indices, weights=self.weights * portfolio_weights[self._rows], minlength=self.company_count)
+
+        # Portfolios hold few ETFs, so only the holdings of their nonzero (portfolio, ETF) pairs are expanded
+        portfolios, etfs = np.nonzero(portfolio_weights)
+        counts = np.diff(self.indptr)[etfs]
+        offsets = np.cumsum(counts) - counts
+        positions = np.arange(counts.sum()) - np.repeat(offsets - self.indptr[etfs], counts)
+        contributions = np.repeat(portfolio_weights[portfolios, etfs], counts) * self.weights[positions]
+        cells = np.repeat(portfolios, counts) * self.company_count + self.indices[positions]
+        exposures = np.bincount(cells, weights=contributions, minlength=len(portfolio_weights) * self.company_count)
+        return exposures.reshape(len(portfolio_weights), self.company_count)
+
+    def holdings(self, etf: int) -> List[Tuple[str, float]]:
+        """(company name, weight) pairs of one ETF, largest weight first."""
+        start, end = self.indptr[etf], self.indptr[etf + 1]
+        order = np.argsort(-self.weights[start:end], kind='stable')
+        return [(self.company_names[self.indices[start + i]], float(self.weights[start + i])) for i in order]
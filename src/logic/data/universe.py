@@ -0,0 +1,137 @@
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from src.logic.data.data import StockData
+from src.logic.data.holdings import HoldingsIndex
+
+# Bump when the layout of a saved universe changes
+FORMAT_VERSION = 1
+
+NUMERIC_FIELDS = (
+    "current_prices", "predicted_prices", "dividend_yields", "expense_ratios", "standard_deviations",
+    "betas", "prediction_uncertainties", "average_daily_volumes", "assets_under_management",
+)
+
+
+@dataclass
+class Universe:
+    """
+    The analysed ETFs as columns, built once from the analysis results for the optimizer.
+
+    Every numeric StockData field is a contiguous float64 array indexed like `tickers`. Sectors are
+    interned to ids (`sector_names[id]`) and `sector_matrix[i, id]` is the allocation of ETF `i` to that
+    sector. Top holdings are a sparse ETF x company HoldingsIndex.
+
+    A universe is saved to and loaded from a single `.npz` file, so a past run can be re-optimized
+    without analysing the ETFs again.
+    """
+    tickers: List[str]
+    stock_names: List[str]
+    current_prices: np.ndarray
+    predicted_prices: np.ndarray
+    dividend_yields: np.ndarray
+    expense_ratios: np.ndarray
+    standard_deviations: np.ndarray
+    betas: np.ndarray
+    prediction_uncertainties: np.ndarray
+    average_daily_volumes: np.ndarray
+    assets_under_management: np.ndarray
+    sector_names: List[str]
+    sector_matrix: np.ndarray
+    holdings: HoldingsIndex
+
+    @classmethod
+    def from_stock_data(cls, stocks: List[StockData]) -> 'Universe':
+        sector_names, sector_matrix = exposure_matrix([stock.sector_allocation.items() for stock in stocks])
+
+        def column(attribute: str) -> np.ndarray:
+            return np.array([getattr(stock, attribute) for stock in stocks], dtype=np.float64)
+
+        return cls(
+            tickers=[stock.ticker_symbol for stock in stocks],
+            stock_names=[stock.stock_name for stock in stocks],
+            current_prices=column("current_price"),
+            predicted_prices=column("predict_price"),
+            dividend_yields=column("dividend_yield"),
+            expense_ratios=column("expense_ratio"),
+            standard_deviations=column("standard_deviation"),
+            betas=column("beta"),
+            prediction_uncertainties=column("prediction_uncertainty"),
+            average_daily_volumes=column("average_daily_volume"),
+            assets_under_management=column("assets_under_management"),
+            sector_names=sector_names,
+            sector_matrix=sector_matrix,
+            holdings=HoldingsIndex.from_top_holdings([stock.top_holdings for stock in stocks]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def save(self, path: str):
+        """Write the universe to an `.npz` file; `.npz` is appended to a path without it, like `load` does."""
+        path = npz_path(path)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez_compressed(
+            path,
+            format_version=np.array(FORMAT_VERSION),
+            tickers=np.array(self.tickers, dtype=str),
+            stock_names=np.array(self.stock_names, dtype=str),
+            sector_names=np.array(self.sector_names, dtype=str),
+            sector_matrix=self.sector_matrix,
+            company_names=np.array(self.holdings.company_names, dtype=str),
+            holdings_indptr=self.holdings.indptr,
+            holdings_indices=self.holdings.indices,
+            holdings_weights=self.holdings.weights,
+            **{name: getattr(self, name) for name in NUMERIC_FIELDS},
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'Universe':
+        path = npz_path(path)
+        with np.load(path, allow_pickle=False) as arrays:
+            if int(arrays["format_version"]) != FORMAT_VERSION:
+                raise ValueError(f"Universe `{path}` has format {int(arrays['format_version'])}, expected {FORMAT_VERSION}")
+            return cls(
+                tickers=arrays["tickers"].tolist(),
+                stock_names=arrays["stock_names"].tolist(),
+                sector_names=arrays["sector_names"].tolist(),
+                sector_matrix=arrays["sector_matrix"].reshape(len(arrays["tickers"]), len(arrays["sector_names"])),
+                holdings=HoldingsIndex(
+                    company_names=arrays["company_names"].tolist(),
+                    indptr=arrays["holdings_indptr"],
+                    indices=arrays["holdings_indices"],
+                    weights=arrays["holdings_weights"],
+                ),
+                **{name: arrays[name] for name in NUMERIC_FIELDS},
+            )
+
+
+def npz_path(path: str) -> str:
+    """The file a universe is saved to: NumPy appends `.npz` to a path that does not end with it."""
+    return path if path.endswith(".npz") else f"{path}.npz"
+
+
+def exposure_matrix(rows: Iterable[Iterable[Tuple[str, float]]]) -> Tuple[List[str], np.ndarray]:
+    """Interned keys and the dense ETF x key matrix of per-ETF (key, weight) rows, e.g. sector allocations; unparsable rows are skipped."""
+    key_ids: Dict[str, int] = {}
+    parsed_rows = []
+    for pairs in rows:
+        parsed = []
+        for pair in pairs:
+            try:
+                key, weight = pair[0], float(pair[1])
+            except (IndexError, ValueError, TypeError):
+                continue
+            parsed.append((key_ids.setdefault(key, len(key_ids)), weight))
+        parsed_rows.append(parsed)
+
+    matrix = np.zeros((len(parsed_rows), len(key_ids)), dtype=np.float64)
+    for row, parsed in enumerate(parsed_rows):
+        for column, weight in parsed:
+            matrix[row, column] += weight
+    return list(key_ids), matrix
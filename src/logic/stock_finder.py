@@ -1,53 +1,210 @@
 import logging
-import os
+import multiprocessing
 import pandas as pd
+from typing import Dict, List, Optional, Tuple
 
+import config.configuration as configuration
 from src.adapter.out.stock_pick import stock_picker
 from src.adapter.out.download import downloader
 from src.adapter.out.predict import predicter
 from src.adapter.out.notify import notifier
 from src.adapter.out.analyze import analyzer
+from src.adapter.out.render import charts
 from src.adapter.out.stats import stats_calculator
+from src.adapter.out.journal import run_journal
+from src.adapter.out.journal.run_journal import RunJournal, JournalEntry
 from src.infrastructure.utils import utils
-from src.logic.data.data import StockData, StockInfo
+from src.logic.data.data import Analysis, StockInfo, RunOutcome, SkipException
 
 
-def run(stock_name = None):
+HISTORY_DAYS = 365 * 5
+# Five-year and two-year lookback windows of the forecasts, in that order
+FORECAST_WINDOWS = [None, 365 * 2]
+PREDICT_PERIOD = 90
+
+
+def run(stock_name = None, historic_data: Optional[pd.DataFrame] = None,
+        forecasts: Optional[List[Tuple[predicter.Forecaster, pd.DataFrame]]] = None,
+        journal: Optional[RunJournal] = None):
     if stock_name is None:
         stock_name = stock_picker.pick()
+    entry = run_journal.entry(journal, stock_name) if journal is not None else JournalEntry()
+    if entry.result is not None and entry.notified:
+        # Already analysed and sent by the run being resumed; only the missing stats are left
+        analysis = Analysis(entry.result)
+    else:
+        analysis = analyse(stock_name, historic_data, forecasts, journal)
+        if analysis is None:
+            return
+    return __deliver(stock_name, analysis, entry, journal)
+
+
+def analyse(stock_name: str, historic_data: Optional[pd.DataFrame] = None,
+            forecasts: Optional[List[Tuple[predicter.Forecaster, pd.DataFrame]]] = None,
+            journal: Optional[RunJournal] = None) -> Optional[Analysis]:
+    """
+    Analyse one ETF and render its charts without sending anything; None if it is skipped.
+
+    This is what analysis pool workers run. The calling process notifies and counts the result, so
+    only it talks to Telegram and the stats endpoint.
+    """
     logging.info(f"Started an analyses of `{stock_name}`")
 
-    stock_info = downloader.download_stock_data(stock_name, start_date=utils.prev_day(365*5))
+    if historic_data is None:
+        stock_info = downloader.download_stock_data(stock_name, start_date=utils.prev_day(HISTORY_DAYS))
+    else:
+        stock_info = StockInfo(historic_data=historic_data, ticker=downloader.ticker(stock_name))
     if __toSkip(stock_info):
         logging.info(f"Skipped stock: {stock_name}")
         return
-    two_year_data = __slice(stock_info.historic_data, 365 * 2)
-    five_year_data = stock_info.historic_data
-    five_year_prophet, five_year_predicted_prices = predicter.predict(five_year_data, predict_period=90)
-    two_year_prophet, two_year_predicted_prices = predicter.predict(two_year_data, predict_period=90)
+    if forecasts is None:
+        # The two-year model is fitted on the tail of the five-year history, warm-started from the five-year fit
+        forecasts = predicter.predict_windows(stock_info.historic_data, windows=FORECAST_WINDOWS, predict_period=PREDICT_PERIOD,
+                                              ticker=stock_name, model_store_dir=configuration.MODEL_STORE_DIR or None,
+                                              engine=configuration.FORECAST_ENGINE,
+                                              forecast_cache_dir=configuration.FORECAST_CACHE_DIR or None,
+                                              forecast_cache_max_bytes=int(configuration.FORECAST_CACHE_MAX_MB * 1024 * 1024))
+    (five_year_prophet, five_year_predicted_prices), (two_year_prophet, two_year_predicted_prices) = forecasts
 
     analyses_result = analyzer.analyses(stock_name, 
                                         stock_info, 
-                                        two_year_prophet=two_year_prophet, 
                                         two_year_predicted_prices=two_year_predicted_prices, 
-                                        five_year_prophet=five_year_prophet, 
                                         five_year_predicted_prices=five_year_predicted_prices)
-    notifier.notify(analyses_result)
-    stats_calculator.calculate(analyses_result)
-    __clean_artifacts(analyses_result)
-    return analyses_result
+    if journal is not None:
+        run_journal.record_result(journal, stock_name, analyses_result)
+    # Charts are only rendered for ETFs that are actually sent
+    forecast_charts = []
+    if notifier.is_notifyable(analyses_result):
+        forecast_charts = [
+            charts.render_forecast(two_year_prophet, two_year_predicted_prices, analyses_result.two_year_file_name),
+            charts.render_forecast(five_year_prophet, five_year_predicted_prices, analyses_result.five_year_file_name),
+        ]
+    return Analysis(analyses_result, forecast_charts)
+
+
+def __deliver(stock_name: str, analysis: Analysis, entry: JournalEntry, journal: Optional[RunJournal]):
+    """Send the side effects of an analysis that `entry` does not have yet and return its result."""
+    if not entry.notified:
+        # Sending happens in the background; the journal records the notification once Telegram accepted it
+        on_delivered = None
+        if journal is not None:
+            on_delivered = lambda: run_journal.record_side_effect(journal, stock_name, 'notified')
+        notifier.notify(analysis.result, analysis.charts, on_delivered=on_delivered)
+    if not entry.counted:
+        # Counted in the next stats batch; the journal records it once the batch is sent
+        on_flushed = None
+        if journal is not None:
+            on_flushed = lambda: run_journal.record_side_effect(journal, stock_name, 'counted')
+        stats_calculator.calculate(analysis.result, on_flushed=on_flushed)
+    return analysis.result
+
+
+def run_many(stock_names: List[str], workers: int = 1, task_timeout: Optional[float] = None, chunk_size: int = 50,
+             journal: Optional[RunJournal] = None) -> List[RunOutcome]:
+    """
+    Run the analysis for every ETF, optionally in a pool of worker processes.
+
+    The price history of all ETFs is downloaded up front in grouped requests; tickers that
+    fail to download are reported without being analysed. With the fast forecast engine all
+    histories are forecasted together in one batch before the per-ETF analysis.
+
+    With a journal, every result and side effect is recorded as it completes. ETFs the journal
+    already has complete are neither downloaded nor analysed again, ETFs that were analysed and
+    sent but not counted are only counted, and other partially processed ETFs are analysed again
+    without repeating the side effects they already have.
+
+    Args:
+        stock_names: Tickers to analyse
+        workers: Number of worker processes (1 = sequential in the current process)
+        task_timeout: Seconds to wait for a single ETF result before giving it up (None or 0 = wait forever)
+        chunk_size: Maximum number of tickers per grouped download request
+        journal: Run journal to record progress in and to resume from (None = no journal)
+
+    Returns:
+        One RunOutcome per ticker, in the same order as `stock_names`
+    """
+    entries = run_journal.entries(journal) if journal is not None else {}
+    outcomes = {stock_name: RunOutcome(stock_name, result=entries[stock_name].result)
+                for stock_name in stock_names if stock_name in entries and entries[stock_name].is_complete()}
+    if outcomes:
+        logging.info(f"Resuming the run: {len(outcomes)} of {len(stock_names)} ETFs are already done")
+    # Analysed and sent by the run being resumed; only the missing stats are left, without a download or forecast
+    for stock_name in stock_names:
+        entry = entries.get(stock_name)
+        if stock_name not in outcomes and entry is not None and entry.result is not None and entry.notified:
+            outcomes[stock_name] = RunOutcome(stock_name, result=__deliver(stock_name, Analysis(entry.result), entry, journal))
+    remaining = [stock_name for stock_name in stock_names if stock_name not in outcomes]
+    if not remaining:
+        return [outcomes[stock_name] for stock_name in stock_names]
+
+    stock_infos, failures = downloader.download_many(remaining, start_date=utils.prev_day(HISTORY_DAYS), chunk_size=chunk_size)
+    histories = {stock_name: stock_info.historic_data for stock_name, stock_info in stock_infos.items()}
+    forecasts = {}
+    if configuration.FORECAST_ENGINE == "fast":
+        forecasts = predicter.predict_panel(histories, windows=FORECAST_WINDOWS, predict_period=PREDICT_PERIOD,
+                                            forecast_cache_dir=configuration.FORECAST_CACHE_DIR or None,
+                                            forecast_cache_max_bytes=int(configuration.FORECAST_CACHE_MAX_MB * 1024 * 1024))
+
+    if workers <= 1:
+        outcomes.update({stock_name: __run_outcome(stock_name, historic_data, forecasts.get(stock_name), journal)
+                         for stock_name, historic_data in histories.items()})
+    else:
+        outcomes.update(__run_in_pool(histories, forecasts, workers, task_timeout, journal, entries))
+    return [outcomes[stock_name] if stock_name in outcomes else RunOutcome(stock_name, error=failures[stock_name])
+            for stock_name in stock_names]
+
 
+def __run_in_pool(histories: Dict[str, pd.DataFrame], forecasts: Dict[str, list], workers: int, task_timeout: Optional[float],
+                  journal: Optional[RunJournal], entries: Dict[str, JournalEntry]) -> Dict[str, RunOutcome]:
+    """
+    Analyse in worker processes and send the results from this one.
 
-def __slice(historic_data, prev_date) -> any:
-    today = historic_data.iloc[-1].name  # Get the latest date in the data
-    two_years_ago = today - pd.Timedelta(days=prev_date)  # Calculate date 2 years ago
-    data_2y = historic_data.loc[two_years_ago:today]
-    return data_2y
+    Workers return their analysis with the rendered charts, so all messages share this process's
+    delivery queue and its pacing, no worker uses the HTTP connections it inherited at fork time,
+    and killing the pool cannot drop messages a worker still had queued.
+    """
+    outcomes = {}
+    timed_out = False
+    pool = utils.process_context().Pool(processes=min(workers, len(histories)) or 1)
+    try:
+        pending = [(stock_name, pool.apply_async(analyse, (stock_name, historic_data, forecasts.get(stock_name), journal)))
+                   for stock_name, historic_data in histories.items()]
+        for stock_name, async_result in pending:
+            try:
+                analysis = async_result.get(timeout=task_timeout or None)
+                entry = entries.get(stock_name, JournalEntry())
+                result = None if analysis is None else __deliver(stock_name, analysis, entry, journal)
+                outcomes[stock_name] = RunOutcome(stock_name, result=result)
+            except multiprocessing.TimeoutError:
+                timed_out = True
+                logging.error(f"Analysis of `{stock_name}` timed out after {task_timeout} seconds")
+                outcomes[stock_name] = RunOutcome(stock_name, error=TimeoutError(f"Timed out after {task_timeout} seconds"))
+            except SkipException as e:
+                logging.error(e)
+                outcomes[stock_name] = RunOutcome(stock_name, error=e)
+            except Exception as e:
+                logging.exception(f"Analysis of `{stock_name}` failed")
+                outcomes[stock_name] = RunOutcome(stock_name, error=e)
+    finally:
+        # A hung worker would block `join` forever, so kill the pool instead of draining it
+        if timed_out:
+            pool.terminate()
+        else:
+            pool.close()
+        pool.join()
+    return outcomes
 
 
-def __clean_artifacts(analyses_result: StockData):
-    os.remove(analyses_result.two_year_file_name)
-    os.remove(analyses_result.five_year_file_name)
+def __run_outcome(stock_name: str, historic_data: Optional[pd.DataFrame] = None, forecasts: Optional[list] = None,
+                  journal: Optional[RunJournal] = None) -> RunOutcome:
+    try:
+        return RunOutcome(stock_name, result=run(stock_name, historic_data, forecasts, journal))
+    except SkipException as e:
+        logging.error(e)
+        return RunOutcome(stock_name, error=e)
+    except Exception as e:
+        logging.exception(f"Analysis of `{stock_name}` failed")
+        return RunOutcome(stock_name, error=e)
 
 
 def __toSkip(stock_info: StockInfo) -> bool:
@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 
 from src.logic.data.data import StockData, StockInfo, ProfitabilityData
 from src.adapter.out.analyze import analyzer
+from src.adapter.out.download.metadata_cache import TickerSnapshot, FundsSnapshot
 
 def create_test_historic_data():
     """Create sample historical price data for testing"""
@@ -224,27 +225,17 @@ def test_analyses_function():
     ticker_symbol = "VOO"
     stock_info = create_test_stock_info()
     
-    # Mock Prophet models
-    two_year_prophet = Mock()
-    five_year_prophet = Mock()
-    
     # Create predicted prices
     two_year_predicted_prices = create_test_predicted_prices()
     five_year_predicted_prices = create_test_predicted_prices()
     
-    # Mock the plot and savefig functions to avoid file I/O
-    with patch('matplotlib.pyplot.savefig') as mock_savefig, \
-         patch('matplotlib.pyplot.figure') as mock_figure:
-        
-        # Call the analyses function
-        result = analyzer.analyses(
-            ticker_symbol=ticker_symbol,
-            stock_info=stock_info,
-            two_year_prophet=two_year_prophet,
-            two_year_predicted_prices=two_year_predicted_prices,
-            five_year_prophet=five_year_prophet,
-            five_year_predicted_prices=five_year_predicted_prices
-        )
+    # Call the analyses function
+    result = analyzer.analyses(
+        ticker_symbol=ticker_symbol,
+        stock_info=stock_info,
+        two_year_predicted_prices=two_year_predicted_prices,
+        five_year_predicted_prices=five_year_predicted_prices
+    )
     
     # Verify the result is a StockData object
     assert isinstance(result, StockData), "Result should be a StockData object"
@@ -298,27 +289,17 @@ def test_analyses_with_missing_fund_data():
     stock_info.ticker.info.pop('netExpenseRatio', None)
     stock_info.ticker.info.pop('yield', None)
     
-    # Mock Prophet models
-    two_year_prophet = Mock()
-    five_year_prophet = Mock()
-    
     # Create predicted prices
     two_year_predicted_prices = create_test_predicted_prices()
     five_year_predicted_prices = create_test_predicted_prices()
     
-    # Mock the plot and savefig functions
-    with patch('matplotlib.pyplot.savefig') as mock_savefig, \
-         patch('matplotlib.pyplot.figure') as mock_figure:
-        
-        # Call the analyses function
-        result = analyzer.analyses(
-            ticker_symbol=ticker_symbol,
-            stock_info=stock_info,
-            two_year_prophet=two_year_prophet,
-            two_year_predicted_prices=two_year_predicted_prices,
-            five_year_prophet=five_year_prophet,
-            five_year_predicted_prices=five_year_predicted_prices
-        )
+    # Call the analyses function
+    result = analyzer.analyses(
+        ticker_symbol=ticker_symbol,
+        stock_info=stock_info,
+        two_year_predicted_prices=two_year_predicted_prices,
+        five_year_predicted_prices=five_year_predicted_prices
+    )
     
     # Verify that missing attributes default to 0
     print(f"  assets_under_management: {result.assets_under_management}")
@@ -344,33 +325,53 @@ def test_analyses_with_exception_in_description():
     stock_info.ticker.funds_data.description = None
     stock_info.ticker.funds_data.fund_overview = None
     
-    # Mock Prophet models
-    two_year_prophet = Mock()
-    five_year_prophet = Mock()
-    
     # Create predicted prices
     two_year_predicted_prices = create_test_predicted_prices()
     five_year_predicted_prices = create_test_predicted_prices()
     
-    # Mock the plot and savefig functions
-    with patch('matplotlib.pyplot.savefig') as mock_savefig, \
-         patch('matplotlib.pyplot.figure') as mock_figure:
-        
-        # Call the analyses function
-        result = analyzer.analyses(
-            ticker_symbol=ticker_symbol,
-            stock_info=stock_info,
-            two_year_prophet=two_year_prophet,
-            two_year_predicted_prices=two_year_predicted_prices,
-            five_year_prophet=five_year_prophet,
-            five_year_predicted_prices=five_year_predicted_prices
-        )
+    # Call the analyses function
+    result = analyzer.analyses(
+        ticker_symbol=ticker_symbol,
+        stock_info=stock_info,
+        two_year_predicted_prices=two_year_predicted_prices,
+        five_year_predicted_prices=five_year_predicted_prices
+    )
     
     # Verify description is empty string
     assert result.description == ''
     
     print("  ✅ Exception in description generation handled correctly")
 
+def test_analyses_with_ticker_snapshot():
+    """Test analyses with a stub ticker snapshot instead of a live yfinance Ticker"""
+    print("Testing analyses with a ticker snapshot...")
+    
+    snapshot = TickerSnapshot(
+        info={'longName': 'Snapshot ETF', 'currency': 'EUR', 'averageVolume': 5000, 'netExpenseRatio': 0.2},
+        funds_data=FundsSnapshot(
+            top_holdings=pd.DataFrame({'Name': ['Apple Inc'], 'Holding Percent': [0.1]}),
+            sector_weightings={'technology': 1.0},
+            fund_overview={'family': 'Test Family', 'legalType': 'ETF'},
+            description='Snapshot description',
+        ),
+    )
+    stock_info = StockInfo(historic_data=create_test_historic_data(), ticker=snapshot)
+    
+    result = analyzer.analyses(
+        ticker_symbol="SNAP",
+        stock_info=stock_info,
+        two_year_predicted_prices=create_test_predicted_prices(),
+        five_year_predicted_prices=create_test_predicted_prices()
+    )
+    
+    assert result.stock_name == 'Snapshot ETF'
+    assert result.average_daily_volume == 5000
+    assert result.expense_ratio == 0.002
+    assert result.top_holdings.tolist() == [['Apple Inc', 0.1]]
+    assert result.description == 'Test Family || ETF || Snapshot description'
+    
+    print("  ✅ Ticker snapshot test passed")
+
 def test_pessimistic_predict_price_calculation():
     """Test the new pessimistic predict_price calculation"""
     print("Testing pessimistic predict_price calculation...")
@@ -379,10 +380,6 @@ def test_pessimistic_predict_price_calculation():
     ticker_symbol = "TEST"
     stock_info = create_test_stock_info()
     
-    # Mock Prophet models
-    two_year_prophet = Mock()
-    five_year_prophet = Mock()
-    
     # Create predicted prices with known values for testing
     # We'll create simple DataFrames with known last values
     future_dates = pd.date_range(start=datetime.now(), periods=10, freq='D')
@@ -401,19 +398,13 @@ def test_pessimistic_predict_price_calculation():
         'yhat_upper': [215.0] * 10
     }, index=future_dates)
     
-    # Mock the plot and savefig functions
-    with patch('matplotlib.pyplot.savefig') as mock_savefig, \
-         patch('matplotlib.pyplot.figure') as mock_figure:
-        
-        # Call the analyses function
-        result = analyzer.analyses(
-            ticker_symbol=ticker_symbol,
-            stock_info=stock_info,
-            two_year_prophet=two_year_prophet,
-            two_year_predicted_prices=two_year_predicted_prices,
-            five_year_prophet=five_year_prophet,
-            five_year_predicted_prices=five_year_predicted_prices
-        )
+    # Call the analyses function
+    result = analyzer.analyses(
+        ticker_symbol=ticker_symbol,
+        stock_info=stock_info,
+        two_year_predicted_prices=two_year_predicted_prices,
+        five_year_predicted_prices=five_year_predicted_prices
+    )
     
     # Verify the predict_price is the minimum of the two yhat_lower values
     # two_year_min = 195.0, five_year_min = 205.0, min = 195.0
@@ -436,10 +427,6 @@ def test_pessimistic_predict_price_with_different_values():
     ticker_symbol = "TEST"
     stock_info = create_test_stock_info()
     
-    # Mock Prophet models
-    two_year_prophet = Mock()
-    five_year_prophet = Mock()
-    
     # Create predicted prices with five-year minimum being lower
     future_dates = pd.date_range(start=datetime.now(), periods=10, freq='D')
     
@@ -457,19 +444,13 @@ def test_pessimistic_predict_price_with_different_values():
         'yhat_upper': [200.0] * 10
     }, index=future_dates)
     
-    # Mock the plot and savefig functions
-    with patch('matplotlib.pyplot.savefig') as mock_savefig, \
-         patch('matplotlib.pyplot.figure') as mock_figure:
-        
-        # Call the analyses function
-        result = analyzer.analyses(
-            ticker_symbol=ticker_symbol,
-            stock_info=stock_info,
-            two_year_prophet=two_year_prophet,
-            two_year_predicted_prices=two_year_predicted_prices,
-            five_year_prophet=five_year_prophet,
-            five_year_predicted_prices=five_year_predicted_prices
-        )
+    # Call the analyses function
+    result = analyzer.analyses(
+        ticker_symbol=ticker_symbol,
+        stock_info=stock_info,
+        two_year_predicted_prices=two_year_predicted_prices,
+        five_year_predicted_prices=five_year_predicted_prices
+    )
     
     # Verify the predict_price is the minimum of the two yhat_lower values
     # two_year_min = 200.0, five_year_min = 190.0, min = 190.0
@@ -512,6 +493,9 @@ def run_all_tests():
         test_analyses_with_exception_in_description()
         print()
         
+        test_analyses_with_ticker_snapshot()
+        print()
+        
         test_pessimistic_predict_price_calculation()
         print()
         
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""Test script for downloader.py and its local price-history cache"""
+
+import pandas as pd
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+
+import config.configuration as configuration
+from src.adapter.out.download import downloader, history_cache
+from src.logic.data.data import SkipException
+
+
+def create_yfinance_history(start: str, end: str) -> pd.DataFrame:
+    """Create a frame shaped like `yf.Ticker.history` output (tz-aware index, 'Close' column); the close of a day does not depend on the range"""
+    dates = pd.bdate_range(start=start, end=end, inclusive='left', tz='Europe/Berlin')
+    closes = 100.0 + 0.1 * (dates.tz_localize(None) - pd.Timestamp("2024-01-01")).days.to_numpy()
+    return pd.DataFrame({'Open': closes, 'Close': closes}, index=dates)
+
+
+def create_mock_ticker(*histories):
+    mock_ticker = Mock()
+    mock_ticker.history.side_effect = list(histories)
+    return mock_ticker
+
+
+def test_history_cache_roundtrip(tmp_path):
+    """Test that stored rows are loaded back deduplicated and sorted"""
+    print("Testing history cache roundtrip...")
+    path = str(tmp_path / "prices.sqlite")
+
+    assert history_cache.load(path, "TEST") is None
+    assert history_cache.tickers(path) == []
+
+    historic_data = history_cache.to_historic_data([
+        (pd.Timestamp("2024-01-03"), 102.0),
+        (pd.Timestamp("2024-01-02"), 101.0),
+    ])
+    history_cache.store(path, "TEST", historic_data, covered_from="2024-01-01", fetched_on="2024-01-03")
+    history_cache.store(path, "TEST", history_cache.to_historic_data([(pd.Timestamp("2024-01-03"), 103.0)]),
+                        covered_from="2024-01-01", fetched_on="2024-01-04")
+
+    cached = history_cache.load(path, "TEST")
+    assert list(cached.historic_data.columns) == ["y", "ds"]
+    assert list(cached.historic_data["y"]) == [101.0, 103.0]
+    assert cached.last_date() == "2024-01-03"
+    assert cached.settled_date() == "2024-01-02"
+    assert cached.covered_from == "2024-01-01"
+    assert cached.fetched_on == "2024-01-04"
+    assert history_cache.tickers(path) == ["TEST"]
+
+    print("  ✅ History cache roundtrip test passed")
+
+
+def test_download_tops_up_cached_history(tmp_path):
+    """Test that only the tail since the last settled cached day is downloaded on a later run"""
+    print("Testing incremental top-up of cached history...")
+    path = str(tmp_path / "prices.sqlite")
+    full_history = create_yfinance_history("2024-01-01", "2024-03-01")
+    tail_history = create_yfinance_history("2024-02-28", "2024-03-05")
+    mock_ticker = create_mock_ticker(full_history, tail_history)
+
+    with patch.object(configuration, 'PRICE_CACHE_PATH', path), \
+         patch.object(downloader.yf, 'Ticker', return_value=mock_ticker), \
+         patch.object(downloader.utils, 'current_date_str', side_effect=["2024-03-01", "2024-03-05"]):
+        first = downloader.download_stock_data("TEST", start_date="2024-01-01", end_date="2024-03-05")
+        second = downloader.download_stock_data("TEST", start_date="2024-01-01", end_date="2024-03-05")
+
+    assert mock_ticker.history.call_count == 2
+    assert mock_ticker.history.call_args_list[1].kwargs['start'] == "2024-02-28"
+    assert len(second.historic_data) == len(first.historic_data) + 2
+    assert second.historic_data["ds"].is_monotonic_increasing
+    assert not second.historic_data["ds"].duplicated().any()
+    assert second.historic_data["ds"].iloc[-1] == pd.Timestamp("2024-03-04")
+
+    print("  ✅ Incremental top-up test passed")
+
+
+def test_download_many_refetches_a_readjusted_history(tmp_path):
+    """Test that a top-up whose overlap close changed (e.g. after a dividend) downloads the whole history again"""
+    print("Testing readjusted cached history...")
+    path = str(tmp_path / "prices.sqlite")
+    adjustments = {'AAA.DE': 1.0, 'BBB.DE': 1.0}
+
+    def fake_download(tickers, start, end, **kwargs):
+        return pd.concat({ticker: create_yfinance_history(start, end).tz_localize(None) * adjustments[ticker]
+                          for ticker in tickers}, axis=1)
+
+    with patch.object(configuration, 'PRICE_CACHE_PATH', path), \
+         patch.object(downloader.yf, 'download', side_effect=fake_download) as mock_download, \
+         patch.object(downloader.yf, 'Ticker'), \
+         patch.object(downloader.utils, 'current_date_str', side_effect=["2024-03-01", "2024-03-05"]):
+        downloader.download_many(['AAA.DE', 'BBB.DE'], start_date="2024-01-01", end_date="2024-03-01")
+        # A dividend of AAA.DE lowers all of its earlier adjusted closes
+        adjustments['AAA.DE'] = 0.98
+        stock_infos, failures = downloader.download_many(['AAA.DE', 'BBB.DE'], start_date="2024-01-01", end_date="2024-03-05")
+
+    assert [(call.args[0], call.kwargs['start']) for call in mock_download.call_args_list] == [
+        (['AAA.DE', 'BBB.DE'], "2024-01-01"), (['AAA.DE', 'BBB.DE'], "2024-02-28"), (['AAA.DE'], "2024-01-01")
+    ]
+    assert failures == {}
+    closes = create_yfinance_history("2024-01-01", "2024-03-05")["Close"].to_numpy()
+    assert np.allclose(stock_infos['AAA.DE'].historic_data['y'], closes * 0.98)
+    assert np.allclose(stock_infos['BBB.DE'].historic_data['y'], closes)
+    # The cache holds the new adjustment basis only
+    assert np.allclose(history_cache.load(path, 'AAA.DE').historic_data['y'], closes * 0.98)
+
+    print("  ✅ Readjusted history test passed")
+
+
+def test_download_in_offline_mode(tmp_path):
+    """Test that offline mode replays the cache and never downloads"""
+    print("Testing offline mode...")
+    path = str(tmp_path / "prices.sqlite")
+    historic_data = history_cache.to_historic_data([
+        (pd.Timestamp("2024-01-02"), 101.0),
+        (pd.Timestamp("2024-01-03"), 102.0),
+    ])
+    history_cache.store(path, "TEST", historic_data, covered_from="2024-01-01", fetched_on="2024-01-03")
+    mock_ticker = create_mock_ticker()
+
+    with patch.object(configuration, 'PRICE_CACHE_PATH', path), \
+         patch.object(configuration, 'PRICE_CACHE_OFFLINE', True), \
+         patch.object(downloader.yf, 'Ticker', return_value=mock_ticker):
+        stock_info = downloader.download_stock_data("TEST", start_date="2024-01-01", end_date="2024-01-10")
+        with pytest.raises(SkipException):
+            downloader.download_stock_data("MISSING", start_date="2024-01-01", end_date="2024-01-10")
+
+    mock_ticker.history.assert_not_called()
+    assert list(stock_info.historic_data["y"]) == [101.0, 102.0]
+
+    print("  ✅ Offline mode test passed")
+
+
+def test_download_many_splits_grouped_frame(tmp_path):
+    """Test that a grouped download is split per ticker and bad symbols are reported separately"""
+    print("Testing grouped multi-ticker download...")
+    history = create_yfinance_history("2024-01-01", "2024-02-01").tz_localize(None)
+    grouped = pd.concat({'AAA.DE': history, 'BBB.DE': history * 2}, axis=1)
+
+    with patch.object(configuration, 'PRICE_CACHE_PATH', ''), \
+         patch.object(downloader.yf, 'download', return_value=grouped) as mock_download, \
+         patch.object(downloader.yf, 'Ticker'):
+        stock_infos, failures = downloader.download_many(
+            ['AAA.DE', 'FYER DE', 'BBB.DE', 'MISSING.DE'],
+            start_date="2024-01-01", end_date="2024-02-01", chunk_size=10
+        )
+
+    mock_download.assert_called_once()
+    assert mock_download.call_args.args[0] == ['AAA.DE', 'BBB.DE', 'MISSING.DE']
+    assert list(stock_infos) == ['AAA.DE', 'BBB.DE']
+    assert list(failures) == ['FYER DE', 'MISSING.DE']
+    assert list(stock_infos['AAA.DE'].historic_data.columns) == ['y', 'ds']
+    assert stock_infos['BBB.DE'].historic_data['y'].iloc[0] == 2 * stock_infos['AAA.DE'].historic_data['y'].iloc[0]
+
+    print("  ✅ Grouped multi-ticker download test passed")
+
+
+def test_download_many_respects_chunk_size(tmp_path):
+    """Test that tickers are requested in chunks and a failing chunk does not sink the others"""
+    print("Testing chunked multi-ticker download...")
+    history = create_yfinance_history("2024-01-01", "2024-02-01").tz_localize(None)
+
+    def fake_download(tickers, **kwargs):
+        if 'CCC.DE' in tickers:
+            raise ConnectionError("network down")
+        return pd.concat({ticker: history for ticker in tickers}, axis=1)
+
+    mock_ticker = Mock()
+    mock_ticker.history.side_effect = ConnectionError("network down")
+    with patch.object(configuration, 'PRICE_CACHE_PATH', ''), \
+         patch.object(downloader.yf, 'download', side_effect=fake_download) as mock_download, \
+         patch.object(downloader.yf, 'Ticker', return_value=mock_ticker):
+        stock_infos, failures = downloader.download_many(
+            ['AAA.DE', 'BBB.DE', 'CCC.DE'], start_date="2024-01-01", end_date="2024-02-01", chunk_size=2
+        )
+
+    assert mock_download.call_count == 2
+    assert list(stock_infos) == ['AAA.DE', 'BBB.DE']
+    assert list(failures) == ['CCC.DE']
+
+    print("  ✅ Chunked multi-ticker download test passed")
+
+
+def test_download_many_isolates_a_bad_symbol_in_a_chunk(tmp_path):
+    """Test that a grouped request broken by one symbol is retried in halves and per ticker"""
+    print("Testing bad symbol in a grouped download...")
+    history = create_yfinance_history("2024-01-01", "2024-02-01").tz_localize(None)
+    names = ['AAA.DE', 'BBB.DE', 'BAD.DE', 'CCC.DE', 'DDD.DE']
+
+    def fake_download(tickers, **kwargs):
+        if 'BAD.DE' in tickers:
+            raise ValueError("malformed answer")
+        return pd.concat({ticker: history for ticker in tickers}, axis=1)
+
+    def fake_ticker(name):
+        mock_ticker = Mock()
+        if name == 'BAD.DE':
+            mock_ticker.history.side_effect = ValueError("malformed answer")
+        else:
+            mock_ticker.history.return_value = create_yfinance_history("2024-01-01", "2024-02-01")
+        return mock_ticker
+
+    with patch.object(configuration, 'PRICE_CACHE_PATH', ''), \
+         patch.object(downloader.yf, 'download', side_effect=fake_download) as mock_download, \
+         patch.object(downloader.yf, 'Ticker', side_effect=fake_ticker):
+        stock_infos, failures = downloader.download_many(names, start_date="2024-01-01", end_date="2024-02-01", chunk_size=50)
+
+    assert list(stock_infos) == ['AAA.DE', 'BBB.DE', 'CCC.DE', 'DDD.DE']
+    assert list(failures) == ['BAD.DE'] and isinstance(failures['BAD.DE'], SkipException)
+    # The whole chunk, its halves, then the half with BAD.DE split again down to BAD.DE alone
+    assert [call.args[0] for call in mock_download.call_args_list] == [
+        names, ['AAA.DE', 'BBB.DE'], ['BAD.DE', 'CCC.DE', 'DDD.DE'], ['BAD.DE'], ['CCC.DE', 'DDD.DE']
+    ]
+
+    print("  ✅ Bad symbol isolation test passed")
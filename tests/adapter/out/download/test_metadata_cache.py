@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Test script for the per-field TTL cache of ticker info and funds data"""
+
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+from unittest.mock import Mock, PropertyMock
+
+from src.adapter.out.download import metadata_cache
+
+
+def create_live_ticker(info=None):
+    """Create a mock `yf.Ticker` whose info and funds data count how often they are fetched"""
+    live_ticker = Mock()
+    live_ticker.ticker = "TEST.DE"
+    info_property = PropertyMock(return_value=info or {'longName': 'Test ETF', 'averageVolume': 1000})
+    type(live_ticker).info = info_property
+    live_ticker.funds_data.top_holdings = pd.DataFrame(
+        {'Name': ['Apple Inc', 'Microsoft Corp'], 'Holding Percent': [0.08, 0.07]},
+        index=pd.Index(['AAPL', 'MSFT'], name='Symbol'),
+    )
+    live_ticker.funds_data.sector_weightings = {'technology': 0.45}
+    live_ticker.funds_data.fund_overview = {'family': 'Test Family', 'legalType': 'ETF'}
+    live_ticker.funds_data.description = 'Test ETF Description'
+    return live_ticker, info_property
+
+
+def days_ago(days: int) -> str:
+    return str(date.today() - timedelta(days=days))
+
+
+def test_fields_are_served_from_cache(tmp_path):
+    """Test that a second ticker reads info and funds data from the cache without fetching"""
+    print("Testing metadata cache roundtrip...")
+    path = str(tmp_path / "metadata.sqlite")
+    live_ticker, _ = create_live_ticker()
+    first = metadata_cache.CachedTicker(live_ticker, path)
+    assert first.info['longName'] == 'Test ETF'
+    assert first.funds_data.fund_overview['family'] == 'Test Family'
+
+    offline_ticker, info_property = create_live_ticker()
+    type(offline_ticker.funds_data).top_holdings = PropertyMock(side_effect=AssertionError("must not fetch"))
+    second = metadata_cache.CachedTicker(offline_ticker, path)
+    funds_data = second.funds_data
+
+    assert second.info == {'longName': 'Test ETF', 'averageVolume': 1000}
+    info_property.assert_not_called()
+    assert funds_data.top_holdings.values.tolist() == [['Apple Inc', 0.08], ['Microsoft Corp', 0.07]]
+    assert funds_data.sector_weightings == {'technology': 0.45}
+    assert funds_data.description == 'Test ETF Description'
+    # Everything else is delegated to the live ticker
+    assert second.history is offline_ticker.history
+
+    print("  ✅ Metadata cache roundtrip test passed")
+
+
+def test_fields_expire_by_ttl(tmp_path):
+    """Test that each field is refreshed on its own TTL and stale values back up failed fetches"""
+    print("Testing metadata field TTLs...")
+    path = str(tmp_path / "metadata.sqlite")
+    metadata_cache.store(path, "TEST.DE", 'info', {'averageVolume': 1}, days_ago(1))
+    metadata_cache.store(path, "TEST.DE", 'sector_weightings', {'technology': 0.9}, days_ago(10))
+
+    live_ticker, info_property = create_live_ticker(info={'averageVolume': 2})
+    cached_ticker = metadata_cache.CachedTicker(live_ticker, path)
+    assert cached_ticker.info == {'averageVolume': 2}
+    assert cached_ticker.funds_data.sector_weightings == {'technology': 0.9}
+    assert metadata_cache.load(path, "TEST.DE")['info'].fetched_on == str(date.today())
+
+    metadata_cache.store(path, "TEST.DE", 'info', {'averageVolume': 3}, days_ago(2))
+    failing_ticker, info_property = create_live_ticker()
+    info_property.side_effect = ConnectionError("network down")
+    assert metadata_cache.CachedTicker(failing_ticker, path).info == {'averageVolume': 3}
+
+    with pytest.raises(ConnectionError):
+        failing_ticker.ticker = "OTHER.DE"
+        metadata_cache.CachedTicker(failing_ticker, path).info
+
+    print("  ✅ Metadata field TTL test passed")
+
+
+def test_offline_mode(tmp_path):
+    """Test that offline mode uses cached values of any age and empty values otherwise"""
+    print("Testing offline metadata...")
+    path = str(tmp_path / "metadata.sqlite")
+    metadata_cache.store(path, "TEST.DE", 'info', {'averageVolume': 1}, days_ago(400))
+    live_ticker, info_property = create_live_ticker()
+    type(live_ticker).funds_data = PropertyMock(side_effect=AssertionError("must not fetch"))
+
+    cached_ticker = metadata_cache.CachedTicker(live_ticker, path, offline=True)
+    assert cached_ticker.info == {'averageVolume': 1}
+    assert cached_ticker.funds_data.top_holdings.empty
+    assert cached_ticker.funds_data.sector_weightings == {}
+    info_property.assert_not_called()
+
+    print("  ✅ Offline metadata test passed")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Test script for run_journal.py"""
+
+import copyreg
+
+import pytest
+
+from src.adapter.out.journal import run_journal
+from src.logic.data.data import StockData
+from tests.helpers import create_stock_data
+
+
+def test_results_and_side_effects_roundtrip(tmp_path):
+    """Test that results keep their arrays and dicts and side effects are recorded per ETF"""
+    print("Testing run journal roundtrip...")
+    journal = run_journal.start(str(tmp_path / "journal.sqlite"))
+    assert not journal.resumed
+    assert run_journal.entries(journal) == {}
+
+    run_journal.record_result(journal, "AAA", create_stock_data("AAA"))
+    run_journal.record_side_effect(journal, "AAA", "notified")
+    run_journal.record_side_effect(journal, "BBB", "counted")
+
+    entries = run_journal.entries(journal)
+    assert not entries["AAA"].is_complete()
+    run_journal.record_side_effect(journal, "AAA", "counted")
+    entry = run_journal.entry(journal, "AAA")
+    assert entry.is_complete()
+    assert entry.result.top_holdings.tolist() == create_stock_data("AAA").top_holdings.tolist()
+    assert entry.result.sector_allocation == {"technology": 0.4, "healthcare": 0.1}
+    assert entries["BBB"].result is None and entries["BBB"].counted and not entries["BBB"].notified
+    assert run_journal.entry(journal, "CCC") == run_journal.JournalEntry()
+
+    with pytest.raises(ValueError):
+        run_journal.record_side_effect(journal, "AAA", "emailed")
+
+    print("  ✅ Run journal roundtrip test passed")
+
+
+def test_resume_continues_the_last_unfinished_run(tmp_path):
+    """Test that resuming picks the unfinished run and that a finished run is never resumed"""
+    print("Testing run journal resume...")
+    path = str(tmp_path / "journal.sqlite")
+    first = run_journal.start(path)
+    run_journal.record_side_effect(first, "AAA", "notified")
+
+    resumed = run_journal.start(path, resume=True)
+    assert resumed.resumed and resumed.run_id == first.run_id
+    assert run_journal.entry(resumed, "AAA").notified
+
+    fresh = run_journal.start(path)
+    assert fresh.run_id != first.run_id and run_journal.entries(fresh) == {}
+
+    run_journal.finish(fresh)
+    assert run_journal.start(path, resume=True).run_id == first.run_id
+    run_journal.finish(first)
+    after_finish = run_journal.start(path, resume=True)
+    assert not after_finish.resumed and after_finish.run_id not in (first.run_id, fresh.run_id)
+
+    print("  ✅ Run journal resume test passed")
+
+
+class LegacyStockData:
+    """Pickles like a StockData from before it was slotted: the class and a state dict of its fields."""
+
+    def __reduce__(self):
+        return copyreg._reconstructor, (StockData, object, None), {"ticker_symbol": "AAA", "stock_name": "AAA ETF", "top_holdings": []}
+
+
+def test_unreadable_result_is_analysed_again(tmp_path):
+    """Test that a result pickled in an older layout makes the entry not done instead of failing the resume"""
+    print("Testing unreadable journaled result...")
+    journal = run_journal.start(str(tmp_path / "journal.sqlite"))
+    run_journal.record_result(journal, "AAA", LegacyStockData())
+    run_journal.record_side_effect(journal, "AAA", "notified")
+    run_journal.record_side_effect(journal, "AAA", "counted")
+
+    entry = run_journal.entries(journal)["AAA"]
+    assert entry.result is None and not entry.is_complete()
+    # The side effects already carried out are kept, so they are not repeated
+    assert entry.notified and entry.counted
+    assert run_journal.entry(journal, "AAA") == entry
+    print("  ✅ Unreadable journaled result test passed")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Test script for the Telegram delivery queue against a local stub Bot API server"""
+
+import io
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.adapter.out.notify import delivery
+from src.adapter.out.notify.delivery import DeliveryQueue
+
+
+class StubBotApi(ThreadingHTTPServer):
+    """Answers Bot API calls with `rejections` 400s, `throttle` 429s and `failures` 500s first, then with success."""
+
+    def __init__(self, throttle: int = 0, failures: int = 0, rejections: int = 0):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.requests = []
+        self.throttle = throttle
+        self.failures = failures
+        self.rejections = rejections
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.requests.append((time.monotonic(), self.path, body))
+        if self.server.rejections:
+            self.server.rejections -= 1
+            self.__answer(400, {'ok': False, 'error_code': 400, 'description': 'Bad Request: chat not found'})
+        elif self.server.throttle:
+            self.server.throttle -= 1
+            self.__answer(429, {'ok': False, 'error_code': 429, 'description': 'Too Many Requests: retry after 0',
+                                'parameters': {'retry_after': 0}})
+        elif self.server.failures:
+            self.server.failures -= 1
+            self.__answer(500, {'ok': False, 'error_code': 500, 'description': 'Internal Server Error'})
+        else:
+            self.__answer(200, {'ok': True, 'result': {'message_id': len(self.server.requests)}})
+
+    def __answer(self, status: int, payload: dict):
+        data = json.dumps(payload).encode('utf8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_api():
+    servers = []
+
+    def start(**kwargs) -> StubBotApi:
+        server = StubBotApi(**kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        delivery.set_api_url(server.url)
+        servers.append(server)
+        return server
+
+    yield start
+    delivery.set_api_url(delivery.DEFAULT_API_URL)
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_messages_are_paced_and_do_not_block(stub_api):
+    """Test that submitting returns at once and sends are spaced by the minimum interval"""
+    print("Testing paced delivery...")
+    server = stub_api()
+    queue = DeliveryQueue('TOKEN', min_interval=0.1)
+    delivered = []
+
+    start = time.monotonic()
+    for i in range(3):
+        queue.submit('sendMessage', on_delivered=lambda i=i: delivered.append(i), chat_id='1', text=f'message {i}')
+    assert time.monotonic() - start < 0.1, "Submitting must not wait for the network"
+    queue.flush()
+
+    assert delivered == [0, 1, 2]
+    assert [path for _, path, _ in server.requests] == ['/botTOKEN/sendMessage'] * 3, "No getMe before the sends"
+    gaps = [later[0] - earlier[0] for earlier, later in zip(server.requests, server.requests[1:])]
+    assert min(gaps) >= 0.09
+    queue.close()
+
+    print("  ✅ Paced delivery test passed")
+
+
+def test_retries_and_closes_attachments(stub_api):
+    """Test that throttled and failed sends are retried with the attachments rewound and then closed"""
+    print("Testing delivery retries...")
+    server = stub_api(throttle=1, failures=1)
+    queue = DeliveryQueue('TOKEN', min_interval=0, backoff=0.01)
+    photo = io.BytesIO(b'\x89PNG fake image')
+    photo.name = 'two_year_TEST.png'
+    delivered = []
+
+    queue.submit('sendPhoto', attachments=[photo], on_delivered=lambda: delivered.append(True), chat_id='1', photo=photo)
+    queue.flush()
+
+    assert delivered == [True]
+    assert len(server.requests) == 3
+    assert all(b'\x89PNG fake image' in body for _, _, body in server.requests), "Every attempt sends the whole file"
+    assert photo.closed
+    queue.close()
+
+    print("  ✅ Delivery retries test passed")
+
+
+def test_client_errors_are_not_retried(stub_api):
+    """Test that a rejected message is given up at once and still releases its attachments"""
+    print("Testing rejected delivery...")
+    server = stub_api(rejections=1)
+    queue = DeliveryQueue('TOKEN', min_interval=0, backoff=0.01)
+    attachment = io.BytesIO(b'data')
+    delivered = []
+
+    queue.submit('sendMessage', attachments=[attachment], on_delivered=lambda: delivered.append(True), chat_id='1', text='x')
+    queue.close()
+
+    assert delivered == [] and len(server.requests) == 1
+    assert attachment.closed
+    with pytest.raises(RuntimeError):
+        queue.submit('sendMessage', chat_id='1', text='y')
+
+    print("  ✅ Rejected delivery test passed")
@@ -1,10 +1,18 @@
 #!/usr/bin/env python3
 """Test script for the refactored optimizer.py"""
 
+import itertools
+import pathlib
+import random
+import re
+import tempfile
 from unittest.mock import Mock, patch
 import numpy as np
+import pytest
 from src.adapter.out.optimization import optimizer
 from src.logic.data.data import StockData, ProfitabilityData
+from src.logic.data.holdings import HoldingsIndex
+from src.logic.data.universe import Universe
 
 def create_test_stock_data():
     """Create sample StockData objects for testing with clear risk/reward tradeoffs"""
@@ -225,6 +233,271 @@ def test_optimizer_risk_differentiation():
         print("\n✅ Risk-aware vs profit-only test completed!")
 
 
+def test_vectorized_evaluator_matches_reference():
+    """Test that the vectorized evaluator scores portfolios like the per-share reference calculation"""
+    print("\nTesting vectorized population evaluation...")
+    
+    stocks = create_test_stock_data()
+    universe = Universe.from_stock_data(stocks)
+    current_prices = [stock.current_price for stock in stocks]
+    predicted_prices = [stock.predict_price for stock in stocks]
+    dividend_yields = [stock.dividend_yield for stock in stocks]
+    expense_ratios = [stock.expense_ratio for stock in stocks]
+    ownership_weights = [1.0, 0.5, 1.0, 1.0, 0.25]
+    budget = 50.0
+    
+    calculate_volatility_risk = getattr(optimizer, '__calculate_volatility_risk')
+    calculate_sector_risk = getattr(optimizer, '__calculate_sector_concentration_risk')
+    calculate_overlap_risk = getattr(optimizer, '__calculate_company_overlap_risk')
+    
+    def reference(individual, include_risk):
+        total_cost = sum(price * shares for price, shares in zip(current_prices, individual))
+        if total_cost > budget:
+            return 100000000000, -10000000000
+        total_net_profit = 0.0
+        for i, shares in enumerate(individual):
+            uncertainty = stocks[i].prediction_uncertainty
+            confidence = 1.0 - min(uncertainty / predicted_prices[i], 0.5) if predicted_prices[i] > 0 and uncertainty > 0 else 1.0
+            capital_gain = (predicted_prices[i] - current_prices[i]) * confidence * shares
+            dividend_income = current_prices[i] * dividend_yields[i] * shares
+            expense_fee = current_prices[i] * shares * expense_ratios[i]
+            total_net_profit += (capital_gain + dividend_income - expense_fee) * ownership_weights[i]
+        if include_risk:
+            total_net_profit -= 20.0 * (
+                0.25 * calculate_volatility_risk(individual, universe) +
+                0.4 * calculate_sector_risk(individual, universe) +
+                0.35 * calculate_overlap_risk(individual, universe)
+            )
+        return abs(budget - total_cost), total_net_profit
+    
+    rng = np.random.default_rng(7)
+    population = rng.integers(0, 4, size=(300, len(stocks))).tolist() + [[0] * len(stocks)]
+    
+    for include_risk in (True, False):
+        evaluator = optimizer._create_evaluator_factory(universe, ownership_weights, budget, include_risk)
+        scores = evaluator.evaluate_population(population)
+        for individual, score in zip(population, scores):
+            assert np.allclose(score, reference(individual, include_risk)), f"Mismatch for {individual}"
+        assert np.allclose(evaluator(population[0]), scores[0])
+    
+    print("  ✅ Vectorized evaluation matches the reference calculation")
+
+
+def test_exact_solver_matches_brute_force():
+    """Test that the exact solver finds the best portfolio among all share combinations where its objective is exact"""
+    print("\nTesting exact solver against brute force...")
+    
+    universe = Universe.from_stock_data(create_test_stock_data())
+    etf_map = {"TECH": 3, "BLEND": 1, "DIV": 0, "CONC": 0, "LOSS": 2}
+    
+    for budget in (50.0, 37.0, 11.0):
+        best_individual, *_ = optimizer._run_exact_solver_with_map(universe, budget, budget, etf_map, include_risk=False)
+        
+        max_shares = optimizer._calculate_max_shares(universe.current_prices, budget)
+        evaluator = optimizer._create_evaluator_factory(
+            universe, optimizer._create_ownership_weights(universe.tickers, etf_map), budget, include_risk=False
+        )
+        population = [list(shares) for shares in itertools.product(*(range(m + 1) for m in max_shares))]
+        expected = min(evaluator.evaluate_population(population), key=lambda score: (round(score[0], 6), -score[1]))
+        
+        print(f"  Budget €{budget}: {best_individual} -> {evaluator(best_individual)}")
+        assert np.allclose(evaluator(best_individual), expected)
+    
+    # Without sectors and holdings only the volatility term is left, which is linear in the weights of the
+    # amount spent. The less profitable CALM only wins when its lower volatility is charged relative to
+    # the €20 that can be spent rather than the €25 budget.
+    universe = Universe(
+        tickers=["CALM", "WILD"], stock_names=["Calm ETF", "Wild ETF"],
+        current_prices=np.array([10.0, 10.0]), predicted_prices=np.array([11.0, 11.63]),
+        dividend_yields=np.zeros(2), expense_ratios=np.zeros(2), standard_deviations=np.array([0.4, 0.8]),
+        betas=np.ones(2), prediction_uncertainties=np.zeros(2), average_daily_volumes=np.ones(2),
+        assets_under_management=np.ones(2), sector_names=[], sector_matrix=np.zeros((2, 0)),
+        holdings=HoldingsIndex.from_top_holdings([[], []]),
+    )
+    best_individual, *_ = optimizer._run_exact_solver_with_map(universe, 25.0, 25.0, {}, include_risk=True)
+    
+    evaluator = optimizer._create_evaluator_factory(universe, [1.0, 1.0], 25.0, include_risk=True)
+    population = [list(shares) for shares in itertools.product(range(3), range(3))]
+    expected = min(evaluator.evaluate_population(population), key=lambda score: (round(score[0], 6), -score[1]))
+    print(f"  Risk-aware, budget €25.0: {best_individual} -> {evaluator(best_individual)}")
+    assert best_individual == [2, 0]
+    assert np.allclose(evaluator(best_individual), expected)
+    
+    print("  ✅ Exact solver matches brute force")
+
+
+def test_optimizer_exact_solver(tmp_path):
+    """Test that the exact solver produces the same report format deterministically, also from a saved universe"""
+    print("\nTesting optimize with the exact solver...")
+    
+    stocks = create_test_stock_data()
+    test_etf_map = {ticker: 0 for ticker in ["TECH", "BLEND", "DIV", "CONC", "LOSS"]}
+    Universe.from_stock_data(stocks).save(str(tmp_path / "universe.npz"))
+    
+    with patch.object(optimizer, '__get_etf_map', return_value=test_etf_map):
+        result = optimizer.optimize(stocks, budget=50.0, solver="exact")
+        assert result == optimizer.optimize(stocks, budget=50.0, solver="exact")
+        assert result == optimizer.optimize(Universe.load(str(tmp_path / "universe.npz")), budget=50.0, solver="exact")
+        with pytest.raises(ValueError):
+            optimizer.optimize(stocks, budget=50.0, solver="unknown")
+    
+    print(result)
+    assert "Risk-Aware Optimization" in result
+    assert "Profit-Only Optimization" in result
+    assert "Total Investment:* €" in result
+    assert result.count("Company Overlap:") == 2
+    
+    print("  ✅ Exact solver test passed")
+
+
+def test_optimizer_parallel_runs_are_reproducible():
+    """Test that a seeded optimization gives the same result in worker processes and in sequence"""
+    print("\nTesting parallel optimization reproducibility...")
+    
+    stocks = create_test_stock_data()
+    test_etf_map = {ticker: 0 for ticker in ["TECH", "BLEND", "DIV", "CONC", "LOSS"]}
+    
+    with patch.object(optimizer, '__get_etf_map', return_value=test_etf_map) as mock_get_etf_map:
+        parallel_result = optimizer.optimize(stocks, budget=50.0, seed=7, parallel=True)
+        random.seed(123)
+        expected_draw = random.Random(123).random()
+        sequential_result = optimizer.optimize(stocks, budget=50.0, seed=7, parallel=False)
+    
+    assert parallel_result == sequential_result
+    # Running in this process leaves the caller's random sequence where it was
+    assert random.random() == expected_draw
+    # The ownership map is fetched once per optimization in the parent process, never in the workers
+    assert mock_get_etf_map.call_count == 2
+    
+    print("  ✅ Parallel optimization reproducibility test passed")
+
+
+def test_evaluation_backends_agree():
+    """Test that every evaluation backend scores a population like the serial one, in order"""
+    print("\nTesting evaluation backends...")
+    
+    stocks = create_test_stock_data()
+    evaluator = optimizer._create_evaluator_factory(
+        Universe.from_stock_data(stocks), [1.0] * len(stocks), 50.0, include_risk=True
+    )
+    population = np.random.default_rng(3).integers(0, 4, size=(37, len(stocks))).tolist()
+    expected = evaluator.evaluate_population(population)
+    
+    for backend in optimizer.EVALUATION_BACKENDS:
+        with optimizer._evaluation_map(evaluator, backend, workers=2) as evaluation_map:
+            assert evaluation_map(evaluator, population) == expected, f"{backend} backend differs"
+        print(f"  {backend}: ok")
+    
+    with pytest.raises(ValueError):
+        with optimizer._evaluation_map(evaluator, "threads"):
+            pass
+    
+    with patch.object(optimizer, '__get_etf_map', return_value={}):
+        assert optimizer.optimize(stocks, seed=5, parallel=False) == \
+            optimizer.optimize(stocks, seed=5, evaluation_backend="futures", evaluation_workers=2)
+    
+    print("  ✅ Evaluation backend test passed")
+
+
+def test_fitness_cache():
+    """Test that repeated genomes are served from the cache and the least recently used ones are evicted"""
+    print("\nTesting fitness cache...")
+    
+    evaluated = []
+    
+    def evaluation_map(evaluate, population):
+        evaluated.extend(tuple(individual) for individual in population)
+        return [(0.0, float(sum(individual))) for individual in population]
+    
+    cache = optimizer.FitnessCache(evaluation_map, maxsize=2)
+    assert cache(None, [[1, 0], [0, 2], [1, 0]]) == [(0.0, 1.0), (0.0, 2.0), (0.0, 1.0)]
+    assert evaluated == [(1, 0), (0, 2)]
+    assert (cache.hits, cache.misses) == (1, 2)
+    
+    # (0, 2) becomes the most recently used entry, so adding (3, 3) evicts (1, 0)
+    assert cache(None, [[0, 2], [3, 3]]) == [(0.0, 2.0), (0.0, 6.0)]
+    assert list(cache.entries) == [(0, 2), (3, 3)]
+    cache(None, [[1, 0]])
+    assert evaluated[-1] == (1, 0)
+    assert (cache.hits, cache.misses) == (2, 4)
+    assert cache.hit_rate() == pytest.approx(2 / 6)
+    
+    print("  ✅ Fitness cache test passed")
+
+
+def test_genetic_algorithm_stops_early():
+    """Test that the GA stops on a stall window or time budget and returns its convergence logbook"""
+    print("\nTesting GA early stopping...")
+    
+    universe = Universe.from_stock_data(create_test_stock_data())
+    random.seed(11)
+    with patch.object(optimizer, 'STALL_GENERATIONS', 20):
+        best_individual, *_, logbook = optimizer._run_genetic_algorithm_with_map(universe, 50.0, 50.0, {}, include_risk=False)
+        summary = optimizer.convergence_summary(logbook)
+    
+    generations = logbook.select("gen")
+    best = [(-deviation, profit) for deviation, profit in logbook.select("best")]
+    print(f"  Stopped after {generations[-1]} generations, best {logbook[-1]['best']}")
+    assert generations[-1] < optimizer.NUMBER_OF_ITERATIONS
+    assert best == sorted(best), "Best fitness must never get worse"
+    assert best[-1] == best[-21], "Run must stop exactly after 20 generations without improvement"
+    assert tuple(best_individual.fitness.values) == logbook[-1]['best']
+    assert summary.startswith(f"{generations[-1]} generations (no improvement for 20 generations)")
+    assert f"last improvement at generation {generations[-21]}" in summary
+    
+    _, *_, logbook = optimizer._run_genetic_algorithm_with_map(universe, 50.0, 50.0, {}, include_risk=False, time_budget=1e-9)
+    assert logbook.select("gen") == [0, 1]
+    assert "(time budget used up)" in optimizer.convergence_summary(logbook)
+    
+    print("  ✅ GA early stopping test passed")
+
+
+def test_island_model_genetic_algorithm():
+    """Test that the island model migrates between epochs, is reproducible and finds the optimal portfolio"""
+    print("\nTesting island-model GA...")
+    
+    universe = Universe.from_stock_data(create_test_stock_data())
+    exact_individual, *_ = optimizer._run_exact_solver_with_map(universe, 50.0, 50.0, {}, include_risk=False)
+    
+    results = []
+    for topology in ("ring", "random", "random"):
+        random.seed(21)
+        with patch.object(optimizer.logging, 'info') as log_info:
+            best_individual, *_, logbook = optimizer._run_genetic_algorithm_with_map(
+                universe, 50.0, 50.0, {}, include_risk=False, islands=3, migration_interval=10, migration_topology=topology
+            )
+        generations = logbook.select("gen")
+        # The fitness caches of the island workers are reported like the one of a single population
+        cache_lines = [call.args[0] for call in log_info.call_args_list if call.args[0].startswith("Fitness cache")]
+        assert len(cache_lines) == 1 and "summed over 3 islands" in cache_lines[0]
+        hits, misses = map(int, re.search(r"(\d+) hits, (\d+) misses", cache_lines[0]).groups())
+        assert hits + misses == sum(logbook.select("nevals")) and hits > 0
+        print(f"  {topology}: {list(best_individual)} after {generations[-1]} generations")
+        assert all(gen % 10 == 0 for gen in generations)
+        assert logbook[0]["nevals"] == 3 * optimizer.NUMBER_OF_POPULATION
+        results.append((list(best_individual), logbook.select("best")))
+    
+    assert results[1] == results[2], "Seeded island runs must be reproducible"
+    assert results[0][0] == exact_individual == results[1][0]
+    
+    with pytest.raises(ValueError):
+        optimizer._run_genetic_algorithm_with_map(universe, 50.0, 50.0, {}, islands=2, migration_topology="star")
+    with pytest.raises(ValueError):
+        optimizer._run_genetic_algorithm_with_map(universe, 50.0, 50.0, {}, islands=2, migration_interval=0)
+    with pytest.raises(ValueError):
+        optimizer._run_genetic_algorithm_with_map(universe, 50.0, 50.0, {}, islands=0)
+    
+    print("  ✅ Island-model GA test passed")
+
+
 if __name__ == "__main__":
     test_optimizer_basic()
     test_optimizer_risk_differentiation()
+    test_vectorized_evaluator_matches_reference()
+    test_exact_solver_matches_brute_force()
+    test_optimizer_exact_solver(pathlib.Path(tempfile.mkdtemp()))
+    test_optimizer_parallel_runs_are_reproducible()
+    test_evaluation_backends_agree()
+    test_fitness_cache()
+    test_genetic_algorithm_stops_early()
+    test_island_model_genetic_algorithm()
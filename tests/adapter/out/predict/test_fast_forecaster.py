@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Test script for fast_forecaster.py"""
+
+import numpy as np
+import pandas as pd
+
+from src.adapter.out.predict.fast_forecaster import FastForecaster
+from src.adapter.out.render import charts
+
+
+def create_seasonal_data(periods: int = 365 * 3) -> pd.DataFrame:
+    dates = pd.date_range(start='2021-01-01', periods=periods, freq='D')
+    days = np.arange(periods)
+    y = (100 + 0.05 * days + 2 * np.sin(2 * np.pi * days / 7) + 5 * np.sin(2 * np.pi * days / 365.25)
+         + np.random.default_rng(7).normal(0, 0.5, periods))
+    return pd.DataFrame({'ds': dates, 'y': y})
+
+
+def test_fast_forecaster_recovers_trend_and_seasonality():
+    """Test that a known trend with weekly and yearly seasonality is fitted and extrapolated"""
+    print("Testing fast forecaster fit...")
+    data = create_seasonal_data()
+    model = FastForecaster().fit(data)
+    forecast = model.predict(model.make_future_dataframe(periods=60))
+
+    assert list(forecast.columns) == ['ds', 'trend', 'weekly', 'yearly', 'yhat', 'yhat_lower', 'yhat_upper']
+    assert len(forecast) == len(data) + 60
+    assert np.allclose(forecast['yhat'], forecast['trend'] + forecast['weekly'] + forecast['yearly'])
+
+    in_sample_error = np.abs(forecast['yhat'].head(len(data)).values - data['y'].values).mean()
+    print(f"  In-sample MAE: {in_sample_error:.3f}")
+    assert in_sample_error < 1.0
+    assert 1.5 < forecast['weekly'].max() < 2.5
+
+    expected_end = 100 + 0.05 * (len(data) + 59) + 2 * np.sin(2 * np.pi * (len(data) + 59) / 7) \
+        + 5 * np.sin(2 * np.pi * (len(data) + 59) / 365.25)
+    assert abs(forecast['yhat'].iloc[-1] - expected_end) < 2.0
+
+    print("  ✅ Fast forecaster fit test passed")
+
+
+def test_fast_forecaster_intervals_widen_with_horizon():
+    """Test that intervals cover the residual noise and grow with the forecast horizon"""
+    print("Testing fast forecaster intervals...")
+    data = create_seasonal_data()
+    model = FastForecaster(interval_width=0.8).fit(data)
+    forecast = model.predict(model.make_future_dataframe(periods=90))
+    width = forecast['yhat_upper'] - forecast['yhat_lower']
+
+    history = forecast.head(len(data))
+    coverage = ((data['y'].values >= history['yhat_lower'].values) & (data['y'].values <= history['yhat_upper'].values)).mean()
+    print(f"  In-sample coverage: {coverage:.2%}")
+    assert 0.7 < coverage < 0.9
+    assert np.allclose(width.head(len(data)), width.iloc[0])
+    assert (np.diff(width.tail(90).values) > 0).all()
+
+    print("  ✅ Fast forecaster intervals test passed")
+
+
+def test_fast_forecaster_renders_chart():
+    """Test that the chart renderer accepts the fast engine like a Prophet model"""
+    print("Testing fast forecaster chart...")
+    data = create_seasonal_data(periods=120)
+    model = FastForecaster(yearly_seasonality=False).fit(data)
+    forecast = model.predict(model.make_future_dataframe(periods=10))
+    assert 'yearly' not in forecast.columns
+
+    chart = charts.render_forecast(model, forecast, 'two_year_TEST.png')
+    assert chart.read(8) == b'\x89PNG\r\n\x1a\n'
+
+    print("  ✅ Fast forecaster chart test passed")
+
+
+def test_fit_many_matches_single_fits():
+    """Test that the batched fit equals separate fits on a shared calendar and masks missing days"""
+    print("Testing batched fast forecaster fit...")
+    data = create_seasonal_data()
+    scaled = data.assign(y=data['y'] * 3 + 50)
+    gapped = data.drop(index=range(200, 400)).reset_index(drop=True)
+
+    models = FastForecaster.fit_many({'A': data, 'B': scaled, 'C': gapped})
+    futures = {name: model.make_future_dataframe(periods=30) for name, model in models.items()}
+    forecasts = FastForecaster.predict_many(models, futures)
+
+    for name, history in [('A', data), ('B', scaled)]:
+        single = FastForecaster().fit(history)
+        expected = single.predict(single.make_future_dataframe(periods=30))
+        assert np.allclose(forecasts[name]['yhat'], expected['yhat'])
+        assert np.allclose(forecasts[name]['yhat_upper'], expected['yhat_upper'])
+
+    # Masked days do not count as observations, but the model still covers the full calendar
+    assert len(forecasts['C']) == len(gapped) + 30
+    assert abs(forecasts['C']['yhat'].iloc[-1] - forecasts['A']['yhat'].iloc[-1]) < 1.0
+
+    print("  ✅ Batched fast forecaster fit test passed")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Test script for forecast_cache.py"""
+
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+
+from src.adapter.out.predict import forecast_cache, predicter
+from src.adapter.out.predict.fast_forecaster import FastForecaster
+
+
+def create_history(days: int = 400, seed: int = 3) -> pd.DataFrame:
+    dates = pd.bdate_range(end='2025-01-31', periods=days)
+    prices = 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0.0003, 0.01, days)))
+    return pd.DataFrame({'ds': dates, 'y': prices})
+
+
+def test_key_depends_on_content_and_settings():
+    """Test that the key changes with any price, date or setting and nothing else"""
+    print("Testing forecast cache keys...")
+    history = create_history()
+    base = forecast_cache.key(history, {'engine': 'fast', 'predict_period': 90})
+
+    assert forecast_cache.key(history.copy(), {'predict_period': 90, 'engine': 'fast'}) == base
+    assert forecast_cache.key(history, {'engine': 'fast', 'predict_period': 30}) != base
+    changed_price = history.copy()
+    changed_price.loc[10, 'y'] += 0.01
+    assert forecast_cache.key(changed_price, {'engine': 'fast', 'predict_period': 90}) != base
+    assert forecast_cache.key(history.iloc[1:], {'engine': 'fast', 'predict_period': 90}) != base
+
+    print("  ✅ Forecast cache keys test passed")
+
+
+def test_predict_windows_served_from_cache(tmp_path):
+    """Test that an unchanged history is not refitted and a changed one is"""
+    print("Testing forecast cache hits...")
+    cache_dir = str(tmp_path / "forecasts")
+    history = create_history()
+
+    first = predicter.predict_windows(history, windows=[None, 200], predict_period=30, engine="fast", forecast_cache_dir=cache_dir)
+    with patch.object(FastForecaster, 'fit', side_effect=AssertionError("should be served from the cache")):
+        second = predicter.predict_windows(history, windows=[None, 200], predict_period=30, engine="fast", forecast_cache_dir=cache_dir)
+    for (_, expected), (model, forecast) in zip(first, second):
+        pd.testing.assert_frame_equal(forecast, expected)
+        assert isinstance(model, FastForecaster) and model.history is not None
+
+    next_day = pd.concat([history, pd.DataFrame({'ds': [history['ds'].max() + pd.offsets.BDay(1)], 'y': [101.0]})], ignore_index=True)
+    [(_, forecast)] = predicter.predict_windows(next_day, windows=[None], predict_period=30, engine="fast", forecast_cache_dir=cache_dir)
+    assert forecast['ds'].iloc[-1] > first[0][1]['ds'].iloc[-1]
+
+    print("  ✅ Forecast cache hits test passed")
+
+
+def test_predict_panel_served_from_cache(tmp_path):
+    """Test that the batch forecast only fits the ticker windows the cache does not have"""
+    print("Testing forecast cache in the batch forecast...")
+    cache_dir = str(tmp_path / "forecasts")
+    history = create_history()
+    first = predicter.predict_panel({'AAA': history, 'BBB': history.assign(y=history['y'] * 2)}, windows=[None, 200], predict_period=30,
+                                    forecast_cache_dir=cache_dir)
+
+    next_day = pd.concat([history, pd.DataFrame({'ds': [history['ds'].max() + pd.offsets.BDay(1)], 'y': [101.0]})], ignore_index=True)
+    histories = {'AAA': history, 'BBB': next_day, 'CCC': create_history(seed=4)}
+    with patch.object(FastForecaster, 'fit_many', wraps=FastForecaster.fit_many) as fit_many:
+        second = predicter.predict_panel(histories, windows=[None, 200], predict_period=30, forecast_cache_dir=cache_dir)
+
+    # AAA is unchanged, BBB got a new day and CCC is new; each window fits the misses in one batch
+    assert [sorted(call.args[0]) for call in fit_many.call_args_list] == [['BBB', 'CCC'], ['BBB', 'CCC']]
+    for (_, expected), (model, forecast) in zip(first['AAA'], second['AAA']):
+        pd.testing.assert_frame_equal(forecast, expected)
+        assert isinstance(model, FastForecaster)
+    assert second['BBB'][0][1]['ds'].iloc[-1] > first['BBB'][0][1]['ds'].iloc[-1]
+    assert len(second['CCC']) == 2
+
+    print("  ✅ Batch forecast cache test passed")
+
+
+def test_prophet_model_roundtrip(tmp_path):
+    """Test that cached Prophet models come back fitted and warm-start the next window"""
+    print("Testing cached Prophet models...")
+    cache_dir = str(tmp_path / "forecasts")
+    history = create_history(days=200)
+
+    [(model, forecast)] = predicter.predict_windows(history, windows=[None], predict_period=10, add_holidays=False, forecast_cache_dir=cache_dir)
+    with patch('prophet.Prophet.fit', side_effect=AssertionError("should be served from the cache")):
+        [(cached_model, cached_forecast)] = predicter.predict_windows(history, windows=[None], predict_period=10, add_holidays=False, forecast_cache_dir=cache_dir)
+    pd.testing.assert_frame_equal(cached_forecast, forecast)
+    assert set(cached_model.params) >= {'k', 'm', 'delta', 'beta'}
+
+    print("  ✅ Cached Prophet models test passed")
+
+
+def test_eviction_keeps_newest_entries(tmp_path):
+    """Test that the size budget evicts the least recently used entries"""
+    print("Testing forecast cache eviction...")
+    cache_dir = str(tmp_path / "forecasts")
+    forecast = pd.DataFrame({'ds': pd.bdate_range('2025-01-01', periods=500), 'yhat': np.arange(500.0)})
+
+    keys = [forecast_cache.key(create_history(seed=seed), {}) for seed in range(3)]
+    for age, forecast_key in enumerate(keys):
+        forecast_cache.store(cache_dir, forecast_key, None, forecast)
+        path = os.path.join(cache_dir, forecast_key[:2], f'{forecast_key}.pkl')
+        os.utime(path, (time.time() - 100 + age, time.time() - 100 + age))
+    entry_size = os.path.getsize(path)
+
+    # Reading the oldest entry makes it the most recently used one
+    assert forecast_cache.load(cache_dir, keys[0]) is not None
+    forecast_cache.evict(cache_dir, max_bytes=2 * entry_size)
+
+    assert forecast_cache.load(cache_dir, keys[1]) is None
+    assert forecast_cache.load(cache_dir, keys[0]) is not None
+    assert forecast_cache.load(cache_dir, keys[2]) is not None
+
+    print("  ✅ Forecast cache eviction test passed")
+
+
+def test_store_walks_the_cache_only_when_over_budget(tmp_path):
+    """Test that writes keep a running size total and only an over-budget write walks and evicts the cache"""
+    print("Testing forecast cache size tracking...")
+    cache_dir = str(tmp_path / "forecasts")
+    forecast = pd.DataFrame({'ds': pd.bdate_range('2025-01-01', periods=500), 'yhat': np.arange(500.0)})
+    keys = [forecast_cache.key(create_history(seed=seed), {}) for seed in range(10)]
+
+    forecast_cache.store(cache_dir, keys[0], None, forecast)
+    entry_size = os.path.getsize(os.path.join(cache_dir, keys[0][:2], f'{keys[0]}.pkl'))
+    with patch.object(forecast_cache.os, 'walk', wraps=os.walk) as walk:
+        for forecast_key in keys[:5]:
+            forecast_cache.store(cache_dir, forecast_key, None, forecast, max_bytes=int(5.5 * entry_size))
+        # Measured once; rewriting keys[0] does not grow the total
+        assert walk.call_count == 1
+        for forecast_key in keys[5:]:
+            forecast_cache.store(cache_dir, forecast_key, None, forecast, max_bytes=int(5.5 * entry_size))
+        # Evicting down to 90% of the budget leaves room, so not every later write walks again
+        assert 1 < walk.call_count < 6
+
+    remaining = sum(len(files) for _, _, files in os.walk(cache_dir))
+    assert remaining <= 5 and forecast_cache.load(cache_dir, keys[-1]) is not None
+    print("  ✅ Forecast cache size tracking test passed")
+
+
+def test_undecodable_entry_is_a_miss(tmp_path):
+    """Test that an entry whose Prophet model cannot be decoded is treated like a missing one"""
+    print("Testing undecodable forecast cache entry...")
+    cache_dir = str(tmp_path / "forecasts")
+    forecast_key = forecast_cache.key(create_history(), {})
+    path = os.path.join(cache_dir, forecast_key[:2], f'{forecast_key}.pkl')
+    os.makedirs(os.path.dirname(path))
+    with open(path, 'wb') as file:
+        pickle.dump({'model_format': 'prophet', 'model': '{"written by": "another Prophet"}', 'forecast': None}, file)
+
+    assert forecast_cache.load(cache_dir, forecast_key) is None
+    print("  ✅ Undecodable entry test passed")
@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 """Test script for predicter.py"""
 
+import json
+import os
+
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -362,6 +365,122 @@ def test_predict_performance_metrics():
     print("  ✅ Performance metrics test passed")
 
 
+def test_predict_windows():
+    """Test multi-window prediction from a single history"""
+    print("Testing multi-window prediction...")
+    
+    test_data = create_test_data(days=365*3)
+    two_year_data = test_data[test_data['ds'] >= test_data['ds'].max() - pd.Timedelta(days=365*2)]
+    
+    results = predicter.predict_windows(test_data, windows=[None, 365*2], predict_period=30)
+    
+    assert len(results) == 2
+    (full_model, full_forecast), (two_year_model, two_year_forecast) = results
+    
+    from prophet import Prophet
+    assert isinstance(full_model, Prophet)
+    assert isinstance(two_year_model, Prophet)
+    
+    # Each window keeps its own history plus the shared forecast period
+    assert len(full_forecast) == len(test_data) + 30
+    assert len(two_year_forecast) == len(two_year_data) + 30
+    assert (full_forecast['ds'].tail(30).values == two_year_forecast['ds'].tail(30).values).all()
+    
+    # Same columns as a single `predict` call, so the analyzer can consume either
+    _, single_forecast = predicter.predict(two_year_data, predict_period=30)
+    assert list(two_year_forecast.columns) == list(single_forecast.columns)
+    
+    # The warm-started fit should land close to an independent cold fit of the same window
+    warm_price = two_year_forecast['yhat'].iloc[-1]
+    cold_price = single_forecast['yhat'].iloc[-1]
+    print(f"  Warm-started two-year price: {warm_price:.2f}, cold fit: {cold_price:.2f}")
+    assert abs(warm_price - cold_price) / cold_price < 0.05
+    
+    print("  ✅ Multi-window prediction test passed")
+
+
+def test_predict_windows_with_model_store(tmp_path):
+    """Test that fitted models are persisted and invalidated on hyperparameter changes"""
+    print("Testing model store warm start...")
+    from src.adapter.out.predict import model_store
+    
+    store_dir = str(tmp_path / "models")
+    test_data = create_test_data(days=365)
+    
+    predicter.predict_windows(test_data, windows=[None], predict_period=10, ticker="TEST", model_store_dir=store_dir)
+    
+    settings = dict(seasonality_mode='additive', changepoint_prior_scale=0.05, seasonality_prior_scale=0.1,
+                    holidays_prior_scale=10.0, mcmc_samples=0, interval_width=0.95, weekly_seasonality=True,
+                    yearly_seasonality=True, daily_seasonality=False, add_holidays=True, window=None)
+    init = model_store.load_init(store_dir, "TEST", None, model_store.fingerprint(settings))
+    assert init is not None, "Stored parameters should be reusable with unchanged hyperparameters"
+    assert set(init) == {'k', 'm', 'sigma_obs', 'delta', 'beta'}
+    # Only the warm-start parameters are stored, not the serialized model with its history
+    with open(os.path.join(store_dir, "TEST", "full.json")) as file:
+        assert set(json.load(file)) == {'fingerprint', 'saved_on', 'init'}
+    
+    changed = model_store.fingerprint({**settings, 'changepoint_prior_scale': 0.5})
+    assert model_store.load_init(store_dir, "TEST", None, changed) is None, "Changed hyperparameters should invalidate the model"
+    
+    # The next day's fit starts from the stored parameters and still produces a full forecast
+    next_day = pd.concat([test_data, pd.DataFrame({'ds': [test_data['ds'].max() + timedelta(days=1)], 'y': [test_data['y'].iloc[-1]]})])
+    [(model, forecast)] = predicter.predict_windows(next_day, windows=[None], predict_period=10, ticker="TEST", model_store_dir=store_dir)
+    assert len(forecast) == len(next_day) + 10
+    
+    print("  ✅ Model store warm start test passed")
+
+
+def test_predict_windows_fast_engine():
+    """Test that the fast engine produces the same forecast layout as Prophet"""
+    print("Testing fast forecast engine...")
+    from src.adapter.out.predict.fast_forecaster import FastForecaster
+    
+    test_data = create_test_data(days=365*3)
+    results = predicter.predict_windows(test_data, windows=[None, 365*2], predict_period=30, engine="fast")
+    _, prophet_forecast = predicter.predict(test_data, predict_period=30)
+    
+    (full_model, full_forecast), (two_year_model, two_year_forecast) = results
+    assert isinstance(full_model, FastForecaster) and isinstance(two_year_model, FastForecaster)
+    assert list(full_forecast.columns) == list(prophet_forecast.columns)
+    assert len(full_forecast) == len(prophet_forecast)
+    assert (full_forecast['ds'].tail(30).values == two_year_forecast['ds'].tail(30).values).all()
+    
+    fast_price, prophet_price = full_forecast['yhat'].iloc[-1], prophet_forecast['yhat'].iloc[-1]
+    print(f"  Fast engine price: {fast_price:.2f}, Prophet: {prophet_price:.2f}")
+    assert abs(fast_price - prophet_price) / prophet_price < 0.1
+    
+    with pytest.raises(ValueError):
+        predicter.predict(test_data, engine="unknown")
+    with pytest.raises(ValueError):
+        predicter.predict(test_data, engine="fast", seasonality_mode='multiplicative')
+    
+    print("  ✅ Fast forecast engine test passed")
+
+
+def test_predict_panel():
+    """Test that the batch forecast matches per-ticker fast forecasts and skips unusable histories"""
+    print("Testing batch forecast...")
+    test_data = create_test_data(days=365*3)
+    histories = {
+        'AAA': test_data,
+        'BBB': test_data.assign(y=test_data['y'] * 0.5),
+        'SHORT': test_data.tail(1),
+    }
+    
+    results = predicter.predict_panel(histories, windows=[None, 365*2], predict_period=30)
+    
+    assert set(results) == {'AAA', 'BBB'}, "Histories with too little data are left out"
+    for ticker in ['AAA', 'BBB']:
+        expected = predicter.predict_windows(histories[ticker], windows=[None, 365*2], predict_period=30, engine="fast")
+        for (model, forecast), (_, expected_forecast) in zip(results[ticker], expected):
+            assert list(forecast.columns) == list(expected_forecast.columns)
+            assert (forecast['ds'].values == expected_forecast['ds'].values).all()
+            assert np.allclose(forecast['yhat'], expected_forecast['yhat'])
+            assert np.allclose(forecast['uncertainty_range'], expected_forecast['uncertainty_range'])
+    
+    print("  ✅ Batch forecast test passed")
+
+
 def run_all_tests():
     """Run all predicter tests"""
     print("=" * 60)
@@ -393,6 +512,15 @@ def run_all_tests():
         test_predict_performance_metrics()
         print()
         
+        test_predict_windows()
+        print()
+        
+        test_predict_windows_fast_engine()
+        print()
+        
+        test_predict_panel()
+        print()
+        
         print("=" * 60)
         print("✅ All predicter tests completed successfully!")
         print("=" * 60)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Test script for in-memory chart rendering"""
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from prophet import Prophet
+
+from src.adapter.out.render import charts
+
+
+def create_fitted_model():
+    dates = pd.date_range(start='2024-01-01', periods=120, freq='D')
+    data = pd.DataFrame({'ds': dates, 'y': 100 + np.linspace(0, 10, len(dates)) + np.random.default_rng(1).normal(0, 1, len(dates))})
+    prophet = Prophet(daily_seasonality=False, weekly_seasonality=False, yearly_seasonality=False)
+    prophet.fit(data)
+    return prophet, prophet.predict(prophet.make_future_dataframe(periods=10))
+
+
+def test_render_forecast_in_memory(tmp_path, monkeypatch):
+    """Test that charts are PNG buffers, nothing is written to disk and no pyplot figure is left open"""
+    print("Testing in-memory chart rendering...")
+    monkeypatch.chdir(tmp_path)
+    prophet, forecast = create_fitted_model()
+    open_figures = plt.get_fignums()
+
+    first = charts.render_forecast(prophet, forecast, 'two_year_TEST.png')
+    figure = charts._figure
+    second = charts.render_forecast(prophet, forecast, 'five_year_TEST.png')
+
+    assert first.read(8) == b'\x89PNG\r\n\x1a\n'
+    assert second.getvalue() == first.getvalue()
+    assert (first.name, second.name) == ('two_year_TEST.png', 'five_year_TEST.png')
+    assert charts._figure is figure and not figure.axes
+    assert plt.get_fignums() == open_figures
+    assert list(tmp_path.iterdir()) == []
+
+    print("  ✅ In-memory chart rendering test passed")
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Test script for stats_calculator.py against a local fake Apps Script endpoint"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from src.adapter.out.stats import stats_calculator
+from src.adapter.out.stats.stats_calculator import StatsSink
+from src.logic.data.data import StockData
+from tests.helpers import create_stock_data
+
+
+class FakeAppsScript(ThreadingHTTPServer):
+    """Records the counter requests; the first `failures` requests get a 500."""
+
+    def __init__(self, failures: int = 0):
+        super().__init__(('127.0.0.1', 0), FakeAppsScriptHandler)
+        self.requests = []
+        self.failures = failures
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}/exec'
+
+
+class FakeAppsScriptHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so that a reused session shows up as a single client connection
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)
+        self.__record('GET', {name: values[0] for name, values in query.items()})
+
+    def do_POST(self):
+        self.__record('POST', json.loads(self.rfile.read(int(self.headers['Content-Length']))))
+
+    def __record(self, method: str, payload):
+        status = 200
+        if self.server.failures:
+            self.server.failures -= 1
+            status = 500
+        else:
+            self.server.requests.append((method, payload, self.client_address[1]))
+        self.send_response(status)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'OK')
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_endpoint():
+    servers = []
+
+    def start(**kwargs) -> FakeAppsScript:
+        server = FakeAppsScript(**kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def create_result(name: str, industry: str, growing: bool) -> StockData:
+    return create_stock_data(name, stock_name=name, industry=industry, is_stock_growing=growing)
+
+
+RESULTS = [
+    create_result("AAA", "Technology", True),
+    create_result("BBB", "Technology", True),
+    create_result("CCC", "Energy", False),
+]
+
+
+def test_post_mode_sends_one_aggregated_batch(fake_endpoint):
+    """Test that a flush sends all increments, counted per sheet and value, in one request"""
+    print("Testing aggregated stats POST...")
+    server = fake_endpoint()
+    sink = StatsSink(server.url, mode="post")
+    flushed = []
+    for result in RESULTS:
+        sink.add(result, on_flushed=lambda name=result.stock_name: flushed.append(name))
+    assert server.requests == [] and flushed == [], "Nothing is sent before the flush"
+
+    assert sink.flush()
+    [(method, payload, _)] = server.requests
+    assert method == 'POST'
+    assert {(item['sheet'], item['value']): item['count'] for item in payload['increments']} == {
+        ('etf_industry_positive', 'Technology'): 2,
+        ('etf_positive', 'AAA'): 1,
+        ('etf_positive', 'BBB'): 1,
+        ('etf_industry_negative', 'Energy'): 1,
+        ('etf_negative', 'CCC'): 1,
+    }
+    assert flushed == ["AAA", "BBB", "CCC"]
+    assert sink.flush() and len(server.requests) == 1, "An empty flush sends nothing"
+
+    print("  ✅ Aggregated stats POST test passed")
+
+
+def test_get_mode_reuses_one_connection_and_flushes_every_m(fake_endpoint):
+    """Test the original one-GET-per-increment format over a single kept-alive connection"""
+    print("Testing batched stats GETs...")
+    server = fake_endpoint()
+    sink = StatsSink(server.url, mode="get", flush_every=2)
+    sink.add(RESULTS[0])
+    assert server.requests == []
+    sink.add(RESULTS[1])
+
+    assert [payload for _, payload, _ in server.requests] == [
+        {'value': '"Technology"', 'sheet': '"etf_industry_positive"'},
+        {'value': '"Technology"', 'sheet': '"etf_industry_positive"'},
+        {'value': '"AAA"', 'sheet': '"etf_positive"'},
+        {'value': '"BBB"', 'sheet': '"etf_positive"'},
+    ]
+    assert len({client_port for _, _, client_port in server.requests}) == 1
+
+    # Names are sent URL-encoded, so the script receives them unchanged
+    sink.add(create_result("S&P 500 #1 ETF", "Oil & Gas", False))
+    sink.flush()
+    assert [payload for _, payload, _ in server.requests[4:]] == [
+        {'value': '"Oil & Gas"', 'sheet': '"etf_industry_negative"'},
+        {'value': '"S&P 500 #1 ETF"', 'sheet': '"etf_negative"'},
+    ]
+
+    print("  ✅ Batched stats GETs test passed")
+
+
+def test_failed_flush_keeps_unsent_increments(fake_endpoint):
+    """Test that a failed flush neither loses nor repeats increments"""
+    print("Testing failed stats flush...")
+    server = fake_endpoint(failures=1)
+    sink = StatsSink(server.url, mode="get")
+    flushed = []
+    sink.add(RESULTS[2], on_flushed=lambda: flushed.append(True))
+
+    assert not sink.flush()
+    assert flushed == []
+    assert sink.flush()
+    assert sorted(payload['sheet'] for _, payload, _ in server.requests) == ['"etf_industry_negative"', '"etf_negative"']
+    assert flushed == [True]
+
+    with pytest.raises(ValueError):
+        StatsSink(server.url, mode="put")
+
+    print("  ✅ Failed stats flush test passed")
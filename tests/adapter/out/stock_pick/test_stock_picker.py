@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Test script for stock_picker.py and counter.py"""
+
+import multiprocessing
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from src.adapter.out.stock_pick import counter, stock_picker
+
+
+def take_many(path: str, times: int, count: int):
+    local_counter = counter.SqliteCounter(path)
+    return [local_counter.take(count) for _ in range(times)]
+
+
+def test_sqlite_counter_ranges_never_overlap_across_processes(tmp_path):
+    """Test that concurrent workers get disjoint contiguous ranges covering the counter without gaps"""
+    print("Testing SQLite counter under concurrent workers...")
+    path = str(tmp_path / "counter.sqlite")
+    with multiprocessing.get_context("spawn").Pool(4) as pool:
+        starts = pool.starmap(take_many, [(path, 25, 3)] * 4)
+
+    taken = sorted(start + offset for worker_starts in starts for start in worker_starts for offset in range(3))
+    assert taken == list(range(4 * 25 * 3))
+    assert counter.SqliteCounter(path).value() == 300
+    assert counter.SqliteCounter(path, name="other").take() == 0
+
+    with pytest.raises(ValueError):
+        counter.SqliteCounter(path).take(0)
+    print("  ✅ SQLite counter concurrency test passed")
+
+
+def test_picks_wrap_around_the_list(tmp_path):
+    """Test that picks follow the counter modulo the list and ranges are contiguous"""
+    print("Testing picks and ranges...")
+    etfs = ["A", "B", "C", "D", "E"]
+    with patch.object(stock_picker.stock_names, "etf_list", etfs), \
+         patch.object(stock_picker.configuration, "COUNTER_BACKEND", "sqlite"), \
+         patch.object(stock_picker.configuration, "COUNTER_PATH", str(tmp_path / "counter.sqlite")):
+        assert [stock_picker.pick() for _ in range(7)] == ["A", "B", "C", "D", "E", "A", "B"]
+        assert stock_picker.pick_many(6) == ["C", "D", "E", "A", "B", "C"]
+        assert stock_picker.pick() == "D"
+    print("  ✅ Picks and ranges test passed")
+
+
+def test_remote_counter_asks_for_a_window():
+    """Test that the remote backend reserves a range in one request"""
+    print("Testing remote counter...")
+    response = MagicMock(content=b"41")
+    with patch.object(counter.requests, "get", return_value=response) as get:
+        remote = counter.create("remote", url="http://counter.test")
+        assert remote.take() == 41
+        assert remote.take(10) == 41
+    assert get.call_args_list[0].kwargs["params"] is None
+    assert get.call_args_list[1].kwargs["params"] == {"window": 10}
+
+    with pytest.raises(ValueError):
+        counter.create("redis")
+    print("  ✅ Remote counter test passed")
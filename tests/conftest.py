@@ -14,4 +14,4 @@ def pytest_configure(config):
         'TELEGRAM_TOKEN': 'test_telegram_token',
         'GET_AND_INCREMENT_COUNTER_URL': 'http://test.url',
         'APP_SCRIPT_ID': 'test_app_script_id'
-    })
\ No newline at end of file
+    })
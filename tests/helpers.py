@@ -0,0 +1,21 @@
+"""
+Factories shared by the tests.
+"""
+import numpy as np
+
+from src.logic.data.data import StockData, ProfitabilityData
+
+
+def create_stock_data(ticker: str, **fields) -> StockData:
+    """Analysis result of a test ETF; `fields` replace the defaults of the StockData constructor."""
+    values = dict(
+        ticker_symbol=ticker, stock_name=f"{ticker} ETF", currency="EUR", current_price=10.0, predict_price=11.0,
+        two_year_file_name=f"two_year_{ticker}.png", five_year_file_name=f"five_year_{ticker}.png",
+        is_stock_growing=True, industry="ETF", profitability_data=ProfitabilityData(1, 1, 1, 0.1, 0.1),
+        beta=1.0, standard_deviation=0.1, dividend_yield=0.01,
+        top_holdings=np.array([["Apple Inc", 0.07], ["Microsoft Corp", 0.06]], dtype=object),
+        sector_allocation={"technology": 0.4, "healthcare": 0.1}, average_daily_volume=1e6,
+        assets_under_management=1e9, expense_ratio=0.002, description="", prediction_uncertainty=0.5,
+    )
+    values.update(fields)
+    return StockData(**values)
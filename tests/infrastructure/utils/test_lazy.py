@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Test script for the deferred imports"""
+
+import json
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+from src.infrastructure.utils.lazy import lazy_import
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+HEAVY_MODULES = ["prophet", "matplotlib", "yfinance", "pandas", "telepot", "requests"]
+
+
+def test_module_is_imported_on_first_use():
+    """Test that a lazy module imports on attribute access and that patching reaches the real module"""
+    print("Testing lazy module...")
+    sys.modules.pop("colorsys", None)
+    colorsys = lazy_import("colorsys")
+    assert not colorsys._lazy_is_loaded() and "colorsys" not in sys.modules
+
+    assert colorsys.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert colorsys._lazy_is_loaded() and sys.modules["colorsys"] is colorsys._lazy_load()
+
+    # Patching the stand-in patches the real module and is undone afterwards
+    with patch.object(colorsys, "ONE_THIRD", 0.5):
+        assert sys.modules["colorsys"].ONE_THIRD == 0.5
+    assert sys.modules["colorsys"].ONE_THIRD == 1.0 / 3.0
+    with patch("colorsys.ONE_SIXTH", 0.25):
+        assert colorsys.ONE_SIXTH == 0.25
+
+    # Functions of the module are not hidden by the stand-in's own methods
+    json = lazy_import("json")
+    assert json.load is sys.modules["json"].load and json.loads("[1]") == [1]
+    print("  ✅ Lazy module test passed")
+
+
+def test_entry_points_do_not_import_heavy_libraries():
+    """Test that importing --reoptimize's and --notify's modules leaves the heavy libraries unloaded"""
+    print("Testing entry point imports...")
+    code = (
+        "import sys, json, main, src.adapter.out.optimization.optimizer, src.logic.data.universe, "
+        "src.adapter.out.notify.notifier; "
+        f"print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=dict(os.environ),
+                            capture_output=True, text=True, check=True)
+
+    assert json.loads(result.stdout) == []
+    print("  ✅ Entry point imports test passed")
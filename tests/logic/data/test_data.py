@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Test script for the compact StockData and ProfitabilityData"""
+
+import dataclasses
+import multiprocessing
+import pickle
+
+import numpy as np
+import pytest
+
+from tests.helpers import create_stock_data
+
+
+def create_in_worker(companies):
+    return create_stock_data("WORKER", top_holdings=np.array([[company, 0.0125] for company in companies], dtype=object),
+                             sector_allocation={"energy": 0.3, "Space": 0.7})
+
+
+def test_compact_fields_rebuild_the_constructor_arguments():
+    """Test that holdings and sectors are stored compactly and read back as the original rows and dict"""
+    print("Testing compact StockData fields...")
+    stock = create_stock_data(
+        "AAA",
+        top_holdings=np.array([["Apple Inc", 0.0712], ["Microsoft Corp", "n/a"], ["NVIDIA Corp", 0.05]], dtype=object),
+        sector_allocation={"technology": 0.4, "Quantum": 0.1, "healthcare": 0.0, "energy": None},
+    )
+
+    assert not hasattr(stock, "__dict__") and not hasattr(stock.profitability_data, "__dict__")
+    assert stock.holding_weights.dtype == np.float64 and stock.holding_names == ("Apple Inc", "NVIDIA Corp")
+    # Every result shares one string per company
+    other = create_stock_data("BBB", top_holdings=np.array([["".join(["Apple", " Inc"]), 0.01]], dtype=object))
+    assert other.holding_names[0] is stock.holding_names[0]
+    # Unparsable rows are dropped, the weights come back exactly
+    assert stock.top_holdings.tolist() == [["Apple Inc", 0.0712], ["NVIDIA Corp", 0.05]]
+    assert stock.sector_allocation == {"technology": 0.4, "Quantum": 0.1, "healthcare": 0.0}
+    assert create_stock_data("BBB", top_holdings=np.array([]), sector_allocation={}).top_holdings.size == 0
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        stock.current_price = 12.0
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        stock.profitability_data.trailing_eps = 0
+    print("  ✅ Compact StockData fields test passed")
+
+
+def test_pickling_across_processes():
+    """Test that results pickled by another process keep their company and sector names"""
+    print("Testing StockData pickling across processes...")
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        stock = pool.apply(create_in_worker, (["Alpha Corp", "Zeta Corp"],))
+
+    assert stock.top_holdings.tolist() == [["Alpha Corp", 0.0125], ["Zeta Corp", 0.0125]]
+    assert stock.sector_allocation == {"energy": 0.3, "Space": 0.7}
+    copy = pickle.loads(pickle.dumps(stock))
+    assert copy.top_holdings.tolist() == stock.top_holdings.tolist()
+    assert copy.holding_names[0] is stock.holding_names[0], "Unpickled names are interned again"
+    assert copy.profitability_data == stock.profitability_data and copy.profitability_data.is_profitable()
+    print("  ✅ StockData pickling test passed")
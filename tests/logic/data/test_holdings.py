@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Test script for the sparse ETF x company holdings index"""
+
+import numpy as np
+
+from src.logic.data.holdings import HoldingsIndex
+
+
+def create_top_holdings():
+    return [
+        np.array([["Apple Inc", 0.25], ["Microsoft Corp", 0.20], ["NVIDIA Corp", 0.15]], dtype=object),
+        np.array([], dtype=object),
+        np.array([["Microsoft Corp", 0.05], ["Tesla Inc", "n/a"], ["Apple Inc", 0.10], ["Microsoft Corp", 0.02]], dtype=object),
+    ]
+
+
+def dense_reference(top_holdings_list, company_names):
+    matrix = np.zeros((len(top_holdings_list), len(company_names)))
+    for row, top_holdings in enumerate(top_holdings_list):
+        for holding in top_holdings:
+            try:
+                matrix[row, company_names.index(holding[0])] += float(holding[1])
+            except (ValueError, TypeError):
+                continue
+    return matrix
+
+
+def test_holdings_index_build():
+    """Test that company names are interned once and unparsable rows are skipped"""
+    print("Testing holdings index construction...")
+    index = HoldingsIndex.from_top_holdings(create_top_holdings())
+
+    assert index.company_names == ["Apple Inc", "Microsoft Corp", "NVIDIA Corp"]
+    assert index.etf_count == 3
+    assert list(index.indptr) == [0, 3, 3, 5]
+    assert index.holdings(1) == []
+    # Duplicated company rows of one ETF are summed
+    assert index.holdings(2) == [("Apple Inc", 0.10), ("Microsoft Corp", 0.07)]
+    assert index.holdings(0)[0] == ("Apple Inc", 0.25)
+
+    print("  ✅ Holdings index construction test passed")
+
+
+def test_holdings_index_exposures():
+    """Test that sparse exposures match a dense ETF x company matrix product for one and many portfolios"""
+    print("Testing holdings index exposures...")
+    top_holdings_list = create_top_holdings()
+    index = HoldingsIndex.from_top_holdings(top_holdings_list)
+    dense = dense_reference(top_holdings_list, index.company_names)
+
+    portfolios = np.random.default_rng(5).dirichlet(np.ones(3), size=8)
+    assert np.allclose(index.exposures(portfolios), portfolios @ dense)
+    assert np.allclose(index.exposures(portfolios[0]), portfolios[0] @ dense)
+
+    empty = HoldingsIndex.from_top_holdings([np.array([]), np.array([])])
+    assert empty.exposures(np.ones((4, 2))).shape == (4, 0)
+    assert empty.exposures(np.ones(2)).shape == (0,)
+
+    print("  ✅ Holdings index exposure test passed")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Test script for the columnar ETF universe"""
+
+import numpy as np
+import pytest
+
+from src.logic.data.universe import Universe
+from tests.helpers import create_stock_data
+
+
+def create_stocks():
+    return [
+        create_stock_data("AAA", current_price=10.0, predict_price=11.0, beta=1.2,
+                          sector_allocation={"technology": 0.6, "healthcare": 0.4},
+                          top_holdings=np.array([["Apple Inc", 0.2], ["Microsoft Corp", 0.1]], dtype=object)),
+        create_stock_data("BBB", current_price=20.0, predict_price=22.0, beta=1.2,
+                          sector_allocation={}, top_holdings=np.array([], dtype=object)),
+        create_stock_data("CCC", current_price=30.0, predict_price=33.0, beta=1.2,
+                          sector_allocation={"energy": 0.5, "technology": "n/a"},
+                          top_holdings=np.array([["Microsoft Corp", 0.05]], dtype=object)),
+    ]
+
+
+def test_universe_columns():
+    """Test that numeric fields become float64 columns and sectors are interned in order of appearance"""
+    print("Testing universe columns...")
+    universe = Universe.from_stock_data(create_stocks())
+
+    assert len(universe) == 3
+    assert universe.tickers == ["AAA", "BBB", "CCC"]
+    assert universe.current_prices.dtype == np.float64 and universe.current_prices.flags['C_CONTIGUOUS']
+    assert universe.predicted_prices.tolist() == pytest.approx([11.0, 22.0, 33.0])
+    assert universe.sector_names == ["technology", "healthcare", "energy"]
+    # Unparsable allocations are skipped
+    assert universe.sector_matrix.tolist() == [[0.6, 0.4, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0, 0.5]]
+    assert universe.holdings.holdings(2) == [("Microsoft Corp", 0.05)]
+    print("  ✅ Universe columns test passed")
+
+
+def test_universe_save_and_load(tmp_path):
+    """Test that a saved universe loads back with the same columns, sectors and holdings"""
+    print("Testing universe save and load...")
+    universe = Universe.from_stock_data(create_stocks())
+    path = str(tmp_path / "universe.npz")
+    universe.save(path)
+    loaded = Universe.load(path)
+
+    assert loaded.tickers == universe.tickers and loaded.stock_names == universe.stock_names
+    assert loaded.sector_names == universe.sector_names
+    assert np.array_equal(loaded.sector_matrix, universe.sector_matrix)
+    assert np.array_equal(loaded.betas, universe.betas)
+    assert loaded.holdings.company_names == universe.holdings.company_names
+    assert np.array_equal(loaded.holdings.exposures(np.ones((2, 3))), universe.holdings.exposures(np.ones((2, 3))))
+
+    empty_path = str(tmp_path / "empty.npz")
+    Universe.from_stock_data([]).save(empty_path)
+    empty = Universe.load(empty_path)
+    assert len(empty) == 0 and empty.sector_matrix.shape == (0, 0)
+
+    # A path without the extension, e.g. UNIVERSE_PATH=.cache/universe, loads from where it was saved
+    bare_path = str(tmp_path / "cache" / "universe")
+    universe.save(bare_path)
+    assert (tmp_path / "cache" / "universe.npz").exists()
+    assert Universe.load(bare_path).tickers == universe.tickers
+    print("  ✅ Universe save and load test passed")
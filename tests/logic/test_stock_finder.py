@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Test script for stock_finder.py"""
+
+import io
+import os
+import time
+from unittest.mock import patch
+
+from src.adapter.out.journal import run_journal
+from src.logic import stock_finder
+from src.logic.data.data import Analysis, StockInfo, SkipException
+from tests.helpers import create_stock_data
+
+
+def analyse_and_record(journal):
+    """Stand-in for the analysis that records its result like the real one."""
+    def analyse(stock_name, *args):
+        result = create_stock_data(stock_name)
+        run_journal.record_result(journal, stock_name, result)
+        return Analysis(result)
+    return analyse
+
+
+def test_run_many_resumes_from_journal(tmp_path):
+    """Test that a resumed run skips finished ETFs and only repeats missing side effects"""
+    print("Testing resumable batch run...")
+    journal = run_journal.start(str(tmp_path / "journal.sqlite"))
+    # AAA is done, BBB was analysed and sent but its stats were not counted, CCC was never reached
+    run_journal.record_result(journal, "AAA", create_stock_data("AAA"))
+    run_journal.record_side_effect(journal, "AAA", "notified")
+    run_journal.record_side_effect(journal, "AAA", "counted")
+    run_journal.record_result(journal, "BBB", create_stock_data("BBB"))
+    run_journal.record_side_effect(journal, "BBB", "notified")
+    resumed = run_journal.start(journal.path, resume=True)
+
+    histories = {"CCC": StockInfo(historic_data=None, ticker=None)}
+    with patch.object(stock_finder.downloader, 'download_many', return_value=(histories, {})) as download_many, \
+         patch.object(stock_finder, 'analyse', side_effect=analyse_and_record(resumed)) as analyse, \
+         patch.object(stock_finder.notifier, 'notify', side_effect=lambda result, charts, on_delivered: on_delivered()) as notify, \
+         patch.object(stock_finder.stats_calculator, 'calculate', side_effect=lambda result, on_flushed: on_flushed()) as calculate:
+        outcomes = stock_finder.run_many(["AAA", "BBB", "CCC"], journal=resumed)
+
+    assert [outcome.result.ticker_symbol for outcome in outcomes] == ["AAA", "BBB", "CCC"]
+    # BBB only needs its stats, so it is neither downloaded nor analysed
+    assert download_many.call_args[0][0] == ["CCC"]
+    assert [call.args[0] for call in analyse.call_args_list] == ["CCC"]
+    assert [call.args[0].ticker_symbol for call in notify.call_args_list] == ["CCC"]
+    assert sorted(call.args[0].ticker_symbol for call in calculate.call_args_list) == ["BBB", "CCC"]
+    assert all(entry.is_complete() for entry in run_journal.entries(resumed).values())
+
+    print("  ✅ Resumable batch run test passed")
+
+
+def test_skipped_notification_completes_the_journal_entry(tmp_path):
+    """Test that an ETF which is not sent is still recorded as notified, so a resume does not analyse it again"""
+    print("Testing skipped notification...")
+    journal = run_journal.start(str(tmp_path / "journal.sqlite"))
+    histories = {"AAA": StockInfo(historic_data=None, ticker=None)}
+    with patch.object(stock_finder.downloader, 'download_many', return_value=(histories, {})), \
+         patch.object(stock_finder, 'analyse', side_effect=analyse_and_record(journal)), \
+         patch.object(stock_finder.notifier, 'is_notifyable', return_value=False), \
+         patch.object(stock_finder.stats_calculator, 'calculate', side_effect=lambda result, on_flushed: on_flushed()):
+        stock_finder.run_many(["AAA"], journal=journal)
+
+    assert run_journal.entry(journal, "AAA").is_complete()
+    print("  ✅ Skipped notification test passed")
+
+
+def analyse_in_worker(stock_name, *args):
+    """Stand-in for the analysis in a pool worker: crashes, skips, hangs, gives up or succeeds by ticker."""
+    if stock_name == "CRASH":
+        raise RuntimeError("analysis crashed")
+    if stock_name == "SKIP":
+        raise SkipException("skipped on purpose")
+    if stock_name == "HANG":
+        time.sleep(60)
+    if stock_name == "NONE":
+        return None
+    chart = io.BytesIO(f"{stock_name} chart from {os.getpid()}".encode())
+    chart.name = f"two_year_{stock_name}.png"
+    return Analysis(create_stock_data(stock_name), [chart, chart])
+
+
+def test_run_many_in_pool_keeps_failures_per_etf():
+    """Test that a pool run returns outcomes in input order with crashes, skips and timeouts kept per ETF"""
+    print("Testing batch run in a process pool...")
+    names = ["AAA", "CRASH", "HANG", "NONE", "SKIP", "MISSING", "BBB"]
+    histories = {name: StockInfo(historic_data=None, ticker=None) for name in names if name != "MISSING"}
+    sent = []
+    with patch.object(stock_finder.downloader, 'download_many', return_value=(histories, {"MISSING": KeyError("MISSING")})), \
+         patch.object(stock_finder, 'analyse', analyse_in_worker), \
+         patch.object(stock_finder.notifier, 'notify', side_effect=lambda result, charts, on_delivered: sent.append(
+             (result.ticker_symbol, charts[0].name, charts[0].getvalue(), os.getpid()))), \
+         patch.object(stock_finder.stats_calculator, 'calculate') as calculate:
+        started = time.monotonic()
+        outcomes = stock_finder.run_many(names, workers=3, task_timeout=5)
+        elapsed = time.monotonic() - started
+
+    assert [outcome.stock_name for outcome in outcomes] == names
+    assert [outcome.result.ticker_symbol for outcome in outcomes if outcome.is_success()] == ["AAA", "BBB"]
+    errors = {outcome.stock_name: outcome.error for outcome in outcomes}
+    assert isinstance(errors["CRASH"], RuntimeError) and isinstance(errors["SKIP"], SkipException)
+    assert isinstance(errors["HANG"], TimeoutError) and isinstance(errors["MISSING"], KeyError)
+    assert errors["NONE"] is None and not outcomes[3].is_success()
+    # The hung worker is killed instead of waited for
+    assert elapsed < 30
+    # Workers only analyse; their charts are sent and their results counted by this process
+    assert [(ticker, name) for ticker, name, _, _ in sent] == [("AAA", "two_year_AAA.png"), ("BBB", "two_year_BBB.png")]
+    assert all(chart.startswith(ticker.encode()) and pid == os.getpid() for ticker, _, chart, pid in sent)
+    assert all(not chart.endswith(str(os.getpid()).encode()) for _, _, chart, _ in sent)
+    assert [call.args[0].ticker_symbol for call in calculate.call_args_list] == ["AAA", "BBB"]
+    print("  ✅ Process pool batch run test passed")